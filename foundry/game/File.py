@@ -1,7 +1,7 @@
 from os.path import basename
 from typing import List, Optional
 
-from smb3parse.constants import BASE_OFFSET, PAGE_A000_ByTileset, WORLD_MAP_TSA_INDEX
+from smb3parse.constants import BASE_OFFSET, Level_BG_Pages1, Level_BG_Pages2, PAGE_A000_ByTileset, WORLD_MAP_TSA_INDEX
 from smb3parse.util.rom import Rom, INESHeader
 
 WORLD_COUNT = 9  # includes warp zone
@@ -15,6 +15,12 @@ TSA_OS_LIST = PAGE_A000_ByTileset
 TSA_TABLE_SIZE = 0x400
 TSA_TABLE_INTERVAL = TSA_TABLE_SIZE + 0x1C00
 
+CHR_ROM_START = BASE_OFFSET + Rom.VANILLA_PRG_SIZE
+
+# the tables, which CHR segments make up the graphics set of a level, are relevant for the graphics as well
+GRAPHICS_TABLES_START = Level_BG_Pages1
+GRAPHICS_TABLES_END = Level_BG_Pages2 + (Level_BG_Pages2 - Level_BG_Pages1)
+
 
 class ROM(Rom):
     MARKER_VALUE = bytes("SMB3FOUNDRY", "ascii")
@@ -29,6 +35,9 @@ class ROM(Rom):
 
     W_INIT_OS_LIST: List[int] = []
 
+    # changes, whenever the graphics data in the ROM might have changed, so cached graphics know they are outdated
+    chr_generation: int = 0
+
     def __init__(self, path: Optional[str] = None):
         if not ROM.rom_data:
             if path is None:
@@ -65,6 +74,7 @@ class ROM(Rom):
             data = bytearray(rom.read())
 
         ROM.header = INESHeader.from_buffer_copy(data)
+        ROM.chr_generation += 1
         ROM.path = path
         ROM.name = basename(path)
 
@@ -81,14 +91,19 @@ class ROM(Rom):
             ROM.additional_data = data[additional_data_start:].decode("utf-8")
 
     @staticmethod
-    def save_to_file(path: str, set_new_path=True):
-        with open(path, "wb") as f:
-            f.write(bytearray(ROM.rom_data))
+    def to_bytes() -> bytes:
+        """Returns the ROM, like it is saved to a file, including the additional data of the editor."""
+        data = bytes(ROM.rom_data)
 
         if ROM.additional_data:
-            with open(path, "ab") as f:
-                f.write(ROM.MARKER_VALUE)
-                f.write(ROM.additional_data.encode("utf-8"))
+            data += ROM.MARKER_VALUE + ROM.additional_data.encode("utf-8")
+
+        return data
+
+    @staticmethod
+    def save_to_file(path: str, set_new_path=True):
+        with open(path, "wb") as f:
+            f.write(ROM.to_bytes())
 
         if set_new_path:
             ROM.path = path
@@ -119,3 +134,26 @@ class ROM(Rom):
     def bulk_write(self, data: bytearray, position: int):
         position = self.prg_normalize(position)
         ROM.rom_data[position : position + len(data)] = data
+
+        self._check_for_graphics_change(position, len(data))
+
+    def write(self, offset: int, data: bytes):
+        super(ROM, self).write(offset, data)
+
+        self._check_for_graphics_change(self.prg_normalize(offset), len(data))
+
+    def _check_for_graphics_change(self, position: int, length: int):
+        """
+        Bumps the chr_generation, if the written range touches the CHR ROM or the graphics set tables.
+
+        :param position: The already normalized position of the write.
+        :param length: The amount of bytes written.
+        """
+        tables_start = self.prg_normalize(GRAPHICS_TABLES_START)
+        tables_end = self.prg_normalize(GRAPHICS_TABLES_END)
+
+        touches_tables = position < tables_end and tables_start < position + length
+        touches_chr_rom = position + length > self.prg_normalize(CHR_ROM_START)
+
+        if touches_tables or touches_chr_rom:
+            ROM.chr_generation += 1
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from foundry.game.ObjectDefinitions import ObjectDefinition, load_object_definitions
 from smb3parse.objects.object_set import ENEMY_ITEM_OBJECT_SET, ObjectSet as _ObjectSet
 
@@ -48,3 +50,14 @@ class ObjectSet:
             raise ValueError(f"This method shouldn't be called for the {self.name}")
 
         return self._internal_object_set.object_length(domain, object_id)
+
+
+@lru_cache(maxsize=None)
+def load_object_set(object_set_number: int) -> ObjectSet:
+    """
+    Returns the object set of the given number, which is shared with everyone else asking for it, like all the objects
+    of a level.
+
+    :return: An ObjectSet, which should not be modified.
+    """
+    return ObjectSet(object_set_number)
@@ -1,4 +1,9 @@
+from typing import Dict, NamedTuple, Tuple
+
+from PySide2.QtGui import QImage, qRgb
+
 from foundry.game.File import ROM
+from foundry.game.gfx.drawable import TILE_SIDE_LENGTH, decode_2bpp
 from smb3parse.constants import Level_BG_Pages1, Level_BG_Pages2
 
 CHR_ROM_OFFSET = 0x40010
@@ -11,6 +16,9 @@ VS_2P = 18
 
 BG_PAGE_COUNT = Level_BG_Pages2 - Level_BG_Pages1  # 23 in stock rom
 
+# placeholder colors of the atlas, until a palette is applied
+GRAYSCALE_COLOR_TABLE = [qRgb(0x00, 0x00, 0x00), qRgb(0x55, 0x55, 0x55), qRgb(0xAA, 0xAA, 0xAA), qRgb(0xFF, 0xFF, 0xFF)]
+
 GRAPHIC_SET_NAMES = [
     "Mario graphics (1)",
     "Plain",
@@ -52,6 +60,10 @@ class GraphicsSet:
     GRAPHIC_SET_BG_PAGE_2 = []
 
     def __init__(self, graphic_set_number):
+        """
+        Reads the graphics set from the ROM. Prefer load_graphics_set, which shares graphics sets, that were already
+        read, as long as the graphics data in the ROM didn't change.
+        """
         if not self.GRAPHIC_SET_BG_PAGE_1:
             self.GRAPHIC_SET_BG_PAGE_1 = ROM().bulk_read(BG_PAGE_COUNT, Level_BG_Pages1)
             self.GRAPHIC_SET_BG_PAGE_2 = ROM().bulk_read(BG_PAGE_COUNT, Level_BG_Pages2)
@@ -59,6 +71,12 @@ class GraphicsSet:
         self.data = bytearray()
         self.number = graphic_set_number
 
+        # the graphics data of the ROM this was read from, so caches don't confuse it with newer data
+        self.chr_generation = ROM.chr_generation
+
+        self._color_indexes = b""
+        self._atlas = QImage()
+
         segments = []
 
         if graphic_set_number == WORLD_MAP:
@@ -83,6 +101,37 @@ class GraphicsSet:
 
         self._read_in(segments)
 
+        # graphics sets are shared, so they should not be changed after the fact
+        self.data = bytes(self.data)
+
+    @property
+    def color_indexes(self) -> bytes:
+        """The color index of every pixel of every tile in this graphics set. See decode_2bpp for the layout."""
+        if not self._color_indexes:
+            self._color_indexes = decode_2bpp(self.data)
+
+        return self._color_indexes
+
+    @property
+    def atlas(self) -> QImage:
+        """
+        All tiles of this graphics set in a single image, one below the other, storing the color index of every pixel,
+        instead of a color. Palettes are only applied, when drawing, by setting a color table on (copies of) it.
+        """
+        if self._atlas.isNull():
+            color_indexes = self.color_indexes
+            tile_count = len(color_indexes) // (TILE_SIDE_LENGTH * TILE_SIDE_LENGTH)
+
+            atlas = QImage(
+                color_indexes, TILE_SIDE_LENGTH, tile_count * TILE_SIDE_LENGTH, TILE_SIDE_LENGTH, QImage.Format_Indexed8
+            )
+            atlas.setColorTable(GRAYSCALE_COLOR_TABLE)
+
+            # copy, so the image doesn't depend on the lifetime of the decoded bytes
+            self._atlas = atlas.copy()
+
+        return self._atlas
+
     def _read_in(self, segments):
         for segment in segments:
             self._read_in_chr_rom_segment(segment)
@@ -92,3 +141,54 @@ class GraphicsSet:
         chr_rom_data = ROM().bulk_read(2 * CHR_ROM_SEGMENT_SIZE, offset)
 
         self.data.extend(chr_rom_data)
+
+
+class GraphicsSetCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+
+
+_graphics_set_cache: Dict[Tuple[int, int], GraphicsSet] = {}
+_graphics_set_cache_hits = 0
+_graphics_set_cache_misses = 0
+
+
+def load_graphics_set(graphic_set_number: int) -> GraphicsSet:
+    """
+    Returns the graphics set of the given number, which is shared with everyone else asking for it. It is only read
+    from the ROM again, if the graphics data in it was written to since, or a new ROM was loaded.
+
+    :param graphic_set_number: The graphics set index, as defined in the level header, for example.
+
+    :return: A GraphicsSet, which should not be modified.
+    """
+    global _graphics_set_cache_hits, _graphics_set_cache_misses
+
+    key = (ROM.chr_generation, graphic_set_number)
+
+    if key in _graphics_set_cache:
+        _graphics_set_cache_hits += 1
+    else:
+        _graphics_set_cache_misses += 1
+
+        # drop graphics sets of older ROM data, they will not be asked for anymore
+        for outdated_key in [key for key in _graphics_set_cache if key[0] != ROM.chr_generation]:
+            del _graphics_set_cache[outdated_key]
+
+        _graphics_set_cache[key] = GraphicsSet(graphic_set_number)
+
+    return _graphics_set_cache[key]
+
+
+def graphics_set_cache_info() -> GraphicsSetCacheInfo:
+    return GraphicsSetCacheInfo(_graphics_set_cache_hits, _graphics_set_cache_misses, len(_graphics_set_cache))
+
+
+def clear_graphics_set_cache():
+    global _graphics_set_cache_hits, _graphics_set_cache_misses
+
+    _graphics_set_cache.clear()
+
+    _graphics_set_cache_hits = 0
+    _graphics_set_cache_misses = 0
@@ -5,6 +5,7 @@ from attr import dataclass
 
 from foundry import root_dir
 from foundry.game.File import ROM
+from foundry.game.gfx.drawable.DrawableCache import drawable_cache
 from smb3parse.constants import PalSet_Maps, Palette_By_Tileset
 from smb3parse.levels import BASE_OFFSET
 
@@ -39,11 +40,18 @@ class PaletteGroup:
 
     changed = False
 
+    @property
+    def cache_tag(self) -> Tuple[int, int]:
+        """Everything drawn with this palette group is tagged with this in the drawable cache."""
+        return self.object_set, self.index
+
     def restore(self):
         new_palette_group = load_palette_group(self.object_set, self.index, use_cache=False)
 
         self.palettes = new_palette_group.palettes
 
+        drawable_cache.invalidate(self.cache_tag)
+
     def __getitem__(self, item):
         return self.palettes[item]
 
@@ -76,6 +84,8 @@ class PaletteGroup:
 
             palette_address += COLORS_PER_PALETTE
 
+        drawable_cache.invalidate(self.cache_tag)
+
 
 _palette_group_cache: Dict[Tuple[int, int], PaletteGroup] = {}
 
@@ -145,6 +155,18 @@ for i in range(COLOR_COUNT):
     offset += BYTES_IN_COLOR
 
 
+def color_table_for_palette(palette: bytearray) -> List[int]:
+    """
+    Turns a palette of indexes into the NES color palette into a color table, that can be applied to an image in the
+    QImage.Format_Indexed8 format, like the atlas of a GraphicsSet.
+
+    :param palette: The 4 NES color indexes of a palette.
+
+    :return: The 4 colors of the palette as ARGB values.
+    """
+    return [NESPalette[color_index].rgb() for color_index in palette]
+
+
 def bg_color_for_object_set(object_set_number: int, palette_group_index: int) -> QColor:
     palette_group = load_palette_group(object_set_number, palette_group_index)
 
@@ -1,13 +1,14 @@
 from functools import lru_cache
+from typing import List
 
-from PySide2.QtCore import QPoint
-from PySide2.QtGui import QColor, QImage, QPainter, Qt
+from PySide2.QtGui import QColor, QImage, QPainter, qRgba
 
 from foundry.game.File import ROM
 from foundry.game.gfx.GraphicsSet import GraphicsSet
-from foundry.game.gfx.Palette import NESPalette, PaletteGroup
-from foundry.game.gfx.drawable import MASK_COLOR, apply_selection_overlay
-from foundry.game.gfx.drawable.Tile import Tile
+from foundry.game.gfx.Palette import NESPalette, PaletteGroup, color_table_for_palette
+from foundry.game.gfx.drawable import MASK_COLOR, selection_overlay_color
+from foundry.game.gfx.drawable.DrawableCache import drawable_cache
+from foundry.game.gfx.drawable.Tile import Tile, get_tile
 from smb3parse.objects.object_set import CLOUDY_GRAPHICS_SET
 
 TSA_BANK_0 = 0 * 256
@@ -15,16 +16,17 @@ TSA_BANK_1 = 1 * 256
 TSA_BANK_2 = 2 * 256
 TSA_BANK_3 = 3 * 256
 
+TRANSPARENT = qRgba(0, 0, 0, 0)
 
-@lru_cache(2 ** 10)
-def get_block(block_index: int, palette_group: PaletteGroup, graphics_set: GraphicsSet, tsa_data: bytes):
+
+def get_block(block_index: int, palette_group: PaletteGroup, graphics_set: GraphicsSet, tsa_data: bytes) -> "Block":
     if block_index > 0xFF:
-        rom_block_index = ROM().get_byte(block_index)  # block_index is an offset into the graphic memory
-        block = Block(rom_block_index, palette_group, graphics_set, tsa_data)
-    else:
-        block = Block(block_index, palette_group, graphics_set, tsa_data)
+        block_index = ROM().get_byte(block_index)  # block_index is an offset into the graphic memory
 
-    return block
+    # blocks keep a reference to their palette group, so its id can't be reused, while the block is cached
+    key = ("block", block_index, id(palette_group), graphics_set.chr_generation, graphics_set.number, tsa_data)
+
+    return drawable_cache.get(key, lambda: Block(block_index, palette_group, graphics_set, tsa_data), Block.memory_size)
 
 
 class Block:
@@ -36,8 +38,6 @@ class Block:
 
     tsa_data = bytes()
 
-    _block_cache = {}
-
     def __init__(
         self,
         block_index: int,
@@ -48,84 +48,120 @@ class Block:
     ):
         self.index = block_index
 
-        palette_index = (block_index & 0b1100_0000) >> 6
+        self.palette_group = palette_group
+        self.palette_index = (block_index & 0b1100_0000) >> 6
 
         if graphics_set.number == CLOUDY_GRAPHICS_SET:
-            self.bg_color = NESPalette[palette_group[palette_index][2]]
+            self.background_color_index = 2
         else:
-            self.bg_color = NESPalette[palette_group[palette_index][0]]
-
-        # can't hash list, so turn it into a string instead
-        self._block_id = (block_index, str(palette_group), graphics_set.number)
+            self.background_color_index = 0
 
         lu = tsa_data[TSA_BANK_0 + block_index]
         ld = tsa_data[TSA_BANK_1 + block_index]
         ru = tsa_data[TSA_BANK_2 + block_index]
         rd = tsa_data[TSA_BANK_3 + block_index]
 
-        self.lu_tile = Tile(lu, palette_group, palette_index, graphics_set)
-        self.ld_tile = Tile(ld, palette_group, palette_index, graphics_set)
+        self.lu_tile = get_tile(lu, graphics_set)
+        self.ld_tile = get_tile(ld, graphics_set)
 
         if mirrored:
-            self.ru_tile = Tile(lu, palette_group, palette_index, graphics_set, mirrored=True)
-            self.rd_tile = Tile(ld, palette_group, palette_index, graphics_set, mirrored=True)
+            self.ru_tile = get_tile(lu, graphics_set, mirrored=True)
+            self.rd_tile = get_tile(ld, graphics_set, mirrored=True)
         else:
-            self.ru_tile = Tile(ru, palette_group, palette_index, graphics_set)
-            self.rd_tile = Tile(rd, palette_group, palette_index, graphics_set)
+            self.ru_tile = get_tile(ru, graphics_set)
+            self.rd_tile = get_tile(rd, graphics_set)
 
-        self.image = QImage(Block.WIDTH, Block.HEIGHT, QImage.Format_RGB888)
-        painter = QPainter(self.image)
+        # the palette is only applied when drawing, so the block doesn't depend on the palette it was created with
+        self._block_id = (
+            graphics_set.chr_generation,
+            graphics_set.number,
+            lu,
+            ld,
+            ru,
+            rd,
+            mirrored,
+            self.background_color_index,
+        )
 
-        painter.drawImage(QPoint(0, 0), self.lu_tile.as_image())
-        painter.drawImage(QPoint(Tile.WIDTH, 0), self.ru_tile.as_image())
-        painter.drawImage(QPoint(0, Tile.HEIGHT), self.ld_tile.as_image())
-        painter.drawImage(QPoint(Tile.WIDTH, Tile.HEIGHT), self.rd_tile.as_image())
+        self.color_indexes = _compose_color_indexes(self.lu_tile, self.ru_tile, self.ld_tile, self.rd_tile)
 
-        painter.end()
+        self.whole_block_is_transparent = self.color_indexes.count(self.background_color_index) == Block.PIXEL_COUNT
 
-        if _image_only_one_color(self.image) and self.image.pixelColor(0, 0) == QColor(*MASK_COLOR):
-            self._whole_block_is_transparent = True
-        else:
-            self._whole_block_is_transparent = False
+        self._indexed_image = QImage(
+            self.color_indexes, Block.WIDTH, Block.HEIGHT, Block.WIDTH, QImage.Format_Indexed8
+        ).copy()
+
+    def memory_size(self) -> int:
+        """Roughly, how many bytes this block takes up."""
+        return len(self.color_indexes) + self._indexed_image.sizeInBytes()
+
+    @property
+    def palette(self) -> bytes:
+        return bytes(self.palette_group[self.palette_index])
+
+    @property
+    def bg_color(self) -> QColor:
+        return NESPalette[self.palette_group[self.palette_index][self.background_color_index]]
+
+    @property
+    def image(self) -> QImage:
+        """The block in the colors of its palette, with the background color replaced by the MASK_COLOR."""
+        color_table = color_table_for_palette(self.palette)
+        color_table[self.background_color_index] = QColor(*MASK_COLOR).rgb()
+
+        image = QImage(self._indexed_image)
+        image.setColorTable(color_table)
+
+        return image.convertToFormat(QImage.Format_RGB888)
 
     def draw(self, painter: QPainter, x, y, block_length, selected=False, transparent=False):
-        block_attributes = (self._block_id, block_length, selected, transparent)
+        # the colors of the palette are part of the key, so a changed palette never gets outdated images
+        block_attributes = ("block image", self._block_id, self.palette, block_length, selected, transparent)
+
+        image = drawable_cache.get(
+            block_attributes,
+            lambda: self._draw_image(block_length, selected, transparent),
+            QImage.sizeInBytes,
+            tag=self.palette_group.cache_tag,
+        )
 
-        if block_attributes not in Block._block_cache:
-            image = self.image.copy()
+        painter.drawImage(x, y, image)
 
-            if block_length != Block.WIDTH:
-                image = image.scaled(block_length, block_length)
+    def _draw_image(self, block_length, selected, transparent) -> QImage:
+        image = QImage(self._indexed_image)
 
-            # mask out the transparent pixels first
-            mask = image.createMaskFromColor(QColor(*MASK_COLOR).rgb(), Qt.MaskOutColor)
-            image.setAlphaChannel(mask)
+        if block_length != Block.WIDTH:
+            image = image.scaled(block_length, block_length)
 
-            if not transparent:  # or self._whole_block_is_transparent:
-                image = self._replace_transparent_with_background(image)
+        # transparency, background and selection only depend on the color index, so they are all in the color table
+        image.setColorTable(_draw_color_table(self.palette, self.background_color_index, selected, transparent))
 
-            if selected:
-                apply_selection_overlay(image, mask)
+        return image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
 
-            Block._block_cache[block_attributes] = image
 
-        painter.drawImage(x, y, Block._block_cache[block_attributes])
+def _compose_color_indexes(lu_tile: Tile, ru_tile: Tile, ld_tile: Tile, rd_tile: Tile) -> bytes:
+    """Puts the color indexes of the 4 tiles next to each other, giving the color indexes of the 16x16 block."""
+    rows = []
 
-    def _replace_transparent_with_background(self, image):
-        # draw image on background layer, to fill transparent pixels
-        background = image.copy()
-        background.fill(self.bg_color)
+    for left_tile, right_tile in [(lu_tile, ru_tile), (ld_tile, rd_tile)]:
+        for row_start in range(0, Tile.PIXEL_COUNT, Tile.WIDTH):
+            rows.append(left_tile.color_indexes[row_start : row_start + Tile.WIDTH])
+            rows.append(right_tile.color_indexes[row_start : row_start + Tile.WIDTH])
 
-        _painter = QPainter(background)
-        _painter.drawImage(QPoint(), image)
-        _painter.end()
+    return b"".join(rows)
 
-        return background
 
+@lru_cache(2 ** 8)
+def _draw_color_table(palette: bytes, background_color_index: int, selected: bool, transparent: bool) -> List[int]:
+    color_table = color_table_for_palette(palette)
 
-def _image_only_one_color(image):
-    copy = image.copy()
+    if selected:
+        color_table = [selection_overlay_color(color) for color in color_table]
 
-    copy.convertTo(QImage.Format_Indexed8)
+    if transparent:
+        color_table[background_color_index] = TRANSPARENT
+    else:
+        # the background is never marked as selected
+        color_table[background_color_index] = NESPalette[palette[background_color_index]].rgb()
 
-    return copy.colorCount() == 1
+    return color_table
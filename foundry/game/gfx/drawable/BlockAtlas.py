@@ -0,0 +1,121 @@
+from PySide2.QtCore import QRect
+from PySide2.QtGui import QPainter, QPixmap, Qt
+
+from foundry.game.File import ROM
+from foundry.game.gfx.GraphicsSet import GraphicsSet
+from foundry.game.gfx.Palette import PaletteGroup
+from foundry.game.gfx.drawable.Block import get_block
+from foundry.game.gfx.drawable.DrawableCache import drawable_cache
+
+BLOCKS_PER_ROW = 16
+BLOCK_COUNT = 0x100
+
+
+def get_block_atlas(
+    palette_group: PaletteGroup,
+    graphics_set: GraphicsSet,
+    tsa_data: bytes,
+    block_length: int,
+    selected: bool = False,
+    transparent: bool = False,
+) -> "BlockAtlas":
+    # the colors of all palettes are part of the key, so a changed palette never gets an outdated atlas
+    colors = b"".join(bytes(palette) for palette in palette_group.palettes)
+
+    key = (
+        "block atlas",
+        id(palette_group),
+        colors,
+        graphics_set.chr_generation,
+        graphics_set.number,
+        tsa_data,
+        block_length,
+        selected,
+        transparent,
+    )
+
+    return drawable_cache.get(
+        key,
+        lambda: BlockAtlas(palette_group, graphics_set, tsa_data, block_length, selected, transparent),
+        BlockAtlas.memory_size,
+        tag=palette_group.cache_tag,
+    )
+
+
+class BlockAtlas:
+    """
+    All blocks of an object set, drawn at one size, in a single pixmap. Drawing a block is then just copying a part of
+    it, instead of looking up the Block and its image first.
+    """
+
+    def __init__(
+        self,
+        palette_group: PaletteGroup,
+        graphics_set: GraphicsSet,
+        tsa_data: bytes,
+        block_length: int,
+        selected: bool = False,
+        transparent: bool = False,
+    ):
+        self.block_length = block_length
+
+        side_length = BLOCKS_PER_ROW * block_length
+
+        self.pixmap = QPixmap(side_length, side_length)
+        self.pixmap.fill(Qt.transparent)
+
+        # a block doesn't have to be drawn at all, if it doesn't consist of anything but transparent pixels
+        self.invisible_blocks = set()
+
+        # x, y, width and height of every block in the pixmap, to give to QPainter.drawPixmap directly
+        self._sources = [self.source(block_index).getRect() for block_index in range(BLOCK_COUNT)]
+
+        # single blocks to tile with, only copied out of the atlas, when needed
+        self._block_pixmaps = {}
+
+        painter = QPainter(self.pixmap)
+
+        for block_index in range(BLOCK_COUNT):
+            block = get_block(block_index, palette_group, graphics_set, tsa_data)
+
+            block.draw(painter, *self.source(block_index).topLeft().toTuple(), block_length, selected, transparent)
+
+            if transparent and block.whole_block_is_transparent:
+                self.invisible_blocks.add(block_index)
+
+        painter.end()
+
+    def memory_size(self) -> int:
+        # the single block pixmaps are added over time and take up at most as much memory as the atlas itself
+        return 2 * self.pixmap.width() * self.pixmap.height() * self.pixmap.depth() // 8
+
+    def source(self, block_index: int) -> QRect:
+        """The part of the pixmap, that shows the block with the given index."""
+        return QRect(
+            (block_index % BLOCKS_PER_ROW) * self.block_length,
+            (block_index // BLOCKS_PER_ROW) * self.block_length,
+            self.block_length,
+            self.block_length,
+        )
+
+    def draw(self, painter: QPainter, block_index: int, x: int, y: int):
+        if block_index > 0xFF:
+            block_index = ROM().get_byte(block_index)  # block_index is an offset into the graphic memory
+
+        if block_index in self.invisible_blocks:
+            return
+
+        painter.drawPixmap(x, y, self.pixmap, *self._sources[block_index])
+
+    def draw_tiled(self, painter: QPainter, block_index: int, rect: QRect):
+        """Fills the given rect with the block, in one go, instead of drawing it block by block."""
+        if block_index > 0xFF:
+            block_index = ROM().get_byte(block_index)
+
+        if block_index in self.invisible_blocks:
+            return
+
+        if block_index not in self._block_pixmaps:
+            self._block_pixmaps[block_index] = self.pixmap.copy(self.source(block_index))
+
+        painter.drawTiledPixmap(rect, self._block_pixmaps[block_index])
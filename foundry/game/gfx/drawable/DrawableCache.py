@@ -0,0 +1,140 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Set, Tuple
+
+DEFAULT_BUDGET = 64 * 1024 * 1024  # byte
+
+
+class DrawableCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int  # byte
+    budget: int  # byte
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+
+        if lookups == 0:
+            return 0.0
+
+        return self.hits / lookups
+
+
+class DrawableCache:
+    """
+    A least recently used cache for Tiles, Blocks and their drawn images, which is bounded by the (estimated) memory its
+    entries take up, instead of by the number of entries.
+
+    Entries can be tagged, for example with the palette group they were drawn with, so they can be invalidated together,
+    when that palette group changes.
+    """
+
+    def __init__(self, budget: int = DEFAULT_BUDGET):
+        self._budget = budget
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, Optional[Hashable]]]" = OrderedDict()
+        self._keys_by_tag: Dict[Hashable, Set[Hashable]] = {}
+
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    @budget.setter
+    def budget(self, budget: int):
+        self._budget = budget
+
+        self._evict()
+
+    def get(self, key: Hashable, create: Callable[[], Any], size_of: Callable[[Any], int], tag: Hashable = None):
+        """
+        Returns the value cached under the given key, or creates, caches and returns it.
+
+        :param key: Needs to include everything the value depends on, for example the colors of the palette.
+        :param create: Creates the value, if it wasn't cached.
+        :param size_of: Estimates how many bytes of memory the created value takes up.
+        :param tag: Optional tag, to invalidate the entry by, using invalidate().
+        """
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+            return self._entries[key][0]
+
+        self.misses += 1
+
+        value = create()
+        size = size_of(value)
+
+        self._entries[key] = (value, size, tag)
+        self.size += size
+
+        if tag is not None:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+
+        self._evict()
+
+        return value
+
+    def invalidate(self, tag: Hashable):
+        """Removes all entries, that were cached with the given tag."""
+        for key in self._keys_by_tag.pop(tag, set()):
+            self._remove(key)
+
+    def discard(self, key: Hashable):
+        """Removes the entry cached under the given key, if there is one."""
+        if key not in self._entries:
+            return
+
+        self._untag(key)
+        self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_tag.clear()
+
+        self.size = 0
+
+    def info(self) -> DrawableCacheInfo:
+        return DrawableCacheInfo(self.hits, self.misses, self.evictions, len(self._entries), self.size, self._budget)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable):
+        return key in self._entries
+
+    def _evict(self):
+        while self.size > self._budget and self._entries:
+            oldest_key = next(iter(self._entries))
+
+            self._untag(oldest_key)
+            self._remove(oldest_key)
+
+            self.evictions += 1
+
+    def _untag(self, key: Hashable):
+        tag = self._entries[key][2]
+
+        if tag is None:
+            return
+
+        self._keys_by_tag[tag].discard(key)
+
+        if not self._keys_by_tag[tag]:
+            del self._keys_by_tag[tag]
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+
+        self.size -= size
+
+
+drawable_cache = DrawableCache()
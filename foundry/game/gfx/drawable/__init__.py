@@ -1,264 +1,62 @@
 from PySide2.QtCore import QPoint
-from PySide2.QtGui import QColor, QPainter
+from PySide2.QtGui import QColor, QImage, QPainter, Qt
+
+TILE_SIDE_LENGTH = 8  # pixel
+TILE_PIXEL_COUNT = TILE_SIDE_LENGTH * TILE_SIDE_LENGTH
+TILE_SIZE = 2 * TILE_PIXEL_COUNT // 8  # 1 pixel is defined by 2 bits
+
+BIT_PLANE_OFFSET = 8  # both bits describing the color of a pixel are in separate 8 byte chunks at the same index
+
+
+def _spread_bits(byte: int) -> int:
+    """Moves every bit of the given byte into its own byte, keeping their order. 0b101 becomes 0x010001."""
+    spread = 0
+
+    for bit in range(8):
+        if byte & (1 << bit):
+            spread |= 1 << (8 * bit)
+
+    return spread
+
+
+_LOW_BIT_PLANE = [_spread_bits(byte) for byte in range(0x100)]
+_HIGH_BIT_PLANE = [spread << 1 for spread in _LOW_BIT_PLANE]
+
+
+def decode_2bpp(chr_data: bytes) -> bytes:
+    """
+    Decodes NES CHR data into color indices, one byte per pixel.
+
+    Every tile is 16 bytes long. The first 8 bytes hold the low bit of every pixel in a row, the next 8 bytes the high
+    bit. Instead of testing every pixel on its own, every row of 8 pixels is looked up at once.
+
+    :param chr_data: The CHR data of any number of tiles. Incomplete tiles at the end are ignored.
+
+    :return: The color indices (0-3) of all tiles, tile after tile and row after row, so that the index of a pixel is
+        (tile_index * 8 + y) * 8 + x.
+    """
+    data = bytes(chr_data)
+    rows = []
+
+    for tile_start in range(0, len(data) - TILE_SIZE + 1, TILE_SIZE):
+        for row in range(tile_start, tile_start + TILE_SIDE_LENGTH):
+            rows.append(
+                (_LOW_BIT_PLANE[data[row]] | _HIGH_BIT_PLANE[data[row + BIT_PLANE_OFFSET]]).to_bytes(
+                    TILE_SIDE_LENGTH, "big"
+                )
+            )
+
+    return b"".join(rows)
+
+
+def mirror_tile(color_indexes: bytes) -> bytes:
+    """Flips the color indices of a single decoded tile horizontally."""
+    return b"".join(
+        color_indexes[row_start : row_start + TILE_SIDE_LENGTH][::-1]
+        for row_start in range(0, TILE_PIXEL_COUNT, TILE_SIDE_LENGTH)
+    )
+
 
-bit_reverse = [
-    0x00,
-    0x80,
-    0x40,
-    0xC0,
-    0x20,
-    0xA0,
-    0x60,
-    0xE0,
-    0x10,
-    0x90,
-    0x50,
-    0xD0,
-    0x30,
-    0xB0,
-    0x70,
-    0xF0,
-    0x08,
-    0x88,
-    0x48,
-    0xC8,
-    0x28,
-    0xA8,
-    0x68,
-    0xE8,
-    0x18,
-    0x98,
-    0x58,
-    0xD8,
-    0x38,
-    0xB8,
-    0x78,
-    0xF8,
-    0x04,
-    0x84,
-    0x44,
-    0xC4,
-    0x24,
-    0xA4,
-    0x64,
-    0xE4,
-    0x14,
-    0x94,
-    0x54,
-    0xD4,
-    0x34,
-    0xB4,
-    0x74,
-    0xF4,
-    0x0C,
-    0x8C,
-    0x4C,
-    0xCC,
-    0x2C,
-    0xAC,
-    0x6C,
-    0xEC,
-    0x1C,
-    0x9C,
-    0x5C,
-    0xDC,
-    0x3C,
-    0xBC,
-    0x7C,
-    0xFC,
-    0x02,
-    0x82,
-    0x42,
-    0xC2,
-    0x22,
-    0xA2,
-    0x62,
-    0xE2,
-    0x12,
-    0x92,
-    0x52,
-    0xD2,
-    0x32,
-    0xB2,
-    0x72,
-    0xF2,
-    0x0A,
-    0x8A,
-    0x4A,
-    0xCA,
-    0x2A,
-    0xAA,
-    0x6A,
-    0xEA,
-    0x1A,
-    0x9A,
-    0x5A,
-    0xDA,
-    0x3A,
-    0xBA,
-    0x7A,
-    0xFA,
-    0x06,
-    0x86,
-    0x46,
-    0xC6,
-    0x26,
-    0xA6,
-    0x66,
-    0xE6,
-    0x16,
-    0x96,
-    0x56,
-    0xD6,
-    0x36,
-    0xB6,
-    0x76,
-    0xF6,
-    0x0E,
-    0x8E,
-    0x4E,
-    0xCE,
-    0x2E,
-    0xAE,
-    0x6E,
-    0xEE,
-    0x1E,
-    0x9E,
-    0x5E,
-    0xDE,
-    0x3E,
-    0xBE,
-    0x7E,
-    0xFE,
-    0x01,
-    0x81,
-    0x41,
-    0xC1,
-    0x21,
-    0xA1,
-    0x61,
-    0xE1,
-    0x11,
-    0x91,
-    0x51,
-    0xD1,
-    0x31,
-    0xB1,
-    0x71,
-    0xF1,
-    0x09,
-    0x89,
-    0x49,
-    0xC9,
-    0x29,
-    0xA9,
-    0x69,
-    0xE9,
-    0x19,
-    0x99,
-    0x59,
-    0xD9,
-    0x39,
-    0xB9,
-    0x79,
-    0xF9,
-    0x05,
-    0x85,
-    0x45,
-    0xC5,
-    0x25,
-    0xA5,
-    0x65,
-    0xE5,
-    0x15,
-    0x95,
-    0x55,
-    0xD5,
-    0x35,
-    0xB5,
-    0x75,
-    0xF5,
-    0x0D,
-    0x8D,
-    0x4D,
-    0xCD,
-    0x2D,
-    0xAD,
-    0x6D,
-    0xED,
-    0x1D,
-    0x9D,
-    0x5D,
-    0xDD,
-    0x3D,
-    0xBD,
-    0x7D,
-    0xFD,
-    0x03,
-    0x83,
-    0x43,
-    0xC3,
-    0x23,
-    0xA3,
-    0x63,
-    0xE3,
-    0x13,
-    0x93,
-    0x53,
-    0xD3,
-    0x33,
-    0xB3,
-    0x73,
-    0xF3,
-    0x0B,
-    0x8B,
-    0x4B,
-    0xCB,
-    0x2B,
-    0xAB,
-    0x6B,
-    0xEB,
-    0x1B,
-    0x9B,
-    0x5B,
-    0xDB,
-    0x3B,
-    0xBB,
-    0x7B,
-    0xFB,
-    0x07,
-    0x87,
-    0x47,
-    0xC7,
-    0x27,
-    0xA7,
-    0x67,
-    0xE7,
-    0x17,
-    0x97,
-    0x57,
-    0xD7,
-    0x37,
-    0xB7,
-    0x77,
-    0xF7,
-    0x0F,
-    0x8F,
-    0x4F,
-    0xCF,
-    0x2F,
-    0xAF,
-    0x6F,
-    0xEF,
-    0x1F,
-    0x9F,
-    0x5F,
-    0xDF,
-    0x3F,
-    0xBF,
-    0x7F,
-    0xFF,
-]
 MASK_COLOR = [0xFF, 0x00, 0xFF]
 
 SELECTION_OVERLAY_COLOR = QColor(20, 87, 159, 80)
@@ -272,3 +70,19 @@ def apply_selection_overlay(image, mask):
     _painter = QPainter(image)
     _painter.drawImage(QPoint(), overlay)
     _painter.end()
+
+
+def selection_overlay_color(color: int) -> int:
+    """
+    :param color: An ARGB value of an opaque color.
+
+    :return: The ARGB value, the color has, after apply_selection_overlay was used on it.
+    """
+    image = QImage(1, 1, QImage.Format_ARGB32_Premultiplied)
+    image.fill(color)
+
+    mask = image.createMaskFromColor(QColor(*MASK_COLOR).rgb(), Qt.MaskOutColor)
+
+    apply_selection_overlay(image, mask)
+
+    return image.pixel(0, 0)
@@ -0,0 +1,89 @@
+from foundry.game.gfx.drawable.DrawableCache import DrawableCache
+
+
+def test_cache_hit():
+    # GIVEN a cache with an entry
+    cache = DrawableCache(budget=100)
+    cache.get("key", lambda: "value", len)
+
+    # WHEN the entry is asked for again
+    value = cache.get("key", lambda: "other value", len)
+
+    # THEN the cached value is returned and counted as a hit
+    assert value == "value"
+    assert cache.info().hits == 1
+    assert cache.info().misses == 1
+    assert cache.info().hit_rate == 0.5
+
+
+def test_cache_stays_in_budget():
+    # GIVEN a cache, which can hold 3 entries of size 10
+    cache = DrawableCache(budget=30)
+
+    # WHEN 4 entries are added and the first one was used recently
+    for key in range(3):
+        cache.get(key, lambda: "x" * 10, len)
+
+    cache.get(0, lambda: "x" * 10, len)
+    cache.get(3, lambda: "x" * 10, len)
+
+    # THEN the least recently used entry was evicted
+    assert 1 not in cache
+    assert all(key in cache for key in [0, 2, 3])
+
+    assert cache.info().size == 30
+    assert cache.info().evictions == 1
+
+
+def test_cache_budget_change():
+    # GIVEN a cache with entries
+    cache = DrawableCache(budget=30)
+
+    for key in range(3):
+        cache.get(key, lambda: "x" * 10, len)
+
+    # WHEN the budget is lowered
+    cache.budget = 10
+
+    # THEN only the most recent entry is kept
+    assert len(cache) == 1
+    assert 2 in cache
+
+
+def test_cache_invalidate():
+    # GIVEN a cache with entries of different tags
+    cache = DrawableCache()
+
+    cache.get("first", lambda: "a", len, tag="palette 1")
+    cache.get("second", lambda: "b", len, tag="palette 1")
+    cache.get("third", lambda: "c", len, tag="palette 2")
+
+    # WHEN one of the tags is invalidated
+    cache.invalidate("palette 1")
+
+    # THEN only the entries with the other tag are kept
+    assert "first" not in cache
+    assert "second" not in cache
+    assert "third" in cache
+
+    assert cache.info().size == 1
+
+
+def test_cache_discard():
+    # GIVEN a cache with tagged entries
+    cache = DrawableCache()
+
+    cache.get("first", lambda: "a", len, tag="palette 1")
+    cache.get("second", lambda: "b", len, tag="palette 1")
+
+    # WHEN one entry is discarded
+    cache.discard("first")
+
+    # THEN only that entry is gone and invalidating its tag still works
+    assert "first" not in cache
+    assert "second" in cache
+
+    cache.invalidate("palette 1")
+
+    assert len(cache) == 0
+    assert cache.info().size == 0
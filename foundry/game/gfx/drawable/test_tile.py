@@ -0,0 +1,91 @@
+import pytest
+from PySide2.QtGui import QColor, QImage
+
+from foundry.game.File import ROM
+from foundry.game.gfx.GraphicsSet import GraphicsSet
+from foundry.game.gfx.Palette import color_table_for_palette, load_palette_group
+from foundry.game.gfx.drawable import MASK_COLOR, TILE_PIXEL_COUNT, TILE_SIZE, decode_2bpp, mirror_tile
+from foundry.game.gfx.drawable.Block import Block
+from foundry.game.gfx.drawable.Tile import Tile
+
+
+def _decode_pixel_by_pixel(chr_data: bytes) -> bytes:
+    color_indexes = bytearray()
+
+    for tile_start in range(0, len(chr_data), TILE_SIZE):
+        for pixel in range(TILE_PIXEL_COUNT):
+            byte_index = tile_start + pixel // 8
+            bit = 0x80 >> (pixel % 8)
+
+            low_bit = int(bool(chr_data[byte_index] & bit))
+            high_bit = int(bool(chr_data[byte_index + 8] & bit))
+
+            color_indexes.append(high_bit << 1 | low_bit)
+
+    return bytes(color_indexes)
+
+
+def test_decode_2bpp():
+    # GIVEN the CHR data of a graphics set
+    chr_data = GraphicsSet(1).data
+
+    # WHEN it is decoded in one go
+    color_indexes = decode_2bpp(chr_data)
+
+    # THEN every pixel has the same color index, as if it was decoded on its own
+    assert color_indexes == _decode_pixel_by_pixel(chr_data)
+
+
+def test_mirror_tile():
+    # GIVEN a tile, with a different color index in every column
+    color_indexes = bytes([0, 1, 2, 3, 3, 2, 1, 1] * 8)
+
+    # WHEN it is mirrored
+    mirrored = mirror_tile(color_indexes)
+
+    # THEN every row is reversed
+    assert mirrored == bytes([1, 1, 2, 3, 3, 2, 1, 0] * 8)
+
+
+@pytest.mark.parametrize("mirrored", [False, True])
+def test_tile_uses_decoded_graphics_set(mirrored):
+    # GIVEN a graphics set
+    graphics_set = GraphicsSet(1)
+
+    # WHEN a tile is created
+    tile = Tile(0x20, graphics_set, mirrored)
+
+    # THEN its color indexes are taken from the decoded graphics set
+    expected = graphics_set.color_indexes[0x20 * TILE_PIXEL_COUNT : 0x21 * TILE_PIXEL_COUNT]
+
+    if mirrored:
+        expected = mirror_tile(expected)
+
+    assert tile.color_indexes == expected
+    assert tile.image.format() == QImage.Format_Indexed8
+
+    for pixel, color_index in enumerate(expected):
+        assert tile.image.pixelIndex(pixel % Tile.WIDTH, pixel // Tile.WIDTH) == color_index
+
+
+def test_block_follows_palette_changes():
+    # GIVEN a block of a palette group
+    graphics_set = GraphicsSet(1)
+    palette_group = load_palette_group(1, 0, use_cache=False)
+    tsa_data = ROM().get_tsa_data(1)
+
+    block = Block(0x40, palette_group, graphics_set, tsa_data)
+    tiles = [block.lu_tile, block.ru_tile, block.ld_tile, block.rd_tile]
+
+    # WHEN a color of its palette is changed
+    palette_group[block.palette_index][1] = (palette_group[block.palette_index][1] + 1) % 0x40
+
+    # THEN the block is drawn in the new colors, without creating new tiles
+    color_table = color_table_for_palette(palette_group[block.palette_index])
+    color_table[block.background_color_index] = QColor(*MASK_COLOR).rgb()
+
+    for tile, (x, y) in zip(tiles, [(0, 0), (Tile.WIDTH, 0), (0, Tile.HEIGHT), (Tile.WIDTH, Tile.HEIGHT)]):
+        for pixel, color_index in enumerate(tile.color_indexes):
+            assert block.image.pixel(x + pixel % Tile.WIDTH, y + pixel // Tile.WIDTH) == color_table[color_index]
+
+    assert tiles == [block.lu_tile, block.ru_tile, block.ld_tile, block.rd_tile]
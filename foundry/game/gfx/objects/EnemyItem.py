@@ -1,22 +1,47 @@
+from typing import Optional
+
 from PySide2.QtCore import QRect, QSize
 from PySide2.QtGui import QColor, QImage, QPainter, Qt
 
 from foundry.game.ObjectDefinitions import enemy_handle_x, enemy_handle_x2, enemy_handle_y
-from foundry.game.ObjectSet import ObjectSet
+from foundry.game.ObjectSet import load_object_set
 from foundry.game.gfx.Palette import PaletteGroup
-from foundry.game.gfx.GraphicsSet import GraphicsSet
+from foundry.game.gfx.GraphicsSet import load_graphics_set
 from foundry.game.gfx.drawable import apply_selection_overlay
 from foundry.game.gfx.drawable.Block import Block
 from foundry.game.gfx.objects.ObjectLike import ObjectLike
+from foundry.game.level.SpatialIndex import SpatialIndex
 from smb3parse.objects.object_set import ENEMY_ITEM_GRAPHICS_SET, ENEMY_ITEM_OBJECT_SET
 
 MASK_COLOR = [0xFF, 0x33, 0xFF]
 
 
 class EnemyObject(ObjectLike):
-    def __init__(self, data, png_data, palette_group: PaletteGroup):
+    __slots__ = (
+        "is_4byte",
+        "is_single_block",
+        "length",
+        "obj_index",
+        "x_position",
+        "y_position",
+        "domain",
+        "graphics_set",
+        "palette_group",
+        "object_set",
+        "png_data",
+        "selected",
+        "name",
+        "width",
+        "height",
+        "blocks",
+        "spatial_index",
+    )
+
+    def __init__(self, data, png_data, palette_group: PaletteGroup, spatial_index: Optional[SpatialIndex] = None):
         super(EnemyObject, self).__init__()
 
+        self.spatial_index = spatial_index if spatial_index is not None else SpatialIndex()
+
         self.is_4byte = False
         self.is_single_block = True
         self.length = 0
@@ -27,10 +52,10 @@ class EnemyObject(ObjectLike):
 
         self.domain = 0
 
-        self.graphics_set = GraphicsSet(ENEMY_ITEM_GRAPHICS_SET)
+        self.graphics_set = load_graphics_set(ENEMY_ITEM_GRAPHICS_SET)
         self.palette_group = palette_group
 
-        self.object_set = ObjectSet(ENEMY_ITEM_OBJECT_SET)
+        self.object_set = load_object_set(ENEMY_ITEM_OBJECT_SET)
 
         self.png_data = png_data
 
@@ -57,16 +82,19 @@ class EnemyObject(ObjectLike):
 
         self._render(obj_def)
 
-    def _render(self, obj_def):
-        self.blocks = []
+        self.spatial_index.forget(self)
 
-        block_ids = obj_def.object_design
+    def set_data(self, data: bytearray):
+        """Turns the enemy into the one described by the given bytes, as if it had been created from them."""
+        self.obj_index = data[0]
+        self.x_position = data[1] - enemy_handle_x2[self.obj_index]
+        self.y_position = data[2]
 
-        for block_id in block_ids:
-            x = (block_id % 64) * Block.WIDTH
-            y = (block_id // 64) * Block.WIDTH
+        self._setup()
 
-            self.blocks.append(self.png_data.copy(QRect(x, y, Block.WIDTH, Block.HEIGHT)))
+    def _render(self, obj_def):
+        # only the ids of the blocks in the sprite sheet, they are copied out of it, when they are drawn
+        self.blocks = obj_def.object_design
 
     def render(self):
         # nothing to re-render since enemies are just copied over
@@ -80,7 +108,7 @@ class EnemyObject(ObjectLike):
         :param bool use_offsets: Whether to use the additional offsets. Necessary when drawing in level, but not when
             rendering in the object toolbar, or in the object dropdown.
         """
-        for i, image in enumerate(self.blocks):
+        for i, block_id in enumerate(self.blocks):
             x = self.x_position + (i % self.width)
             y = self.y_position + (i // self.width)
 
@@ -94,7 +122,9 @@ class EnemyObject(ObjectLike):
             x += x_offset
             y += y_offset
 
-            block = image.copy()
+            block = self.png_data.copy(
+                QRect((block_id % 64) * Block.WIDTH, (block_id // 64) * Block.WIDTH, Block.WIDTH, Block.HEIGHT)
+            )
 
             mask = block.createMaskFromColor(QColor(*MASK_COLOR).rgb(), Qt.MaskOutColor)
             block.setAlphaChannel(mask)
@@ -127,6 +157,8 @@ class EnemyObject(ObjectLike):
         self.x_position = x
         self.y_position = y
 
+        self.spatial_index.forget(self)
+
     def move_by(self, dx, dy):
         new_x = self.x_position + dx
         new_y = self.y_position + dy
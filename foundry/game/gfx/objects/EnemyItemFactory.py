@@ -1,3 +1,5 @@
+from typing import Optional
+
 from PySide2.QtCore import QRect
 from PySide2.QtGui import QImage
 
@@ -5,12 +7,20 @@ from foundry import data_dir
 from foundry.game.gfx.Palette import load_palette_group
 from foundry.game.gfx.drawable.Block import Block
 from foundry.game.gfx.objects.EnemyItem import EnemyObject
-
+from foundry.game.level.SpatialIndex import SpatialIndex
 
 ENEMY_ITEM_SPRITE_SHEET = QImage(str(data_dir.joinpath("gfx.png")))
 
 ENEMY_ITEM_SPRITE_SHEET.convertTo(QImage.Format_RGB888)
 
+_rows_per_object_set = 256 // 64
+_y_offset = 12 * _rows_per_object_set * Block.HEIGHT
+
+# the same for every level, so it is only cut out once
+ENEMY_ITEM_SPRITES = ENEMY_ITEM_SPRITE_SHEET.copy(
+    QRect(0, _y_offset, ENEMY_ITEM_SPRITE_SHEET.width(), ENEMY_ITEM_SPRITE_SHEET.height() - _y_offset)
+)
+
 
 class EnemyItemFactory:
     object_set: int
@@ -18,19 +28,15 @@ class EnemyItemFactory:
 
     definitions: list = []
 
-    def __init__(self, object_set: int, palette_index: int):
-        rows_per_object_set = 256 // 64
-
-        y_offset = 12 * rows_per_object_set * Block.HEIGHT
-
-        self.png_data = ENEMY_ITEM_SPRITE_SHEET.copy(
-            QRect(0, y_offset, ENEMY_ITEM_SPRITE_SHEET.width(), ENEMY_ITEM_SPRITE_SHEET.height() - y_offset)
-        )
+    def __init__(self, object_set: int, palette_index: int, spatial_index: Optional[SpatialIndex] = None):
+        self.png_data = ENEMY_ITEM_SPRITES
 
         self.palette_group = load_palette_group(object_set, palette_index)
 
+        self.spatial_index = spatial_index if spatial_index is not None else SpatialIndex()
+
     def from_data(self, data, _):
-        return EnemyObject(data, self.png_data, self.palette_group)
+        return EnemyObject(data, self.png_data, self.palette_group, self.spatial_index)
 
     def from_properties(self, enemy_item_id: int, x: int, y: int):
         data = bytearray(3)
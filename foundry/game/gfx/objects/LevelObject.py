@@ -1,4 +1,5 @@
-from typing import List, Optional, Tuple, Union
+from itertools import groupby
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 from warnings import warn
 
 from PySide2.QtCore import QRect, QSize
@@ -6,12 +7,15 @@ from PySide2.QtGui import QImage, QPainter
 
 from foundry.game.File import ROM
 from foundry.game.ObjectDefinitions import EndType, GeneratorType
-from foundry.game.ObjectSet import ObjectSet
+from foundry.game.ObjectSet import load_object_set
 from foundry.game.gfx.GraphicsSet import GraphicsSet
 from foundry.game.gfx.Palette import PaletteGroup, bg_color_for_object_set
-from foundry.game.gfx.drawable.Block import Block, get_block
+from foundry.game.gfx.drawable.Block import Block
+from foundry.game.gfx.drawable.BlockAtlas import get_block_atlas
 from foundry.game.gfx.objects.EnemyItem import EnemyObject
 from foundry.game.gfx.objects.ObjectLike import EXPANDS_BOTH, EXPANDS_HORIZ, EXPANDS_NOT, EXPANDS_VERT, ObjectLike
+from foundry.game.level.ColumnTops import ColumnTops
+from foundry.game.level.SpatialIndex import SpatialIndex
 from smb3parse.objects.object_set import PLAINS_OBJECT_SET
 
 SKY = 0
@@ -51,6 +55,52 @@ BLANK = -1
 SCREEN_HEIGHT = 15
 SCREEN_WIDTH = 16
 
+# these objects fill the level from their position to the right and down to the ground, instead of what they render
+SPECIAL_BACKGROUND_OBJECTS = [
+    "blue background",
+    "starry background",
+    "underground background under this",
+    "sets background to actual background color",
+]
+
+# only worked out, when they are first needed, so loading a level, or looking at just the positions and types of its
+# objects, like the level size bar and the warnings do, doesn't have to render them
+RENDERED_ATTRIBUTES = {
+    "rendered_base_x",
+    "rendered_base_y",
+    "rendered_width",
+    "rendered_height",
+    "rendered_blocks",
+    "rect",
+}
+
+# these generators depend on where the object is, or on the objects before it, so what they render can't be reused
+POSITION_DEPENDENT_GENERATORS = [
+    GeneratorType.TO_THE_SKY,
+    GeneratorType.HORIZ_TO_GROUND,
+    GeneratorType.PYRAMID_TO_GROUND,
+    GeneratorType.PYRAMID_2,
+    GeneratorType.ENDING,
+]
+
+BLACK_BOSS_ROOM_BACKGROUND = "black boss room background"
+
+MAX_RENDER_PATTERNS = 4096
+
+
+class RenderPattern(NamedTuple):
+    """The blocks an object renders and their size, with where they start, relative to the position of the object."""
+
+    blocks: Tuple[int, ...]
+    width: int
+    height: int
+    offset_x: int
+    offset_y: int
+
+
+# render patterns of all objects, no matter the level, toolbox or dropdown they are in, by object_info and lengths
+_render_patterns: Dict[Tuple[int, int, int, int, int, bool], Optional[RenderPattern]] = {}
+
 
 def get_minimal_icon_object(
     level_object: Union["LevelObject", EnemyObject]
@@ -65,6 +115,10 @@ def get_minimal_icon_object(
     if isinstance(level_object, EnemyObject):
         return level_object
 
+    # icons show the object rendered with the regular ground, unless it has to be lengthened below
+    if not level_object.is_rendered:
+        level_object.render()
+
     level_object.ground_level = 3
 
     while (
@@ -81,6 +135,41 @@ def get_minimal_icon_object(
 
 
 class LevelObject(ObjectLike):
+    # a level can have thousands of objects, which don't need a dict each
+    __slots__ = (
+        "object_set",
+        "graphics_set",
+        "tsa_data",
+        "palette_group",
+        "x_position",
+        "y_position",
+        "original_x",
+        "original_y",
+        "index_in_level",
+        "objects_ref",
+        "column_tops",
+        "spatial_index",
+        "vertical_level",
+        "data",
+        "selected",
+        "size_minimal",
+        "ground_level",
+        "domain",
+        "_obj_index",
+        "type",
+        "is_single_block",
+        "_length",
+        "secondary_length",
+        "width",
+        "height",
+        "orientation",
+        "ending",
+        "name",
+        "blocks",
+        "is_4byte",
+        *RENDERED_ATTRIBUTES,
+    )
+
     def __init__(
         self,
         data: bytearray,
@@ -91,22 +180,22 @@ class LevelObject(ObjectLike):
         is_vertical: bool,
         index: int,
         size_minimal: bool = False,
+        column_tops: Optional[ColumnTops] = None,
+        spatial_index: Optional[SpatialIndex] = None,
     ):
-        self.object_set = ObjectSet(object_set)
+        self.object_set = load_object_set(object_set)
 
         self.graphics_set = graphics_set
-        self.tsa_data = ROM.get_tsa_data(object_set)
 
         self.x_position = 0
         self.y_position = 0
 
-        self.rendered_base_x = 0
-        self.rendered_base_y = 0
-
         self.palette_group = palette_group
 
         self.index_in_level = index
         self.objects_ref = objects_ref
+        self.column_tops = column_tops if column_tops is not None else ColumnTops(objects_ref)
+        self.spatial_index = spatial_index if spatial_index is not None else SpatialIndex()
         self.vertical_level = is_vertical
 
         self.data = data
@@ -158,9 +247,8 @@ class LevelObject(ObjectLike):
         self.ending = EndType(object_data.ending)
         self.name = object_data.description
 
-        self.blocks = [int(block) for block in object_data.rom_object_design]
-
-        self.block_cache = {}
+        # shared with all objects of the same type, so never to be changed
+        self.blocks = object_data.rom_object_design
 
         self.is_4byte = object_data.is_4byte
 
@@ -174,9 +262,46 @@ class LevelObject(ObjectLike):
 
         self._calculate_lengths()
 
-        self.rect = QRect()
+        self._forget_rendering()
 
-        self._render()
+    def set_data(self, data: bytearray):
+        """Turns the object into the one described by the given bytes, as if it had been created from them."""
+        self.data = data
+
+        self._setup()
+
+    def __getattr__(self, name: str):
+        # only called for attributes, which are not set (yet)
+        if name in RENDERED_ATTRIBUTES:
+            self._render()
+        elif name == "tsa_data":
+            self.tsa_data = ROM.get_tsa_data(self.object_set.number)
+        else:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        # doesn't end up in __getattr__ again, if the attribute is still not set
+        return object.__getattribute__(self, name)
+
+    @property
+    def is_rendered(self) -> bool:
+        """Whether the blocks of the object are rendered, so reading them doesn't have to render them first."""
+        try:
+            object.__getattribute__(self, "rendered_blocks")
+        except AttributeError:
+            return False
+
+        return True
+
+    def _forget_rendering(self):
+        """Drops the rendered blocks and their position, so they are rendered again, when they are needed next."""
+        for name in RENDERED_ATTRIBUTES:
+            try:
+                object.__delattr__(self, name)
+            except AttributeError:
+                pass
+
+        self.column_tops.forget(self)
+        self.spatial_index.forget(self)
 
     @property
     def obj_index(self):
@@ -225,17 +350,86 @@ class LevelObject(ObjectLike):
         self._render()
 
     def _render(self):
-        self.rendered_base_x = base_x = self.x_position
-        self.rendered_base_y = base_y = self.y_position
+        self.rendered_base_x = self.x_position
+        self.rendered_base_y = self.y_position
 
-        self.rendered_width = new_width = self.width
-        self.rendered_height = new_height = self.height
+        self.rendered_width = self.width
+        self.rendered_height = self.height
 
-        try:
-            self.index_in_level = self.objects_ref.index(self)
-        except ValueError:
-            # the object has not been added yet, so stick with the one given in the constructor
-            pass
+        if self.is_position_independent():
+            key = (*self.object_info, self.length, self.secondary_length, self.vertical_level)
+
+            try:
+                pattern = _render_patterns[key]
+            except KeyError:
+                pattern = self._render_pattern()
+
+                if len(_render_patterns) >= MAX_RENDER_PATTERNS:
+                    # forget the oldest pattern
+                    del _render_patterns[next(iter(_render_patterns))]
+
+                _render_patterns[key] = pattern
+        else:
+            pattern = self._render_pattern()
+
+        if pattern is None:
+            # the object can't be rendered, so it takes up no space at its position
+            self.rendered_blocks = []
+            self.rendered_width = self.rendered_height = 0
+            self.rect = QRect(self.rendered_base_x, self.rendered_base_y, 0, 0)
+
+            self.column_tops.update(self)
+            self.spatial_index.update(self, self.rect)
+            return
+
+        blocks_to_draw, new_width, new_height, offset_x, offset_y = pattern
+
+        base_x = self.x_position + offset_x
+        base_y = self.y_position + offset_y
+
+        # for not yet implemented objects and single block objects
+        if blocks_to_draw:
+            self.rendered_blocks = blocks_to_draw
+        else:
+            self.rendered_blocks = self.blocks
+
+        self.rendered_width = new_width
+        self.rendered_height = new_height
+        self.rendered_base_x = base_x
+        self.rendered_base_y = base_y
+
+        if new_width and not self.rendered_height == len(self.rendered_blocks) / new_width:
+            warn(
+                f"Not enough Blocks for calculated height: {self.name}. "
+                f"Blocks for height: {len(self.rendered_blocks) / new_width}. Rendered height: {self.rendered_height}",
+                RuntimeWarning,
+            )
+
+            self.rendered_height = len(self.rendered_blocks) / new_width
+        elif new_width == 0:
+            warn(
+                f"Calculated Width is 0, setting to 1: {self.name}. "
+                f"Blocks to draw: {len(self.rendered_blocks)}. Rendered height: {self.rendered_height}",
+                RuntimeWarning,
+            )
+
+            self.rendered_width = 1
+
+        self.rect = QRect(self.rendered_base_x, self.rendered_base_y, self.rendered_width, self.rendered_height)
+
+        self.column_tops.update(self)
+        self.spatial_index.update(self, self.rect)
+
+    def is_position_independent(self) -> bool:
+        """Whether the object renders the same blocks, no matter where it is, and which objects are around it."""
+        return self.orientation not in POSITION_DEPENDENT_GENERATORS and self.name.lower() != BLACK_BOSS_ROOM_BACKGROUND
+
+    def _render_pattern(self) -> Optional[RenderPattern]:
+        base_x = self.x_position
+        base_y = self.y_position
+
+        new_width = self.width
+        new_height = self.height
 
         blocks_to_draw = []
 
@@ -351,8 +545,7 @@ class LevelObject(ObjectLike):
             else:
                 # todo other two ends not used with diagonals?
                 warn(f"{self.name} was not rendered.", RuntimeWarning)
-                self.rendered_blocks = []
-                return
+                return None
 
             rows = []
 
@@ -397,19 +590,16 @@ class LevelObject(ObjectLike):
 
             base_x += 1  # set the new base_x to the tip of the pyramid
 
-            for y in range(base_y, self.ground_level):
-                new_height = y - base_y
-                new_width = 2 * new_height
+            if base_y < self.ground_level:
+                # a row y of the pyramid covers the columns up to 2 * (y - base_y) right of its tip
+                ground = self.ground_level - 1
 
-                bottom_row = QRect(base_x, y, new_width, 1)
+                for x, top in self.column_tops.tops_before(self, base_x, base_x + 2 * (self.ground_level - 1 - base_y)):
+                    if base_y <= top < ground and x - base_x < 2 * (top - base_y):
+                        ground = top
 
-                if any(
-                    [
-                        bottom_row.intersects(obj.get_rect()) and y == obj.get_rect().top()
-                        for obj in self.objects_ref[0 : self.index_in_level]
-                    ]
-                ):
-                    break
+                new_height = ground - base_y
+                new_width = 2 * new_height
 
             base_x = base_x - (new_width // 2)
 
@@ -545,21 +735,14 @@ class LevelObject(ObjectLike):
                 new_width -= 1
 
             if self.orientation == GeneratorType.HORIZ_TO_GROUND:
-                # to the ground only, until it hits something
-                for y in range(base_y, self.ground_level):
-                    bottom_row = QRect(base_x, y, new_width, 1)
-
-                    if any(
-                        [
-                            bottom_row.intersects(obj.get_rect()) and y == obj.get_rect().top()
-                            for obj in self.objects_ref[0 : self.index_in_level]
-                        ]
-                    ):
-                        new_height = y - base_y
-                        break
-                else:
-                    # nothing underneath this object, extend to the ground
-                    new_height = self.ground_level - base_y
+                # to the ground only, until it hits the top of an object before it
+                ground = self.ground_level
+
+                for _, top in self.column_tops.tops_before(self, base_x, base_x + new_width):
+                    if base_y <= top < ground:
+                        ground = top
+
+                new_height = ground - base_y
 
                 if self.is_single_block:
                     new_width = self.length
@@ -680,7 +863,7 @@ class LevelObject(ObjectLike):
                 warn(f"Didn't render {self.name}", RuntimeWarning)
                 # breakpoint()
 
-            if self.name.lower() == "black boss room background":
+            if self.name.lower() == BLACK_BOSS_ROOM_BACKGROUND:
                 new_width = SCREEN_WIDTH
                 new_height = SCREEN_HEIGHT
 
@@ -689,58 +872,34 @@ class LevelObject(ObjectLike):
 
                 blocks_to_draw = SCREEN_WIDTH * SCREEN_HEIGHT * [self.blocks[0]]
 
-        # for not yet implemented objects and single block objects
-        if blocks_to_draw:
-            self.rendered_blocks = blocks_to_draw
-        else:
-            self.rendered_blocks = self.blocks
+        return RenderPattern(
+            tuple(blocks_to_draw), new_width, new_height, base_x - self.x_position, base_y - self.y_position
+        )
 
-        self.rendered_width = new_width
-        self.rendered_height = new_height
-        self.rendered_base_x = base_x
-        self.rendered_base_y = base_y
+    def draw(self, painter: QPainter, block_length, transparent):
+        if not self.rendered_blocks:
+            return
 
-        if new_width and not self.rendered_height == len(self.rendered_blocks) / new_width:
-            warn(
-                f"Not enough Blocks for calculated height: {self.name}. "
-                f"Blocks for height: {len(self.rendered_blocks) / new_width}. Rendered height: {self.rendered_height}",
-                RuntimeWarning,
-            )
+        atlas = get_block_atlas(
+            self.palette_group, self.graphics_set, self.tsa_data, block_length, self.selected, transparent
+        )
 
-            self.rendered_height = len(self.rendered_blocks) / new_width
-        elif new_width == 0:
-            warn(
-                f"Calculated Width is 0, setting to 1: {self.name}. "
-                f"Blocks to draw: {len(self.rendered_blocks)}. Rendered height: {self.rendered_height}",
-                RuntimeWarning,
-            )
+        for row_start in range(0, len(self.rendered_blocks), self.rendered_width):
+            y = (self.rendered_base_y + row_start // self.rendered_width) * block_length
+            x = self.rendered_base_x * block_length
 
-            self.rendered_width = 1
+            # runs of the same block are drawn in one go
+            for block_index, run in groupby(self.rendered_blocks[row_start : row_start + self.rendered_width]):
+                run_length = len(list(run))
 
-        self.rect = QRect(self.rendered_base_x, self.rendered_base_y, self.rendered_width, self.rendered_height)
+                if block_index == BLANK:
+                    pass
+                elif run_length == 1:
+                    atlas.draw(painter, block_index, x, y)
+                else:
+                    atlas.draw_tiled(painter, block_index, QRect(x, y, run_length * block_length, block_length))
 
-    def draw(self, painter: QPainter, block_length, transparent):
-        for index, block_index in enumerate(self.rendered_blocks):
-            if block_index == BLANK:
-                continue
-
-            x = self.rendered_base_x + index % self.rendered_width
-            y = self.rendered_base_y + index // self.rendered_width
-
-            self._draw_block(painter, block_index, x, y, block_length, transparent)
-
-    def _draw_block(self, painter: QPainter, block_index, x, y, block_length, transparent):
-        if block_index not in self.block_cache:
-            self.block_cache[block_index] = get_block(block_index, self.palette_group, self.graphics_set, self.tsa_data)
-
-        self.block_cache[block_index].draw(
-            painter,
-            x * block_length,
-            y * block_length,
-            block_length=block_length,
-            selected=self.selected,
-            transparent=transparent,
-        )
+                x += run_length * block_length
 
     def set_position(self, x, y):
         # todo also check for the upper bounds
@@ -942,6 +1101,9 @@ class LevelObject(ObjectLike):
         return QSize(self.rendered_width * Block.SIDE_LENGTH, self.rendered_height * Block.SIDE_LENGTH) * zoom_factor
 
     def as_image(self) -> QImage:
+        # render first, so the moved position isn't overwritten by rendering on demand
+        self.render()
+
         self.rendered_base_x = 0
         self.rendered_base_y = 0
 
@@ -3,7 +3,9 @@ from typing import Optional, List
 from foundry.game.gfx.objects.Jump import Jump
 from foundry.game.gfx.objects.LevelObject import LevelObject, SCREEN_HEIGHT, SCREEN_WIDTH
 from foundry.game.gfx.Palette import load_palette_group
-from foundry.game.gfx.GraphicsSet import GraphicsSet
+from foundry.game.gfx.GraphicsSet import GraphicsSet, load_graphics_set
+from foundry.game.level.ColumnTops import ColumnTops
+from foundry.game.level.SpatialIndex import SpatialIndex
 
 
 class LevelObjectFactory:
@@ -22,11 +24,15 @@ class LevelObjectFactory:
         objects_ref: List[LevelObject],
         vertical_level: bool,
         size_minimal: bool = False,
+        column_tops: Optional[ColumnTops] = None,
+        spatial_index: Optional[SpatialIndex] = None,
     ):
         self.set_object_set(object_set)
         self.set_graphic_set(graphic_set)
         self.set_palette_group_index(palette_group_index)
         self.objects_ref = objects_ref
+        self.column_tops = column_tops if column_tops is not None else ColumnTops(objects_ref)
+        self.spatial_index = spatial_index if spatial_index is not None else SpatialIndex()
         self.vertical_level = vertical_level
 
         self.size_minimal = size_minimal
@@ -36,7 +42,7 @@ class LevelObjectFactory:
 
     def set_graphic_set(self, graphic_set: int):
         self.graphic_set = graphic_set
-        self.graphics_set = GraphicsSet(self.graphic_set)
+        self.graphics_set = load_graphics_set(self.graphic_set)
 
     def set_palette_group_index(self, palette_group_index: int):
         self.palette_group_index = palette_group_index
@@ -58,6 +64,8 @@ class LevelObjectFactory:
             self.vertical_level,
             index,
             size_minimal=self.size_minimal,
+            column_tops=self.column_tops,
+            spatial_index=self.spatial_index,
         )
 
     def from_properties(
@@ -9,6 +9,8 @@ EXPANDS_BOTH = EXPANDS_HORIZ | EXPANDS_VERT
 
 
 class ObjectLike(abc.ABC):
+    __slots__ = ()
+
     obj_index: int
     domain: int
     name: str
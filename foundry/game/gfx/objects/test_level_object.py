@@ -3,11 +3,13 @@ from itertools import product
 from pathlib import Path
 
 import pytest
+from PySide2.QtCore import QRect
 
 from foundry import root_dir
 from foundry.conftest import compare_images
 from foundry.game.File import ROM
-from foundry.game.gfx.objects.LevelObject import get_minimal_icon_object
+from foundry.game.gfx.objects import LevelObject as level_object_module
+from foundry.game.gfx.objects.LevelObject import LevelObject, get_minimal_icon_object
 from foundry.game.gfx.objects.LevelObjectFactory import LevelObjectFactory
 from foundry.gui.ObjectViewer import ObjectDrawArea
 from smb3parse.objects import MAX_DOMAIN, MAX_ID_VALUE
@@ -138,6 +140,72 @@ def test_no_change_to_bytes():
     assert cloud_object.to_bytes() == cloud_bytes
 
 
+def test_object_is_rendered_on_demand():
+    # GIVEN an object, which was just created
+    object_factory = LevelObjectFactory(1, 1, 0, [], False)
+
+    cloud_object = object_factory.from_data(bytearray([0x00, 0x00, 0xE5]), 0)
+
+    assert not cloud_object.is_rendered
+
+    # WHEN its size is asked for
+    rect = cloud_object.get_rect()
+
+    # THEN it is rendered, and rendered again after it was changed
+    assert cloud_object.is_rendered
+    assert rect.size().toTuple() == (cloud_object.rendered_width, cloud_object.rendered_height)
+
+    cloud_object.increment_type()
+
+    assert not cloud_object.is_rendered
+    assert cloud_object.get_rect().isValid()
+
+
+def test_object_without_render_pattern_is_empty(monkeypatch):
+    # GIVEN objects, which can't be rendered, with the render patterns kept apart from the other tests
+    monkeypatch.setattr(level_object_module, "_render_patterns", {})
+    monkeypatch.setattr(LevelObject, "_render_pattern", lambda _: None)
+
+    object_factory = LevelObjectFactory(1, 1, 0, [], False)
+
+    first_cloud, second_cloud = [object_factory.from_data(bytearray([0x00, x, 0xE5]), 0) for x in (5, 10)]
+
+    # WHEN they are rendered, the second one out of the remembered pattern
+    # THEN they take up no space at their positions
+    assert first_cloud.get_rect() == QRect(5, 0, 0, 0)
+    assert second_cloud.get_rect() == QRect(10, 0, 0, 0)
+
+    assert second_cloud.rendered_blocks == []
+
+
+@pytest.mark.parametrize(
+    "object_set, domain, object_index",
+    [(1, 0x00, 0xE5), (HILLY_OBJECT_SET, 0x03, 0x7A), (HILLY_OBJECT_SET, 0x00, 0x3C)],  # cloud, hills
+)
+def test_rendering_is_shared_between_positions(object_set, domain, object_index):
+    # GIVEN two objects of the same type and length, in different places and from different factories
+    first_object = LevelObjectFactory(object_set, object_set, 0, [], False).from_properties(
+        domain, object_index, 5, 10, None, 0
+    )
+    second_object = LevelObjectFactory(object_set, object_set, 0, [], False).from_properties(
+        domain, object_index, 20, 12, None, 0
+    )
+
+    # WHEN they are rendered
+    first_rect = first_object.get_rect()
+    second_rect = second_object.get_rect()
+
+    # THEN they share their blocks, and are only moved against each other
+    assert first_object.rendered_blocks is second_object.rendered_blocks
+    assert second_rect.translated(-15, -2) == first_rect
+
+    # WHEN one of them is moved
+    second_object.set_position(5, 10)
+
+    # THEN it is rendered just like the other one
+    assert second_object.get_rect() == first_rect
+
+
 @pytest.mark.parametrize(
     "attribute, increase", zip(["domain", "obj_index", "length", "x_position", "y_position"], [1, 0x10, 1, 1, 1])
 )
@@ -0,0 +1,57 @@
+from foundry.game.File import ROM
+from foundry.game.gfx.GraphicsSet import (
+    CHR_ROM_OFFSET,
+    clear_graphics_set_cache,
+    graphics_set_cache_info,
+    load_graphics_set,
+)
+from smb3parse.constants import Level_BG_Pages1
+
+
+def test_graphics_sets_are_shared():
+    # GIVEN an empty graphics set cache
+    clear_graphics_set_cache()
+
+    # WHEN the same graphics set is loaded twice
+    first_graphics_set = load_graphics_set(1)
+    second_graphics_set = load_graphics_set(1)
+
+    # THEN it was only read from the ROM once
+    assert first_graphics_set is second_graphics_set
+    assert graphics_set_cache_info() == (1, 1, 1)
+
+
+def test_graphics_sets_are_kept_on_unrelated_writes():
+    # GIVEN a loaded graphics set
+    graphics_set = load_graphics_set(1)
+
+    # WHEN a part of the ROM, which has nothing to do with graphics is written to
+    rom = ROM()
+    rom.write(0x1FB92, rom.read(0x1FB92, 9))
+
+    # THEN the same graphics set is returned
+    assert load_graphics_set(1) is graphics_set
+
+
+def test_graphics_sets_are_reread_on_chr_writes():
+    # GIVEN a loaded graphics set
+    graphics_set = load_graphics_set(1)
+
+    # WHEN the CHR ROM is written to
+    rom = ROM()
+    rom.bulk_write(rom.bulk_read(1, CHR_ROM_OFFSET), CHR_ROM_OFFSET)
+
+    # THEN the graphics set is read anew
+    assert load_graphics_set(1) is not graphics_set
+
+
+def test_graphics_sets_are_reread_on_graphics_table_writes():
+    # GIVEN a loaded graphics set
+    graphics_set = load_graphics_set(1)
+
+    # WHEN the table of CHR segments of a graphics set is written to
+    rom = ROM()
+    rom.write(Level_BG_Pages1 + 1, rom.read(Level_BG_Pages1 + 1, 1))
+
+    # THEN the graphics set is read anew
+    assert load_graphics_set(1) is not graphics_set
@@ -0,0 +1,307 @@
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from PySide2.QtCore import QRect
+
+from foundry.game.File import ROM
+from foundry.game.gfx.objects.LevelObject import BLANK, GROUND, LevelObject, SPECIAL_BACKGROUND_OBJECTS
+from smb3parse.levels import LEVEL_MAX_LENGTH
+
+EMPTY = 0xFFFF
+"""Block index of cells, that no level object has placed a block in."""
+
+
+class _Stamp(NamedTuple):
+    """
+    The blocks a level object places into the grid, row by row, starting at x and y. Stamps with a fill block cover
+    their whole rect with it and keep no blocks of their own.
+    """
+
+    x: int
+    y: int
+    width: int
+    blocks: Tuple[int, ...]
+    fill: int = EMPTY
+    height: int = 0
+
+    @property
+    def rect(self) -> QRect:
+        if not self.width:
+            return QRect()
+
+        if self.fill != EMPTY:
+            return QRect(self.x, self.y, self.width, self.height)
+
+        return QRect(self.x, self.y, self.width, -(-len(self.blocks) // self.width))
+
+
+_NO_STAMP = _Stamp(0, 0, 0, ())
+
+
+class BlockGrid:
+    """
+    The blocks of a level, as they end up on screen, after all level objects were placed into it, one after the other.
+
+    Every cell only keeps the block index of the level object, that was placed last over it, and that object as its
+    owner. Objects, whose blocks got covered by later ones, are only remembered for drawing with transparency, where
+    they can still show through.
+
+    Instead of placing every object again, when one of them changes, only the cells the object covered before and
+    covers now are filled again. The stamps of all other objects are kept from the updates before.
+    """
+
+    def __init__(self, width: int = 0, height: int = 0):
+        self.width = width
+        self.height = height
+
+        self.blocks = array("H", [EMPTY]) * (width * height)
+        self.owners: List[Optional[LevelObject]] = [None] * (width * height)
+
+        # block indexes and owners of covered blocks, by cell, in the order they were placed
+        self.covered: Dict[int, List[Tuple[int, LevelObject]]] = {}
+
+        # the objects in the order they are placed in, their stamps by their id and the ids of the hidden ones
+        self._objects: List[LevelObject] = []
+        self._stamps: Dict[int, Tuple[LevelObject, _Stamp]] = {}
+        self._hidden_ids: Set[int] = set()
+
+        self.changed_rect = QRect()
+        """The cells, which were filled again during the last update."""
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    def get_rect(self) -> QRect:
+        return QRect(0, 0, self.width, self.height)
+
+    def block_at(self, x: int, y: int) -> int:
+        """The block index on top at the given position, or EMPTY, if there is none, or it is outside of the grid."""
+        if not self.get_rect().contains(x, y):
+            return EMPTY
+
+        return self.blocks[y * self.width + x]
+
+    def object_at(self, x: int, y: int) -> Optional[LevelObject]:
+        """The level object, whose block is on top at the given position, if any."""
+        if not self.get_rect().contains(x, y):
+            return None
+
+        return self.owners[y * self.width + x]
+
+    def runs(self, rect: QRect) -> Iterator[Tuple[int, int, int, int, LevelObject]]:
+        """
+        Yields x, y, length, block index and owner of the horizontal runs of the same block of the same level object in
+        the given rect, row by row. Empty cells are left out.
+
+        :param rect: The rect in blocks, that should be looked at. Parts outside of the grid are ignored.
+        """
+        rect = rect.intersected(self.get_rect())
+
+        for y in range(rect.top(), rect.top() + rect.height()):
+            row_start = y * self.width
+
+            run_x, run_length, run_block, run_owner = 0, 0, EMPTY, None
+
+            for x in range(rect.left(), rect.left() + rect.width()):
+                block_index = self.blocks[row_start + x]
+                owner = self.owners[row_start + x]
+
+                if block_index == run_block and owner is run_owner:
+                    run_length += 1
+                    continue
+
+                if run_block != EMPTY:
+                    yield run_x, y, run_length, run_block, run_owner
+
+                run_x, run_length, run_block, run_owner = x, 1, block_index, owner
+
+            if run_block != EMPTY:
+                yield run_x, y, run_length, run_block, run_owner
+
+    def rect_of(self, level_object: LevelObject) -> QRect:
+        """The cells the object placed its blocks in, or would have, if it wasn't hidden, during the last update."""
+        _, stamp = self._stamps.get(id(level_object), (None, _NO_STAMP))
+
+        return stamp.rect
+
+    def update(
+        self,
+        level_objects: List[LevelObject],
+        width: int,
+        height: int,
+        hidden: Sequence[LevelObject] = (),
+        changed: Optional[Sequence[LevelObject]] = None,
+    ):
+        """
+        Brings the grid up to date with the given level objects, which need to be rendered already.
+
+        :param hidden: Objects to leave out of the grid, for example while they are dragged around. They keep their
+            place in the order of the objects, so hiding and showing them again only fills their cells again.
+        :param changed: The objects, which were added, removed, or changed since the last update, including those, that
+            only changed their place in the order. Only their cells are filled again. If None, or if the size of the
+            level changed, all objects are placed anew.
+        """
+        hidden_ids = {id(level_object) for level_object in hidden}
+
+        if changed is None or (width, height) != self.size:
+            self.width = width
+            self.height = height
+            self._objects = level_objects
+            self._stamps = {
+                id(level_object): (level_object, self._stamp_of(level_object, width)) for level_object in level_objects
+            }
+            self._hidden_ids = hidden_ids
+            self.changed_rect = self.get_rect()
+
+            self._fill(self.changed_rect)
+
+            return
+
+        objects_to_stamp = {id(level_object): level_object for level_object in changed}
+
+        # objects, which were hidden or shown again, only need their cells filled again
+        for level_object in hidden:
+            if id(level_object) not in self._hidden_ids:
+                objects_to_stamp.setdefault(id(level_object), level_object)
+
+        for object_id in self._hidden_ids - hidden_ids:
+            if object_id in self._stamps:
+                objects_to_stamp.setdefault(object_id, self._stamps[object_id][0])
+
+        self._objects = level_objects
+        self._hidden_ids = hidden_ids
+        self.changed_rect = QRect()
+
+        if not objects_to_stamp:
+            return
+
+        object_ids = {id(level_object) for level_object in level_objects}
+
+        dirty_rects = []
+
+        for object_id, level_object in objects_to_stamp.items():
+            _, old_stamp = self._stamps.pop(object_id, (None, _NO_STAMP))
+
+            if object_id in object_ids:
+                new_stamp = self._stamp_of(level_object, width)
+
+                self._stamps[object_id] = level_object, new_stamp
+            else:
+                # the object was removed
+                new_stamp = _NO_STAMP
+
+            # even if the object looks the same, it might be in front of or behind other objects now
+            dirty_rects.append(old_stamp.rect.united(new_stamp.rect))
+
+        for dirty_rect in dirty_rects:
+            self.changed_rect = self.changed_rect.united(dirty_rect.intersected(self.get_rect()))
+
+            self._fill(dirty_rect)
+
+    def _fill(self, rect: QRect):
+        """Empties the cells in the given rect and places the blocks of all objects into it again."""
+        rect = rect.intersected(self.get_rect())
+
+        if rect.isEmpty():
+            return
+
+        if rect == self.get_rect():
+            self.blocks = array("H", [EMPTY]) * (self.width * self.height)
+            self.owners = [None] * (self.width * self.height)
+            self.covered.clear()
+        else:
+            for y in range(rect.top(), rect.top() + rect.height()):
+                row_start = y * self.width
+
+                for cell in range(row_start + rect.left(), row_start + rect.left() + rect.width()):
+                    self.blocks[cell] = EMPTY
+                    self.owners[cell] = None
+                    self.covered.pop(cell, None)
+
+        for level_object in self._objects:
+            object_id = id(level_object)
+
+            if object_id in self._hidden_ids or object_id not in self._stamps:
+                continue
+
+            _, stamp = self._stamps[object_id]
+
+            if stamp.rect.intersects(rect):
+                self._place(level_object, stamp, rect)
+
+    def _place(self, level_object: LevelObject, stamp: _Stamp, rect: QRect):
+        """Places the blocks of the stamp into the grid, as far as they are inside the given rect."""
+        if stamp.fill != EMPTY:
+            self._place_fill(level_object, stamp.fill, stamp.rect.intersected(rect))
+            return
+
+        left, top, right, bottom = rect.left(), rect.top(), rect.left() + rect.width(), rect.top() + rect.height()
+
+        for index, block_index in enumerate(stamp.blocks):
+            if block_index == BLANK:
+                continue
+
+            y = stamp.y + index // stamp.width
+
+            if not top <= y < bottom:
+                continue
+
+            x = stamp.x + index % stamp.width
+
+            if not left <= x < right:
+                continue
+
+            cell = y * self.width + x
+
+            if self.blocks[cell] != EMPTY:
+                self.covered.setdefault(cell, []).append((self.blocks[cell], self.owners[cell]))
+
+            self.blocks[cell] = block_index
+            self.owners[cell] = level_object
+
+    def _place_fill(self, level_object: LevelObject, block_index: int, rect: QRect):
+        """Covers the given rect with the block, a whole row at a time."""
+        for y in range(rect.top(), rect.top() + rect.height()):
+            row_start = y * self.width + rect.left()
+            row_end = row_start + rect.width()
+
+            for cell in range(row_start, row_end):
+                if self.blocks[cell] != EMPTY:
+                    self.covered.setdefault(cell, []).append((self.blocks[cell], self.owners[cell]))
+
+            self.blocks[row_start:row_end] = array("H", [block_index]) * rect.width()
+            self.owners[row_start:row_end] = [level_object] * rect.width()
+
+    @staticmethod
+    def _stamp_of(level_object: LevelObject, level_width: int) -> _Stamp:
+        if level_object.name.lower() in SPECIAL_BACKGROUND_OBJECTS:
+            # these fill everything to the right of and below them, down to the ground
+            width = min(LEVEL_MAX_LENGTH, level_width - level_object.x_position)
+            height = GROUND - level_object.y_position
+
+            if width <= 0 or height <= 0:
+                return _NO_STAMP
+
+            # a single block filling up to a whole level, so it is not written out block by block
+            fill = _resolve(level_object.blocks[0])
+
+            return _Stamp(level_object.x_position, level_object.y_position, width, (), fill, height)
+
+        if not level_object.rendered_blocks:
+            return _NO_STAMP
+
+        return _Stamp(
+            level_object.rendered_base_x,
+            level_object.rendered_base_y,
+            level_object.rendered_width,
+            tuple(_resolve(block_index) for block_index in level_object.rendered_blocks),
+        )
+
+
+def _resolve(block_index: int) -> int:
+    if block_index > 0xFF:
+        # block_index is an offset into the graphic memory
+        return ROM().get_byte(block_index)
+
+    return block_index
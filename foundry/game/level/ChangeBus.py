@@ -0,0 +1,146 @@
+from typing import Iterator, List, NamedTuple, Type, Union
+
+from PySide2.QtCore import QObject, QTimer, Signal, SignalInstance
+
+from foundry.game.gfx.objects.ObjectLike import ObjectLike
+
+
+class ObjectsAdded(NamedTuple):
+    objects: List[ObjectLike]
+
+
+class ObjectsRemoved(NamedTuple):
+    objects: List[ObjectLike]
+
+
+class ObjectsMoved(NamedTuple):
+    """The objects changed their position or their size, but are still of the same type."""
+
+    objects: List[ObjectLike]
+
+
+class ObjectsRetyped(NamedTuple):
+    """The objects turned into other objects, which can also mean, that they moved or changed their size."""
+
+    objects: List[ObjectLike]
+
+
+class ObjectsReordered(NamedTuple):
+    """The objects changed their place in the level, which decides what is drawn in front of what."""
+
+    objects: List[ObjectLike]
+
+
+class HeaderChanged(NamedTuple):
+    pass
+
+
+class PaletteChanged(NamedTuple):
+    pass
+
+
+class JumpsChanged(NamedTuple):
+    pass
+
+
+class HistoryChanged(NamedTuple):
+    """A state of the level was saved to, or restored from, the undo stack."""
+
+    pass
+
+
+class LevelChanged(NamedTuple):
+    """Anything about the level might have changed, like when a level was loaded."""
+
+    pass
+
+
+Change = Union[
+    ObjectsAdded,
+    ObjectsRemoved,
+    ObjectsMoved,
+    ObjectsRetyped,
+    ObjectsReordered,
+    HeaderChanged,
+    PaletteChanged,
+    JumpsChanged,
+    HistoryChanged,
+    LevelChanged,
+]
+
+OBJECT_CHANGES = (ObjectsAdded, ObjectsRemoved, ObjectsMoved, ObjectsRetyped, ObjectsReordered)
+
+
+class ChangeBatch:
+    """The changes, which were posted to a change bus during one iteration of the event loop, in the order they were."""
+
+    def __init__(self, changes: List[Change]):
+        self._changes = changes
+
+    def __iter__(self) -> Iterator[Change]:
+        return iter(self._changes)
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def of_type(self, *change_types: Type[Change]) -> List[Change]:
+        return [change for change in self._changes if isinstance(change, change_types)]
+
+    def affects(self, *change_types: Type[Change]) -> bool:
+        """Whether any of the changes is of the given types, or is a LevelChanged, which includes all of them."""
+        return any(isinstance(change, (LevelChanged,) + change_types) for change in self._changes)
+
+    def objects(self, *change_types: Type[Change]) -> List[ObjectLike]:
+        """The objects of the changes of the given types, each only once, in the order they were first named in."""
+        objects = {}
+
+        for change in self.of_type(*change_types):
+            for obj in change.objects:
+                objects.setdefault(id(obj), obj)
+
+        return list(objects.values())
+
+
+class ChangeBus(QObject):
+    """
+    Collects the changes made to a level and hands them out together, once control returns to the event loop.
+
+    Actions often change the level in multiple steps, like removing an object and adding its replacement. Instead of
+    every step making every view refresh itself, the views receive one batch per iteration of the event loop, telling
+    them what changed, so they can refresh only what they show of it, and only once.
+    """
+
+    batch_ready: SignalInstance = Signal(object)
+    """Emitted with the ChangeBatch of the changes posted since the last one."""
+
+    def __init__(self):
+        super(ChangeBus, self).__init__()
+
+        self._pending: List[Change] = []
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def pending(self) -> List[Change]:
+        return list(self._pending)
+
+    def post(self, change: Change):
+        self._pending.append(change)
+
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """Hands out the pending changes right away. Changes posted while doing so end up in the next batch."""
+        self._timer.stop()
+
+        if not self._pending:
+            return
+
+        batch = ChangeBatch(self._pending)
+        self._pending = []
+
+        self.batch_ready.emit(batch)
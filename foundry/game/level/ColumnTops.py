@@ -0,0 +1,150 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from foundry.game.gfx.objects.ObjectLike import ObjectLike
+
+
+class ColumnTops:
+    """
+    The tops of the level objects, by the columns they cover, so objects growing down to the ground, like pyramids,
+    only have to look at the columns underneath them to find the first object in their way, instead of going through
+    all the objects before them, row by row.
+
+    Objects are put in, when they are rendered, and taken out again, when they are moved, resized, changed or removed,
+    so the index is never built from scratch. Objects, which were not rendered yet, are remembered and rendered, once
+    an object after them needs to know, where the ground is.
+    """
+
+    def __init__(self, objects: Sequence[ObjectLike]):
+        self.objects = objects
+
+        # the top and object of every rendered object, covering the column
+        self._columns: Dict[int, List[Tuple[int, ObjectLike]]] = {}
+
+        # the columns every object is in, by its id, since level objects are not hashable
+        self._spans: Dict[int, Tuple[ObjectLike, range]] = {}
+
+        self._unindexed: Dict[int, ObjectLike] = {}
+        self._indexing = False
+
+    def forget(self, level_object: ObjectLike):
+        """Takes the object out, until it is rendered again."""
+        self._take_out(level_object)
+
+        self._unindexed[id(level_object)] = level_object
+
+    def update(self, level_object: ObjectLike):
+        """Puts the object in, with the rect it was just rendered with."""
+        self._take_out(level_object)
+        self._unindexed.pop(id(level_object), None)
+
+        rect = level_object.get_rect()
+
+        if rect.isEmpty() or self._position_of(level_object) is None:
+            return
+
+        span = range(rect.left(), rect.left() + rect.width())
+
+        for x in span:
+            self._columns.setdefault(x, []).append((rect.top(), level_object))
+
+        self._spans[id(level_object)] = level_object, span
+
+    def remove(self, level_object: ObjectLike):
+        """Takes the object out for good, for when it is removed from the level."""
+        self._take_out(level_object)
+        self._unindexed.pop(id(level_object), None)
+
+    def clear(self):
+        self._columns.clear()
+        self._spans.clear()
+        self._unindexed.clear()
+
+    def tops_before(self, level_object: ObjectLike, left: int, right: int) -> Iterator[Tuple[int, int]]:
+        """
+        Yields the column and top of every object before the given one in the level, that covers one of the columns
+        from left up to, but not including, right.
+        """
+        index = self._position_of(level_object)
+
+        if index is None:
+            # not added to the level yet
+            index = level_object.index_in_level
+
+        self._index_objects_before(index)
+
+        outdated = []
+
+        for x in range(left, right):
+            for top, other_object in self._columns.get(x, []):
+                position = self._position_of(other_object)
+
+                if position is None:
+                    outdated.append(other_object)
+                elif position < index:
+                    yield x, top
+
+        for other_object in outdated:
+            self._take_out(other_object)
+
+    def objects_behind(self, position: int, left: int, right: int) -> List[ObjectLike]:
+        """
+        Returns the rendered objects after the given position in the level, that cover one of the columns from left up
+        to, but not including, right. Those are the ones, which might run into an object changed in these columns.
+        """
+        found_objects: Dict[int, ObjectLike] = {}
+
+        for x in range(left, right):
+            for _, other_object in self._columns.get(x, []):
+                other_position = self._position_of(other_object)
+
+                if other_position is not None and other_position > position:
+                    found_objects[id(other_object)] = other_object
+
+        return list(found_objects.values())
+
+    def _index_objects_before(self, index: int):
+        # the objects are rendered in the order they are in, so when one of them asks for the ground, while the ones
+        # before it are being rendered, those before it are already in
+        if self._indexing or not self._unindexed:
+            return
+
+        objects_to_render = []
+
+        for key, level_object in list(self._unindexed.items()):
+            position = self._position_of(level_object)
+
+            if position is None:
+                del self._unindexed[key]
+            elif position < index:
+                objects_to_render.append((position, level_object))
+
+        objects_to_render.sort(key=lambda position_and_object: position_and_object[0])
+
+        self._indexing = True
+
+        try:
+            for _, level_object in objects_to_render:
+                level_object.render()
+        finally:
+            self._indexing = False
+
+    def _position_of(self, level_object: ObjectLike) -> Optional[int]:
+        position = getattr(level_object, "index_in_level", -1)
+
+        if 0 <= position < len(self.objects) and self.objects[position] is level_object:
+            return position
+
+        for position, other_object in enumerate(self.objects):
+            if other_object is level_object:
+                return position
+
+        return None
+
+    def _take_out(self, level_object: ObjectLike):
+        _, span = self._spans.pop(id(level_object), (None, range(0)))
+
+        for x in span:
+            self._columns[x] = [entry for entry in self._columns[x] if entry[1] is not level_object]
+
+            if not self._columns[x]:
+                del self._columns[x]
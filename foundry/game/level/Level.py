@@ -1,4 +1,5 @@
-from typing import List, Optional, Tuple, Union, overload
+from heapq import heappop, heappush
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, Union, overload
 
 from PySide2.QtCore import QObject, QPoint, QRect, QSize, Signal, SignalInstance
 
@@ -10,10 +11,25 @@ from foundry.game.gfx.objects.Jump import Jump
 from foundry.game.gfx.objects.LevelObject import LevelObject
 from foundry.game.gfx.objects.LevelObjectFactory import LevelObjectFactory
 from foundry.game.level import LevelByteData, _load_level_offsets
+from foundry.game.level.BlockGrid import BlockGrid
+from foundry.game.level.ChangeBus import (
+    HeaderChanged,
+    JumpsChanged,
+    LevelChanged,
+    ObjectsAdded,
+    ObjectsRemoved,
+    ObjectsReordered,
+    ObjectsRetyped,
+)
+from foundry.game.level.ColumnTops import ColumnTops
 from foundry.game.level.LevelLike import LevelLike
+from foundry.game.level.Selection import Selection
+from foundry.game.level.SpatialIndex import SpatialIndex
 from foundry.gui.UndoStack import UndoStack
 from smb3parse.constants import BASE_OFFSET, Level_TilesetIdx_ByTileset
+from smb3parse.levels.level_data import Buffer, enemy_records, object_records
 from smb3parse.levels.level_header import LevelHeader
+from smb3parse.levels.m3l import parse_m3l
 
 LEVEL_POINTER_OFFSET = Level_TilesetIdx_ByTileset
 
@@ -24,6 +40,8 @@ TIME_INF = -1
 LEVEL_DEFAULT_HEIGHT = 27
 LEVEL_DEFAULT_WIDTH = 16
 
+_T = TypeVar("_T", LevelObject, EnemyObject)
+
 
 def world_and_level_for_level_address(level_address: int):
     for level in Level.offsets[1:]:
@@ -37,6 +55,9 @@ class LevelSignaller(QObject):
     data_changed: SignalInstance = Signal()
     jumps_changed: SignalInstance = Signal()
 
+    changes: SignalInstance = Signal(object)
+    """Emitted with every change made to the level, to be posted to a ChangeBus."""
+
 
 class Level(LevelLike):
     MIN_LENGTH = 0x10
@@ -69,10 +90,18 @@ class Level(LevelLike):
         self.enemy_offset = enemy_data_offset
 
         self.objects: List[LevelObject] = []
+        self.column_tops = ColumnTops(self.objects)
         self.header_bytes: bytearray = bytearray()
         self.jumps: List[Jump] = []
         self.enemies: List[EnemyObject] = []
 
+        # level objects and enemies by where they are, to find them without looking at all of them
+        self.spatial_index = SpatialIndex()
+
+        self.selection = Selection(self.index_of)
+
+        self.block_grid = BlockGrid()
+
         if self.layout_address == self.enemy_offset == 0:
             # probably loaded to become an m3l
             return
@@ -82,12 +111,11 @@ class Level(LevelLike):
         self.header_bytes = rom.bulk_read(Level.HEADER_LENGTH, self.header_offset)
         self._parse_header()
 
-        object_data = ROM.rom_data[self.object_offset :]
-        enemy_data = ROM.rom_data[self.enemy_offset :]
+        # the data is read right out of the ROM, instead of copying everything after the level, just to read it
+        with memoryview(ROM.rom_data) as rom_data:
+            self._load_level_data(rom_data[self.object_offset :], rom_data[self.enemy_offset :])
 
-        self._load_level_data(object_data, enemy_data)
-
-    def _load_level_data(self, object_data: bytearray, enemy_data: bytearray, new_level: bool = True):
+    def _load_level_data(self, object_data: Buffer, enemy_data: Buffer, new_level: bool = True):
         self._load_objects(object_data)
         self._load_enemies(enemy_data)
 
@@ -96,6 +124,7 @@ class Level(LevelLike):
 
             self.undo_stack.clear(self.to_bytes())
             self.data_changed.emit()
+            self.changes.emit(LevelChanged())
 
     @property
     def fully_loaded(self):
@@ -132,6 +161,10 @@ class Level(LevelLike):
     def jumps_changed(self):
         return self._signal_emitter.jumps_changed
 
+    @property
+    def changes(self):
+        return self._signal_emitter.changes
+
     def reload(self):
         (_, header_and_object_data), (_, enemy_data) = self.to_bytes()
 
@@ -143,6 +176,7 @@ class Level(LevelLike):
         self._load_level_data(object_data, enemy_data, new_level=False)
 
         self.data_changed.emit()
+        self.changes.emit(LevelChanged())
 
     def current_object_size(self):
         size = 0
@@ -169,61 +203,52 @@ class Level(LevelLike):
             self.header.object_palette_index,
             self.objects,
             bool(self.header.is_vertical),
+            column_tops=self.column_tops,
+            spatial_index=self.spatial_index,
+        )
+        self.enemy_item_factory = EnemyItemFactory(
+            self.object_set_number, self.header.enemy_palette_index, spatial_index=self.spatial_index
         )
-        self.enemy_item_factory = EnemyItemFactory(self.object_set_number, self.header.enemy_palette_index)
 
         self.size = self.header.width, self.header.height
 
         if should_emit:
             self.data_changed.emit()
+            self.changes.emit(HeaderChanged())
 
-    def _load_enemies(self, data: bytearray):
-        self.enemies.clear()
-
-        def data_left(_data: bytearray):
-            # the commented out code seems to hold for the stock ROM, but if the ROM was already edited with another
-            # editor, it might not, since they only wrote the 0xFF to end the enemy data
+    def _load_enemies(self, data: Buffer):
+        self.selection.discard(self.enemies)
 
-            return _data and not _data[0] == 0xFF  # and _data[1] in [0x00, 0x01]
+        for enemy in self.enemies:
+            self.spatial_index.remove(enemy)
 
-        enemy_data, data = data[0:ENEMY_SIZE], data[ENEMY_SIZE:]
+        self.enemies.clear()
 
-        while data_left(enemy_data):
+        for enemy_data in enemy_records(data):
             enemy = self.enemy_item_factory.from_data(enemy_data, 0)
 
             self.enemies.append(enemy)
+            self.spatial_index.add(enemy)
 
-            enemy_data, data = data[0:ENEMY_SIZE], data[ENEMY_SIZE:]
+    def _load_objects(self, data: Buffer):
+        self.selection.discard(self.objects)
+
+        for level_object in self.objects:
+            self.spatial_index.remove(level_object)
 
-    def _load_objects(self, data: bytearray):
         self.objects.clear()
+        self.column_tops.clear()
         self.jumps.clear()
 
-        if not data or data[0] == 0xFF:
-            return
-
-        while True:
-            obj_data, data = data[0:3], data[3:]
-
-            domain = (obj_data[0] & 0b1110_0000) >> 5
-
-            obj_id = obj_data[2]
-            has_length_byte = self.object_set.get_object_byte_length(domain, obj_id) == 4
-
-            if has_length_byte:
-                fourth_byte, data = data[0], data[1:]
-                obj_data.append(fourth_byte)
-
+        for obj_data in object_records(data, self.object_set_number):
             level_object = self.object_factory.from_data(obj_data, len(self.objects))
 
             if isinstance(level_object, LevelObject):
                 self.objects.append(level_object)
+                self.spatial_index.add(level_object)
             elif isinstance(level_object, Jump):
                 self.jumps.append(level_object)
 
-            if data[0] == 0xFF:
-                break
-
     def _update_level_size(self):
         self.object_size_on_disk = self.current_object_size()
         self.enemy_size_on_disk = self.current_enemies_size()
@@ -250,11 +275,11 @@ class Level(LevelLike):
 
     @property
     def objects_end(self):
-        return self.header_offset + Level.HEADER_LENGTH + self.current_object_size() + len(b"\xFF")  # the delimiter
+        return self.header_offset + Level.HEADER_LENGTH + self.current_object_size() + len(b"\xff")  # the delimiter
 
     @property
     def enemies_end(self):
-        return self.enemy_offset + self.current_enemies_size() + len(b"\xFF\x00")  # the delimiter
+        return self.enemy_offset + self.current_enemies_size() + len(b"\xff\x00")  # the delimiter
 
     @property
     def next_area_objects(self):
@@ -501,6 +526,78 @@ class Level(LevelLike):
     def too_many_enemies_or_items(self):
         return self.current_enemies_size() > self.enemy_size_on_disk
 
+    def update_block_grid(
+        self, hidden_objects: Sequence[LevelObject] = (), changed_objects: Optional[Sequence[LevelObject]] = None
+    ) -> BlockGrid:
+        """
+        Brings the block grid up to date with the level objects and returns it.
+
+        :param hidden_objects: Level objects, which are left out of the grid, because they are drawn on their own.
+        :param changed_objects: Level objects, which were added, removed, moved, or otherwise changed, since the grid
+            was last updated. Only they are rendered and placed into the grid again, together with the objects behind
+            them, that depend on the objects before them, like platforms extending down to the ground. If None, all
+            level objects are.
+        """
+        if changed_objects is None:
+            for level_object in self.objects:
+                level_object.render()
+
+            self.block_grid.update(self.objects, *self.size, hidden=hidden_objects)
+        else:
+            rendered_objects = self._render_changed_objects(changed_objects)
+
+            self.block_grid.update(self.objects, *self.size, hidden=hidden_objects, changed=rendered_objects)
+
+        return self.block_grid
+
+    def _render_changed_objects(self, changed_objects: Sequence[LevelObject]) -> List[LevelObject]:
+        """
+        Renders the changed level objects again, front to back, and with them every object behind them, which depends on
+        the objects before it and covers a column they covered before or cover now. Returns all of them, including the
+        changed objects, which are not in the level anymore.
+        """
+        removed_objects = []
+        objects_to_render: List[Tuple[int, int, LevelObject]] = []
+        seen_ids = set()
+
+        def add_objects_behind(position: int, rect: QRect):
+            for other_object in self.column_tops.objects_behind(position, rect.left(), rect.left() + rect.width()):
+                if id(other_object) in seen_ids or other_object.is_position_independent():
+                    continue
+
+                seen_ids.add(id(other_object))
+                heappush(objects_to_render, (self.position_of(other_object), id(other_object), other_object))
+
+        for level_object in changed_objects:
+            if id(level_object) in seen_ids:
+                continue
+
+            seen_ids.add(id(level_object))
+
+            try:
+                heappush(objects_to_render, (self.position_of(level_object), id(level_object), level_object))
+            except ValueError:
+                removed_objects.append(level_object)
+
+        # changed objects might have been before objects, which are before them now, so everything, that covered the
+        # columns they were in, is rendered again, before any of them is
+        for level_object in changed_objects:
+            add_objects_behind(-1, self.block_grid.rect_of(level_object))
+
+        rendered_objects = []
+
+        while objects_to_render:
+            position, _, level_object = heappop(objects_to_render)
+
+            old_rect = self.block_grid.rect_of(level_object)
+
+            level_object.render()
+            rendered_objects.append(level_object)
+
+            add_objects_behind(position, old_rect.united(level_object.get_rect()))
+
+        return rendered_objects + removed_objects
+
     def get_all_objects(self) -> List[Union[LevelObject, EnemyObject]]:
         return self.objects + self.enemies
 
@@ -508,13 +605,46 @@ class Level(LevelLike):
         return [obj.name for obj in self.get_all_objects()]
 
     def object_at(self, x: int, y: int) -> Optional[Union[EnemyObject, LevelObject]]:
-        for obj in reversed(self.get_all_objects()):
-            if (x, y) in obj:
-                return obj
+        objects_at_point = self.objects_in(QRect(x, y, 1, 1))
+
+        if objects_at_point:
+            return objects_at_point[-1]
         else:
             return None
 
+    def objects_in(self, rect: QRect) -> List[Union[LevelObject, EnemyObject]]:
+        """
+        Returns the level objects and enemies, which overlap the given rect, in the order they are in, in the level,
+        meaning back to front, like get_all_objects().
+
+        :param rect: The rect to look in, in blocks.
+        """
+        self._update_spatial_index()
+
+        found_objects = self.spatial_index.objects_in(rect)
+
+        level_objects = sorted((obj for obj in found_objects if isinstance(obj, LevelObject)), key=self.position_of)
+
+        enemy_ids = {id(obj) for obj in found_objects if isinstance(obj, EnemyObject)}
+
+        # there is only room for a handful of enemies in a level, so going through them is cheap
+        enemies = [enemy for enemy in self.enemies if id(enemy) in enemy_ids] if enemy_ids else []
+
+        return level_objects + enemies
+
+    def _update_spatial_index(self):
+        if len(self.spatial_index) == len(self.objects) + len(self.enemies):
+            return
+
+        # the objects were changed from outside the level, so the index is out of date
+        self.spatial_index.clear()
+
+        for obj in self.get_all_objects():
+            self.spatial_index.add(obj)
+
     def bring_to_foreground(self, objects: List[Union[LevelObject, EnemyObject]]):
+        reordered = []
+
         for obj in objects:
             intersecting_objects = self.get_intersecting_objects(obj)
 
@@ -523,8 +653,12 @@ class Level(LevelLike):
             if obj is object_currently_in_the_foreground:
                 continue
 
+            reordered.append(obj)
+
             if isinstance(obj, LevelObject):
-                objects = self.objects
+                # takes the place of the object in the foreground, which moves back by one
+                self._move_object(obj, self.position_of(object_currently_in_the_foreground))
+                continue
             elif isinstance(obj, EnemyObject):
                 objects = self.enemies
 
@@ -534,7 +668,11 @@ class Level(LevelLike):
 
             objects.insert(index, obj)
 
+        self.changes.emit(ObjectsReordered(reordered))
+
     def bring_to_background(self, level_objects: List[Union[LevelObject, EnemyObject]]):
+        reordered = []
+
         for obj in level_objects:
             intersecting_objects = self.get_intersecting_objects(obj)
 
@@ -543,8 +681,12 @@ class Level(LevelLike):
             if obj is object_currently_in_the_background:
                 continue
 
+            reordered.append(obj)
+
             if isinstance(obj, LevelObject):
-                objects = self.objects
+                # takes the place of the object in the background, which moves forward by one
+                self._move_object(obj, self.position_of(object_currently_in_the_background))
+                continue
             elif isinstance(obj, EnemyObject):
                 objects = self.enemies
             else:
@@ -556,6 +698,8 @@ class Level(LevelLike):
 
             objects.insert(index, obj)
 
+        self.changes.emit(ObjectsReordered(reordered))
+
     @overload
     def get_intersecting_objects(self, obj: LevelObject) -> List[LevelObject]:
         ...
@@ -575,19 +719,15 @@ class Level(LevelLike):
         :return:
         """
         if isinstance(obj, LevelObject):
-            objects_to_check = self.objects
+            object_type = LevelObject
         elif isinstance(obj, EnemyObject):
-            objects_to_check = self.enemies
+            object_type = EnemyObject
         else:
             raise TypeError()
 
-        intersecting_objects = []
-
-        for other_object in objects_to_check:
-            if obj.get_rect().intersects(other_object.get_rect()):
-                intersecting_objects.append(other_object)
-
-        return intersecting_objects
+        return [
+            other_object for other_object in self.objects_in(obj.get_rect()) if isinstance(other_object, object_type)
+        ]
 
     def draw(self, *_):
         pass
@@ -619,34 +759,46 @@ class Level(LevelLike):
 
         obj = self.object_factory.from_properties(domain, object_index, x, y, length, index)
         self.objects.insert(index, obj)
+        self.spatial_index.add(obj)
+
+        self._update_object_indexes(min(index, len(self.objects) - 1))
+
+        self.changes.emit(ObjectsAdded([obj]))
 
         return obj
 
     def add_enemy(self, object_index: int, x: int, y: int, index: int = -1) -> EnemyObject:
+        """
+        Adds an enemy or item to the level.
+
+        :param index: The place of the enemy among the enemies of the level, not counting the level objects. By default,
+        it is put after all of them.
+        """
         if index == -1:
             index = len(self.enemies)
-        else:
-            index %= len(self.objects)
 
         enemy = self.enemy_item_factory.from_data([object_index, x, y], -1)
 
         self.enemies.insert(index, enemy)
+        self.spatial_index.add(enemy)
+
+        self.changes.emit(ObjectsAdded([enemy]))
 
         return enemy
 
     def add_jump(self):
         self.jumps.append(Jump.from_properties(0, 0, 0, 0))
 
-        self.data_changed.emit()
+        self.changes.emit(JumpsChanged())
 
     def remove_jump(self, jump: Jump):
         self.jumps.remove(jump)
 
-        self.data_changed.emit()
+        self.changes.emit(JumpsChanged())
 
     def index_of(self, obj: Union[EnemyObject, LevelObject]) -> int:
         if isinstance(obj, LevelObject):
-            return self.objects.index(obj)
+            return self.position_of(obj)
         elif isinstance(obj, EnemyObject):
             return len(self.objects) + self.enemies.index(obj)
         else:
@@ -662,10 +814,55 @@ class Level(LevelLike):
         if obj is None:
             return
 
+        self.selection.remove([obj])
+
         if isinstance(obj, LevelObject):
-            self.objects.remove(obj)
+            index = self.position_of(obj)
+
+            del self.objects[index]
+            self.column_tops.remove(obj)
+            self.spatial_index.remove(obj)
+
+            self._update_object_indexes(index)
         elif isinstance(obj, EnemyObject):
             self.enemies.remove(obj)
+            self.spatial_index.remove(obj)
+
+        self.changes.emit(ObjectsRemoved([obj]))
+
+    def position_of(self, obj: LevelObject) -> int:
+        """
+        Returns the position of the level object in the level. Unlike objects.index(), this goes by identity, so
+        identical looking objects are not mixed up, and doesn't have to look through the objects before it.
+
+        :raises ValueError: If the object is not in the level.
+        """
+        index = obj.index_in_level
+
+        if 0 <= index < len(self.objects) and self.objects[index] is obj:
+            return index
+
+        # the objects were changed from outside the level, so the index is out of date
+        for index, level_object in enumerate(self.objects):
+            if level_object is obj:
+                obj.index_in_level = index
+
+                return index
+
+        raise ValueError(f"{obj} is not in the level.")
+
+    def _move_object(self, obj: LevelObject, new_index: int):
+        old_index = self.position_of(obj)
+
+        del self.objects[old_index]
+        self.objects.insert(new_index, obj)
+
+        self._update_object_indexes(min(old_index, new_index), max(old_index, new_index) + 1)
+
+    def _update_object_indexes(self, start: int = 0, end: Optional[int] = None):
+        """Brings the index of the level objects from start up to end in line with their position in the level."""
+        for index in range(start, len(self.objects) if end is None else end):
+            self.objects[index].index_in_level = index
 
     def to_m3l(self) -> bytearray:
         world_number = level_number = 1
@@ -694,7 +891,10 @@ class Level(LevelLike):
         return m3l_bytes
 
     def from_m3l(self, m3l_bytes: bytearray):
-        world_number, level_number, self.object_set_number = m3l_bytes[:3]
+        # the sections are found in one scan over the raw bytes, so the objects only need to be built once
+        m3l = parse_m3l(m3l_bytes)
+
+        self.object_set_number = m3l.object_set_number
         self.object_set = ObjectSet(self.object_set_number)
 
         self.header_offset = self.enemy_offset = 0
@@ -702,30 +902,12 @@ class Level(LevelLike):
         # block signals, so it will only be emitted, once we are fully set up
         self._signal_emitter.blockSignals(True)
 
-        # update the level_object_factory
-        self._load_level_data(bytearray(), bytearray(), new_level=False)
-
-        m3l_bytes = m3l_bytes[3:]
-
-        self.header_bytes = m3l_bytes[: Level.HEADER_LENGTH]
+        self.header_bytes = bytearray(m3l.header)
         self._parse_header()
 
-        m3l_bytes = m3l_bytes[Level.HEADER_LENGTH :]
-
-        # figure out how many bytes are the objects
-        self._load_objects(m3l_bytes)
-        object_size = self.current_object_size() + len(b"\xFF")  # delimiter
-
-        object_bytes = m3l_bytes[:object_size]
-        enemy_bytes = m3l_bytes[object_size:]
-
-        if len(enemy_bytes) % 3 - len(b"\xFF") == 1:
-            # compatibility with workshop
-            enemy_bytes = enemy_bytes[1:]
-
         self._signal_emitter.blockSignals(False)
 
-        self._load_level_data(object_bytes, enemy_bytes)
+        self._load_level_data(m3l.object_data, m3l.enemy_data)
 
     def to_bytes(self) -> LevelByteData:
         data = bytearray()
@@ -764,3 +946,115 @@ class Level(LevelLike):
 
         self._parse_header(should_emit=False)
         self._load_level_data(objects, enemies, new_level)
+
+    def update_from_bytes(self, object_data: Tuple[int, bytearray], enemy_data: Tuple[int, bytearray]):
+        """
+        Brings the level into the given state, like from_bytes, but keeps the objects, whose bytes are the same in it,
+        and changes objects in place, where possible, so their renders and whether they are selected are kept.
+        """
+        header_offset, object_bytes = object_data
+        enemy_offset, enemy_bytes = enemy_data
+
+        if object_bytes[: Level.HEADER_LENGTH] != self.header_bytes:
+            # the header decides how the objects are built and drawn, so they have to be built anew
+            self.from_bytes(object_data, enemy_data, new_level=False)
+            self.changes.emit(LevelChanged())
+            return
+
+        self.header_offset = header_offset
+        self.enemy_offset = enemy_offset
+
+        object_data_records = []
+        jump_records = []
+
+        for record in object_records(object_bytes, self.object_set_number, Level.HEADER_LENGTH):
+            if Jump.is_jump(record):
+                jump_records.append(record)
+            else:
+                object_data_records.append(record)
+
+        if [jump.to_bytes() for jump in self.jumps] != jump_records:
+            self.jumps[:] = [Jump(record) for record in jump_records]
+            self.changes.emit(JumpsChanged())
+
+        removed_objects = self._update_objects(self.objects, object_data_records, self.object_factory.from_data)
+        removed_enemies = self._update_objects(
+            self.enemies, list(enemy_records(enemy_bytes)), self.enemy_item_factory.from_data
+        )
+
+        for level_object in removed_objects:
+            self.column_tops.remove(level_object)
+
+        self._update_object_indexes()
+
+        self.selection.remove(removed_objects + removed_enemies)
+
+    def _update_objects(
+        self, objects: List[_T], records: List[bytearray], create: Callable[[bytearray, int], _T]
+    ) -> List[_T]:
+        """
+        Makes the given objects match the records, by keeping the objects, that already look like one of them, changing
+        the left over ones into the remaining records and only creating objects, when none are left to change. What
+        changed is emitted as changes of the level.
+
+        :return: The objects, which are not in the level anymore.
+        """
+        unchanged: Dict[bytes, List[_T]] = {}
+
+        for obj in reversed(objects):
+            unchanged.setdefault(bytes(obj.to_bytes()), []).append(obj)
+
+        kept_ids = set()
+        new_objects: List[Optional[_T]] = []
+        changed_objects: List[_T] = []
+        created_objects: List[_T] = []
+
+        for record in records:
+            candidates = unchanged.get(bytes(record))
+
+            if candidates:
+                obj = candidates.pop()
+                kept_ids.add(id(obj))
+            else:
+                obj = None
+
+            new_objects.append(obj)
+
+        left_over = [obj for obj in objects if id(obj) not in kept_ids]
+        left_over.reverse()
+
+        kept_before = [obj for obj in objects if id(obj) in kept_ids]
+        kept_after = [obj for obj in new_objects if obj is not None]
+
+        reordered_objects = [after for before, after in zip(kept_before, kept_after) if before is not after]
+
+        for index, (record, obj) in enumerate(zip(records, new_objects)):
+            if obj is not None:
+                continue
+
+            if left_over:
+                obj = left_over.pop()
+                obj.set_data(record)
+                changed_objects.append(obj)
+            else:
+                obj = create(record, index)
+                self.spatial_index.add(obj)
+                created_objects.append(obj)
+
+            new_objects[index] = obj
+
+        for obj in left_over:
+            self.spatial_index.remove(obj)
+
+        objects[:] = new_objects
+
+        for change, changed in [
+            (ObjectsRetyped, changed_objects),
+            (ObjectsReordered, reordered_objects),
+            (ObjectsAdded, created_objects),
+            (ObjectsRemoved, left_over[::-1]),
+        ]:
+            if changed:
+                self.changes.emit(change(changed))
+
+        return left_over[::-1]
@@ -2,22 +2,33 @@ from typing import Optional
 
 from PySide2.QtCore import QObject, Signal, SignalInstance
 
+from foundry.game.level.ChangeBus import ChangeBus, HistoryChanged, LevelChanged
 from foundry.game.level.Level import Level
 
 
 class LevelRef(QObject):
     data_changed: SignalInstance = Signal()
+    """Emit, when the level was changed in a way, that no more specific change on the change bus describes."""
+
     jumps_changed: SignalInstance = Signal()
 
+    selection_changed: SignalInstance = Signal(list, list)
+    """Emitted with the objects, which were selected and which were deselected, whenever the selection changed."""
+
     def __init__(self):
         super(LevelRef, self).__init__()
         self._internal_level: Optional[Level] = Level()
 
+        self.changes = ChangeBus()
+        """Hands out what changed about the level, once per iteration of the event loop. Views listen to it."""
+
+        self.data_changed.connect(lambda: self.changes.post(LevelChanged()))
+
     def load_level(self, level_name: str, object_data_offset: int, enemy_data_offset: int, object_set_number: int):
         self.level = Level(level_name, object_data_offset, enemy_data_offset, object_set_number)
 
-        # actively emit, because we weren't connected yet, when the level sent it out
-        self.data_changed.emit()
+        # actively post, because we weren't connected yet, when the level sent it out
+        self.changes.post(LevelChanged())
 
     @property
     def level(self):
@@ -27,22 +38,18 @@ class LevelRef(QObject):
     def level(self, level):
         self._internal_level = level
 
-        self._internal_level.data_changed.connect(self.data_changed.emit)
+        self._internal_level.changes.connect(self.changes.post)
         self._internal_level.jumps_changed.connect(self.jumps_changed.emit)
+        self._internal_level.selection.changed.connect(self.selection_changed.emit)
 
     @property
     def selected_objects(self):
-        return [obj for obj in self._internal_level.get_all_objects() if obj.selected]
+        """The selected objects, in the order they were selected in. Look objects up in the selection of the level."""
+        return self._internal_level.selection.objects
 
     @selected_objects.setter
     def selected_objects(self, selected_objects):
-        if selected_objects == self.selected_objects:
-            return
-
-        for obj in self._internal_level.get_all_objects():
-            obj.selected = obj in selected_objects
-
-        self.data_changed.emit()
+        self._internal_level.selection.replace(selected_objects)
 
     def __getattr__(self, item: str):
         if self._internal_level is None:
@@ -63,10 +70,10 @@ class LevelRef(QObject):
         self.set_level_state(*self.undo_stack.redo())
 
     def set_level_state(self, object_data, enemy_data):
-        self.level.from_bytes(object_data, enemy_data, new_level=False)
+        self.level.update_from_bytes(object_data, enemy_data)
         self.level.changed = True
 
-        self.data_changed.emit()
+        self.changes.post(HistoryChanged())
 
     def import_undo_stack_data(self, undo_index, byte_data):
         self.level.undo_stack.import_data(undo_index, byte_data)
@@ -78,7 +85,11 @@ class LevelRef(QObject):
         self.undo_stack.save_level_state(self._internal_level.to_bytes())
         self.level.changed = True
 
-        self.data_changed.emit()
+        if not self.changes.pending:
+            # whatever changed the level did so without saying what, so it could have been anything
+            self.changes.post(LevelChanged())
+
+        self.changes.post(HistoryChanged())
 
     def __bool__(self):
         return self._internal_level.fully_loaded
@@ -0,0 +1,99 @@
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from PySide2.QtCore import QObject, Signal, SignalInstance
+
+from foundry.game.gfx.objects.ObjectLike import ObjectLike
+
+
+class Selection(QObject):
+    """
+    The selected level objects and enemies of a level, in the order they were selected in.
+
+    Objects are kept by their id, since level objects are not hashable and compare equal, when they look the same, so
+    checking whether an object is selected doesn't have to go through the selection. The selected flag of the objects,
+    which they are drawn by, is kept in line with it.
+    """
+
+    changed: SignalInstance = Signal(list, list)
+    """Emitted with the objects, which were selected and which were deselected, whenever the selection changed."""
+
+    def __init__(self, index_of: Callable[[ObjectLike], int]):
+        super(Selection, self).__init__()
+
+        # the index of an object in the level, with the enemies coming after the level objects
+        self._index_of = index_of
+
+        self._objects: Dict[int, ObjectLike] = {}
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __iter__(self) -> Iterator[ObjectLike]:
+        return iter(list(self._objects.values()))
+
+    def __contains__(self, obj: ObjectLike) -> bool:
+        return id(obj) in self._objects
+
+    @property
+    def objects(self) -> List[ObjectLike]:
+        return list(self._objects.values())
+
+    def in_level_order(self) -> List[ObjectLike]:
+        """
+        The selected objects in the order they are in the level, for everything depending on it, like copying objects
+        or bringing them to the front, where the order they were selected in would mix them up.
+        """
+        return sorted(self._objects.values(), key=self._index_of)
+
+    def replace(self, objects: Iterable[ObjectLike]) -> bool:
+        """
+        Selects only the given objects.
+
+        :return: Whether the selection changed. Only the order of the objects changing doesn't count.
+        """
+        new_objects = {id(obj): obj for obj in objects}
+
+        added = [obj for object_id, obj in new_objects.items() if object_id not in self._objects]
+        removed = [obj for object_id, obj in self._objects.items() if object_id not in new_objects]
+
+        self._objects = new_objects
+
+        return self._notify(added, removed)
+
+    def add(self, objects: Iterable[ObjectLike]) -> bool:
+        """Selects the given objects in addition to the already selected ones, which stay in front of them."""
+        added = []
+
+        for obj in objects:
+            if id(obj) not in self._objects:
+                self._objects[id(obj)] = obj
+                added.append(obj)
+
+        return self._notify(added, [])
+
+    def remove(self, objects: Iterable[ObjectLike]) -> bool:
+        removed = [self._objects.pop(id(obj)) for obj in objects if id(obj) in self._objects]
+
+        return self._notify([], removed)
+
+    def clear(self) -> bool:
+        return self.replace([])
+
+    def discard(self, objects: Iterable[ObjectLike]):
+        """Takes the objects out without telling anyone, for when they are gone for good, like after reloading."""
+        for obj in objects:
+            self._objects.pop(id(obj), None)
+
+    def _notify(self, added: List[ObjectLike], removed: List[ObjectLike]) -> bool:
+        for obj in added:
+            obj.selected = True
+
+        for obj in removed:
+            obj.selected = False
+
+        if not added and not removed:
+            return False
+
+        self.changed.emit(added, removed)
+
+        return True
@@ -0,0 +1,118 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from PySide2.QtCore import QRect
+
+from foundry.game.gfx.objects.ObjectLike import ObjectLike
+
+CELL_SIZE = 16  # blocks; as wide as a screen, so most objects are in one or two cells
+
+Cell = Tuple[int, int]
+
+
+def _cells_in(rect: QRect) -> Iterator[Cell]:
+    # rects without a width or height still intersect with others, so they are in the cells next to them as well
+    left, right = sorted((rect.left(), rect.right()))
+    top, bottom = sorted((rect.top(), rect.bottom()))
+
+    for cell_x in range(left // CELL_SIZE, right // CELL_SIZE + 1):
+        for cell_y in range(top // CELL_SIZE, bottom // CELL_SIZE + 1):
+            yield cell_x, cell_y
+
+
+class SpatialIndex:
+    """
+    The objects of a level, by the cells of a uniform grid their rects cover, so finding the objects at a point, or in
+    a rect, only has to look at the objects in the cells there, instead of at every object in the level.
+
+    Objects are added and removed by the level. They tell the index themselves, when their rect might have changed, and
+    are put into the cells matching their new rect, before the next query is answered. So moving an object around only
+    costs anything, when the index is asked about it.
+    """
+
+    def __init__(self):
+        # the objects in every cell, by their id, since level objects are not hashable
+        self._cells: Dict[Cell, Dict[int, ObjectLike]] = {}
+
+        # every object in the index, with the rect it was put into the cells with, if it was yet
+        self._rects: Dict[int, Tuple[ObjectLike, Optional[QRect]]] = {}
+
+        self._outdated: Dict[int, ObjectLike] = {}
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    def add(self, obj: ObjectLike):
+        """Puts the object in. Its rect is only looked at, once the index is queried."""
+        self._rects[id(obj)] = obj, None
+        self._outdated[id(obj)] = obj
+
+    def remove(self, obj: ObjectLike):
+        self._take_out(obj)
+
+        self._rects.pop(id(obj), None)
+        self._outdated.pop(id(obj), None)
+
+    def clear(self):
+        self._cells.clear()
+        self._rects.clear()
+        self._outdated.clear()
+
+    def forget(self, obj: ObjectLike):
+        """Marks the rect of the object as outdated, if it is in the index, so it is looked at before the next query."""
+        if id(obj) in self._rects:
+            self._outdated[id(obj)] = obj
+
+    def update(self, obj: ObjectLike, rect: QRect):
+        """Moves the object into the cells of the given rect, if it is in the index and the rect changed."""
+        if id(obj) not in self._rects:
+            return
+
+        self._outdated.pop(id(obj), None)
+
+        if self._rects[id(obj)][1] == rect:
+            return
+
+        self._take_out(obj)
+
+        self._rects[id(obj)] = obj, QRect(rect)
+
+        for cell in _cells_in(rect):
+            self._cells.setdefault(cell, {})[id(obj)] = obj
+
+    def objects_in(self, rect: QRect) -> List[ObjectLike]:
+        """
+        Returns the objects, whose rects intersect with the given one, in no particular order.
+
+        :param rect: The rect to look in, in blocks.
+        """
+        self._update_outdated()
+
+        found: Dict[int, ObjectLike] = {}
+
+        for cell in _cells_in(rect):
+            for object_id, obj in self._cells.get(cell, {}).items():
+                if object_id not in found and self._rects[object_id][1].intersects(rect):
+                    found[object_id] = obj
+
+        return list(found.values())
+
+    def _update_outdated(self):
+        # looking at the rect of a level object might render it, which updates it and possibly others on its own
+        while self._outdated:
+            obj = next(iter(self._outdated.values()))
+
+            self.update(obj, obj.get_rect())
+
+    def _take_out(self, obj: ObjectLike):
+        _, rect = self._rects.get(id(obj), (None, None))
+
+        if rect is None:
+            return
+
+        for cell in _cells_in(rect):
+            objects_in_cell = self._cells[cell]
+
+            del objects_in_cell[id(obj)]
+
+            if not objects_in_cell:
+                del self._cells[cell]
@@ -0,0 +1,94 @@
+"""
+Times repainting the level objects of Level 1-1 with zoom levels 1, 2 and 4, once block by block, as levels used to be
+drawn, and once out of the block atlas.
+
+Needs a SMB3(U) Rom named SMB3.nes in the root of the repository, like the tests.
+
+Run with: python -m foundry.game.level.benchmark_level_drawing
+"""
+from timeit import timeit
+from typing import Callable
+
+from PySide2.QtGui import QImage, QPainter
+from PySide2.QtWidgets import QApplication
+
+from foundry import root_dir
+from foundry.game.File import ROM
+from foundry.game.gfx.drawable.Block import get_block
+from foundry.game.gfx.objects.LevelObject import BLANK
+from foundry.game.level.Level import Level
+from foundry.game.level.LevelRef import LevelRef
+from foundry.gui.ContextMenu import ContextMenu
+from foundry.gui.LevelView import LevelView
+from smb3parse.objects.object_set import PLAINS_OBJECT_SET
+
+LEVEL_1_1_OBJECT_ADDRESS = 0x1FB92
+LEVEL_1_1_ENEMY_ADDRESS = 0xC537 + 1
+
+ZOOM_LEVELS = [1, 2, 4]
+REPEATS = 10
+
+
+def draw_block_by_block(painter: QPainter, level_view: LevelView):
+    for level_object in level_view.level_ref.level.objects:
+        for index, block_index in enumerate(level_object.rendered_blocks):
+            if block_index == BLANK:
+                continue
+
+            x = (level_object.rendered_base_x + index % level_object.rendered_width) * level_view.block_length
+            y = (level_object.rendered_base_y + index // level_object.rendered_width) * level_view.block_length
+
+            block = get_block(block_index, level_object.palette_group, level_object.graphics_set, level_object.tsa_data)
+            block.draw(painter, x, y, level_view.block_length, level_object.selected, level_view.transparency)
+
+
+def draw_with_atlas(painter: QPainter, level_view: LevelView):
+    for level_object in level_view.level_ref.level.objects:
+        level_object.draw(painter, level_view.block_length, level_view.transparency)
+
+
+def level_1_1_view(zoom: int) -> LevelView:
+    """A level view of Level 1-1 with the given zoom, which was drawn once already, so all caches are filled."""
+    ref = LevelRef()
+    ref._internal_level = Level("Level 1-1", LEVEL_1_1_OBJECT_ADDRESS, LEVEL_1_1_ENEMY_ADDRESS, PLAINS_OBJECT_SET)
+
+    level_view = LevelView(None, ref, ContextMenu(ref))
+    level_view.zoom = zoom
+    level_view.resize(level_view.sizeHint())
+
+    level_view.grab()
+
+    return level_view
+
+
+def frame_time(level_view: LevelView, draw: Callable[[QPainter, LevelView], None]) -> float:
+    """The average time in milliseconds, it takes to draw the level objects of the level view in the given way."""
+    frame = QImage(level_view.size(), QImage.Format_ARGB32_Premultiplied)
+
+    def repaint():
+        painter = QPainter(frame)
+        draw(painter, level_view)
+        painter.end()
+
+    return timeit(repaint, number=REPEATS) / REPEATS * 1000
+
+
+def main():
+    ROM(str(root_dir / "SMB3.nes"))
+
+    print(f"{'zoom':>4} {'block by block (ms)':>20} {'atlas (ms)':>11}")
+
+    for zoom in ZOOM_LEVELS:
+        level_view = level_1_1_view(zoom)
+
+        block_by_block = frame_time(level_view, draw_block_by_block)
+        with_atlas = frame_time(level_view, draw_with_atlas)
+
+        print(f"{zoom:>4} {block_by_block:>20.2f} {with_atlas:>11.2f}")
+
+
+if __name__ == "__main__":
+    # drawing into pixmaps needs an application
+    app = QApplication([])
+
+    main()
@@ -0,0 +1,107 @@
+from foundry.game.File import ROM
+from foundry.game.gfx.objects.LevelObject import BLANK
+from foundry.game.level.BlockGrid import BlockGrid, EMPTY
+
+
+def _rendered_grid(level) -> BlockGrid:
+    for level_object in level.objects:
+        level_object.render()
+
+    return level.update_block_grid()
+
+
+def _fresh_grid(level) -> BlockGrid:
+    block_grid = BlockGrid()
+    block_grid.update(level.objects, *level.size)
+
+    return block_grid
+
+
+def test_block_grid_keeps_last_object_on_top(level):
+    # GIVEN a level
+    pass
+
+    # WHEN its block grid is built
+    block_grid = _rendered_grid(level)
+
+    # THEN every block of the last object is on top in the grid
+    level_object = level.objects[-1]
+
+    for index, block_index in enumerate(level_object.rendered_blocks):
+        x = level_object.rendered_base_x + index % level_object.rendered_width
+        y = level_object.rendered_base_y + index // level_object.rendered_width
+
+        if block_index == BLANK or not block_grid.get_rect().contains(x, y):
+            continue
+
+        if block_index > 0xFF:
+            block_index = ROM().get_byte(block_index)
+
+        assert block_grid.block_at(x, y) == block_index
+        assert block_grid.object_at(x, y) is level_object
+
+
+def test_block_grid_after_moving_object(level):
+    # GIVEN a level with a block grid
+    block_grid = _rendered_grid(level)
+    level_object = level.objects[0]
+
+    old_rect = level_object.get_rect()
+
+    # WHEN an object is moved
+    level_object.move_by(3, -2)
+
+    block_grid = _rendered_grid(level)
+
+    # THEN the grid looks the same, as if it was built from scratch
+    fresh_grid = _fresh_grid(level)
+
+    assert block_grid.blocks == fresh_grid.blocks
+    assert block_grid.owners == fresh_grid.owners
+    assert block_grid.covered == fresh_grid.covered
+
+    # and the old position of the object is not covered by it anymore
+    for x in range(old_rect.left(), old_rect.left() + old_rect.width()):
+        for y in range(old_rect.top(), old_rect.top() + old_rect.height()):
+            if not level_object.get_rect().contains(x, y):
+                assert block_grid.object_at(x, y) is not level_object
+
+
+def test_block_grid_after_removing_object(level):
+    # GIVEN a level with a block grid
+    _rendered_grid(level)
+
+    # WHEN all objects are removed
+    for level_object in level.objects.copy():
+        level.remove_object(level_object)
+
+    block_grid = _rendered_grid(level)
+
+    # THEN the grid is empty
+    assert set(block_grid.blocks) == {EMPTY}
+    assert not block_grid.covered
+
+
+def test_block_grid_after_moving_object_under_platform(level):
+    # GIVEN a level with a platform and a platform above it, which extends down to the ground, and a block grid
+    lower_platform = level.add_object(0, 0x12, 10, 20, None)
+    upper_platform = level.add_object(0, 0x41, 11, 5, None)
+
+    level.update_block_grid()
+
+    assert upper_platform.get_rect().bottom() + 1 == 20
+
+    # WHEN only the lower platform is moved out from under the upper one and given as changed
+    lower_platform.move_by(-5, 0)
+
+    block_grid = level.update_block_grid(changed_objects=[lower_platform])
+
+    # THEN the upper platform was rendered again and extends down to the ground
+    assert upper_platform.get_rect().bottom() + 1 == upper_platform.ground_level
+
+    # and the grid looks the same, as if it was built from scratch
+    fresh_grid = _fresh_grid(level)
+
+    assert block_grid.blocks == fresh_grid.blocks
+    assert block_grid.owners == fresh_grid.owners
+    assert block_grid.covered == fresh_grid.covered
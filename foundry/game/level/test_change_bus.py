@@ -0,0 +1,66 @@
+from foundry.game.level.ChangeBus import (
+    ChangeBus,
+    HeaderChanged,
+    JumpsChanged,
+    LevelChanged,
+    ObjectsAdded,
+    ObjectsMoved,
+    ObjectsRemoved,
+)
+
+
+def test_changes_delivered_once_per_loop_iteration(qtbot):
+    # GIVEN a change bus and two objects
+    bus = ChangeBus()
+    first, second = object(), object()
+
+    batches = []
+    bus.batch_ready.connect(batches.append)
+
+    # WHEN multiple changes are posted in one go
+    bus.post(ObjectsAdded([first]))
+    bus.post(ObjectsMoved([first, second]))
+    bus.post(ObjectsRemoved([second]))
+
+    # THEN they are not delivered right away
+    assert not batches
+    assert len(bus.pending) == 3
+
+    # WHEN control returns to the event loop
+    qtbot.waitUntil(lambda: bool(batches))
+
+    # THEN they arrive together, in the order they were posted in
+    assert len(batches) == 1
+    assert not bus.pending
+
+    batch = batches[0]
+
+    assert [type(change) for change in batch] == [ObjectsAdded, ObjectsMoved, ObjectsRemoved]
+    assert batch.objects(ObjectsAdded, ObjectsMoved) == [first, second]
+
+    assert batch.affects(ObjectsRemoved)
+    assert not batch.affects(HeaderChanged, JumpsChanged)
+
+
+def test_level_changed_affects_everything(qtbot):
+    # GIVEN a change bus, to which a change of the whole level was posted
+    bus = ChangeBus()
+
+    batches = []
+    bus.batch_ready.connect(batches.append)
+
+    bus.post(LevelChanged())
+
+    # WHEN it is flushed
+    bus.flush()
+
+    # THEN the batch was delivered right away and affects every kind of change
+    assert len(batches) == 1
+    assert batches[0].affects(HeaderChanged)
+    assert batches[0].affects(ObjectsAdded, ObjectsRemoved)
+
+    # WHEN it is flushed again, without new changes
+    bus.flush()
+
+    # THEN nothing is delivered
+    assert len(batches) == 1
@@ -0,0 +1,60 @@
+from foundry.game.gfx.objects.LevelObjectFactory import LevelObjectFactory
+from smb3parse.objects.object_set import PLAINS_GRAPHICS_SET, PLAINS_OBJECT_SET
+
+WHITE_PLATFORM_TO_GROUND = 0, 0x12  # 3 blocks wide
+BLUE_PLATFORM_TO_GROUND = 0, 0x41  # 2 blocks wide
+
+
+def _platform(factory, objects, object_type, x, y):
+    level_object = factory.from_properties(*object_type, x, y, None, len(objects))
+    objects.append(level_object)
+
+    return level_object
+
+
+def test_platform_stops_on_object_before_it():
+    # GIVEN a platform, and a platform above it, which extends to the ground
+    objects = []
+    factory = LevelObjectFactory(PLAINS_OBJECT_SET, PLAINS_GRAPHICS_SET, 0, objects, False)
+
+    lower_platform = _platform(factory, objects, WHITE_PLATFORM_TO_GROUND, 10, 20)
+    upper_platform = _platform(factory, objects, BLUE_PLATFORM_TO_GROUND, 11, 5)
+
+    # WHEN the upper platform is rendered
+    # THEN it stops on top of the lower one, which was rendered for it
+    assert upper_platform.get_rect().bottom() + 1 == lower_platform.get_rect().top() == 20
+
+    # WHEN the lower platform is moved out from under it
+    lower_platform.move_by(-5, 0)
+    upper_platform.render()
+
+    # THEN it extends down to the ground
+    assert upper_platform.get_rect().bottom() + 1 == upper_platform.ground_level
+
+    # WHEN the lower platform is moved back and then removed
+    lower_platform.move_by(5, 0)
+    upper_platform.render()
+
+    assert upper_platform.get_rect().bottom() + 1 == 20
+
+    objects.remove(lower_platform)
+    upper_platform.render()
+
+    # THEN the upper platform extends down to the ground again
+    assert upper_platform.get_rect().bottom() + 1 == upper_platform.ground_level
+
+
+def test_platform_ignores_objects_after_it():
+    # GIVEN a platform, which extends to the ground, and a platform after it, underneath it
+    objects = []
+    factory = LevelObjectFactory(PLAINS_OBJECT_SET, PLAINS_GRAPHICS_SET, 0, objects, False)
+
+    upper_platform = _platform(factory, objects, BLUE_PLATFORM_TO_GROUND, 11, 5)
+    _platform(factory, objects, WHITE_PLATFORM_TO_GROUND, 10, 20)
+
+    # WHEN the objects are rendered, last to first
+    for level_object in reversed(objects):
+        level_object.render()
+
+    # THEN the upper platform is not stopped by the later one
+    assert upper_platform.get_rect().bottom() + 1 == upper_platform.ground_level
@@ -3,6 +3,7 @@ import pytest
 from foundry.game.gfx.objects.EnemyItem import EnemyObject
 from foundry.game.gfx.objects.Jump import Jump
 from foundry.game.gfx.objects.LevelObject import LevelObject
+from foundry.game.level.ChangeBus import ObjectsAdded
 from foundry.game.level.Level import LEVEL_DEFAULT_HEIGHT
 
 
@@ -94,3 +95,94 @@ def test_level_insert_in_vertical_level(level):
     assert added_object.obj_index == object_index
     assert added_object.rendered_base_x == x
     assert added_object.rendered_base_y == y
+
+
+def test_object_indexes_with_identical_objects(level):
+    # GIVEN a level with two identical objects at its end
+    first_copy = level.add_object(0, 0x00, 5, 5, None)
+    second_copy = level.add_object(0, 0x00, 5, 5, None)
+
+    assert first_copy == second_copy
+
+    # WHEN an object is added in front of them, and the second copy is removed again
+    front_object = level.add_object(0, 0x00, 0, 0, None, 0)
+
+    level.remove_object(second_copy)
+
+    # THEN the first copy is still in the level, and every object knows its position
+    assert level.objects[0] is front_object
+    assert level.objects[-1] is first_copy
+
+    for index, level_object in enumerate(level.objects):
+        assert level_object.index_in_level == index
+        assert level.index_of(level_object) == index
+
+
+def test_add_enemy_in_front_of_the_other_enemies(level):
+    # GIVEN a level with an enemy, which reports its changes
+    level.add_enemy(0x72, 5, 5)
+
+    changes = []
+    level.changes.connect(changes.append)
+
+    # WHEN an enemy is added in front of it
+    enemy = level.add_enemy(0x72, 10, 5, index=0)
+
+    # THEN it is the first enemy, can be found where it is and was reported as added
+    assert level.enemies[0] is enemy
+    assert level.index_of(enemy) == len(level.objects)
+
+    assert enemy in level.spatial_index.objects_in(enemy.get_rect())
+
+    assert [type(change) for change in changes] == [ObjectsAdded]
+    assert changes[0].objects == [enemy]
+
+
+def test_object_indexes_after_bringing_to_foreground(level):
+    # GIVEN a level with an object behind another one
+    background_object = level.add_object(0, 0x00, 5, 5, None, 0)
+    foreground_object = level.add_object(0, 0x00, 5, 5, None)
+
+    # WHEN the object is brought to the foreground
+    level.bring_to_foreground([background_object])
+
+    # THEN the objects swapped places, and every object knows its position
+    assert level.objects[-1] is background_object
+    assert level.objects[-2] is foreground_object
+
+    for index, level_object in enumerate(level.objects):
+        assert level_object.index_in_level == index
+
+    # WHEN it is brought to the background again
+    level.bring_to_background([background_object])
+
+    # THEN it is behind the other object again
+    assert level.objects[-1] is foreground_object
+    assert background_object.index_in_level < foreground_object.index_in_level
+
+    for index, level_object in enumerate(level.objects):
+        assert level_object.index_in_level == index
+
+
+def test_undo_keeps_unchanged_objects(level):
+    # GIVEN a level, in which a selected object was moved and an enemy added, after its state was taken
+    state_before = level.to_bytes()
+
+    untouched_object, moved_object = level.objects[:2]
+
+    moved_object.move_by(1, 0)
+    enemy = level.add_enemy(0x72, 5, 5)
+
+    level.selection.replace([moved_object, untouched_object])
+
+    # WHEN the level is brought back into the earlier state
+    level.update_from_bytes(*state_before)
+
+    # THEN it is in that state, but only the moved object was changed, while keeping its place in the selection
+    assert level.to_bytes() == state_before
+
+    assert level.objects[0] is untouched_object
+    assert level.objects[1] is moved_object
+
+    assert enemy not in level.enemies
+    assert level.selection.objects == [moved_object, untouched_object]
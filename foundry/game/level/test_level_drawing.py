@@ -1,14 +1,19 @@
 import os
 from pathlib import Path
+from typing import Callable
 
 import pytest
 from PySide2.QtCore import QPoint, QRect, QSize
+from PySide2.QtGui import QImage, QPainter
 
 from foundry import data_dir
 from foundry.conftest import compare_images
-from foundry.game.gfx.drawable.Block import Block
+from foundry.game.gfx.drawable.DrawableCache import drawable_cache
+from foundry.game.gfx.objects.LevelObject import LevelObject
 from foundry.game.level.LevelRef import LevelRef
+from foundry.game.level.benchmark_level_drawing import draw_block_by_block, draw_with_atlas
 from foundry.gui.ContextMenu import ContextMenu
+from foundry.gui.LevelLayer import TILE_SIZE
 from foundry.gui.LevelView import LevelView
 from smb3parse.levels import HEADER_LENGTH
 from smb3parse.objects.object_set import WORLD_MAP_OBJECT_SET
@@ -67,7 +72,7 @@ def test_level(level_info, qtbot):
     level_ref = LevelRef()
     level_ref.load_level(*level_info)
 
-    Block._block_cache.clear()
+    drawable_cache.clear()
 
     # monkeypatch level names, since the level name data is broken atm
     level_ref.level.name = current_test_name()
@@ -121,3 +126,133 @@ def test_draw_m3ls(m3l_file_name, level, qtbot):
         view.draw_grid = False
 
         compare_images(m3l_file_name.stem, str(reference_image_dir / f"{m3l_file_name.stem}.png"), view.grab())
+
+
+def _drawn_objects(level_view: LevelView, draw: Callable[[QPainter, LevelView], None]) -> QImage:
+    image = QImage(level_view.size(), QImage.Format_ARGB32_Premultiplied)
+    image.fill(0)
+
+    painter = QPainter(image)
+    draw(painter, level_view)
+    painter.end()
+
+    return image
+
+
+@pytest.mark.parametrize("zoom", [1, 2, 4])
+def test_level_1_1_atlas_draws_like_blocks(zoom, level, qtbot):
+    # GIVEN Level 1-1 in a level view
+    ref = LevelRef()
+    ref._internal_level = level
+
+    level_view = LevelView(None, ref, ContextMenu(ref))
+    level_view.zoom = zoom
+    level_view.resize(level_view.sizeHint())
+
+    qtbot.addWidget(level_view)
+
+    # WHEN the objects of the level are drawn using the block atlas and block by block
+    atlas_image = _drawn_objects(level_view, draw_with_atlas)
+    block_image = _drawn_objects(level_view, draw_block_by_block)
+
+    # THEN both look the same
+    assert atlas_image == block_image
+
+
+def test_level_drawn_in_parts(level, qtbot):
+    # GIVEN Level 1-1 in a level view, with a grid and jumps drawn on top
+    ref = LevelRef()
+    ref._internal_level = level
+
+    level_view = LevelView(None, ref, ContextMenu(ref))
+    level_view.draw_grid = True
+    level_view.draw_jumps = True
+    level_view.resize(level_view.sizeHint())
+
+    level_drawer = level_view.level_drawer
+
+    # WHEN it is drawn once at a whole and once in parts, which don't line up with the blocks
+    whole_image = QImage(level_view.size(), QImage.Format_ARGB32)
+    whole_image.fill(0)
+
+    painter = QPainter(whole_image)
+    level_drawer.draw(painter, level)
+    painter.end()
+
+    image_in_parts = QImage(level_view.size(), QImage.Format_ARGB32)
+    image_in_parts.fill(0)
+
+    part_width, part_height = 101, 77
+
+    for x in range(0, level_view.width(), part_width):
+        for y in range(0, level_view.height(), part_height):
+            painter = QPainter(image_in_parts)
+            level_drawer.draw(painter, level, QRect(x, y, part_width, part_height))
+            painter.end()
+
+    # THEN both images are the same
+    assert whole_image == image_in_parts
+
+
+def test_toggling_grid_only_redraws_annotations(level, qtbot):
+    # GIVEN Level 1-1 in a level view, which was drawn once already
+    ref = LevelRef()
+    ref._internal_level = level
+
+    level_view = LevelView(None, ref, ContextMenu(ref))
+    level_view.draw_grid = False
+    level_view.resize(level_view.sizeHint())
+
+    level_view.grab()
+
+    tiles = -(-level_view.width() // TILE_SIZE) * -(-level_view.height() // TILE_SIZE)
+    misses_before = drawable_cache.info().misses
+
+    # WHEN the grid is turned on and the level is drawn again
+    level_view.draw_grid = True
+    level_view.grab()
+
+    # THEN only the tiles of one layer needed to be drawn anew
+    assert drawable_cache.info().misses - misses_before == tiles
+
+
+def test_unchanged_level_drawn_without_rendering(level, qtbot, monkeypatch):
+    # GIVEN Level 1-1 in a level view, which was drawn once already
+    ref = LevelRef()
+    ref._internal_level = level
+
+    level_view = LevelView(None, ref, ContextMenu(ref))
+    level_view.resize(level_view.sizeHint())
+
+    level_view.grab()
+
+    rendered_objects = []
+    monkeypatch.setattr(LevelObject, "render", rendered_objects.append)
+
+    # WHEN the level is drawn again, without anything having changed
+    level_view.grab()
+
+    # THEN no level object was rendered again
+    assert not rendered_objects
+
+
+def test_unchanged_level_drawn_without_looking_at_objects(level, qtbot, monkeypatch):
+    # GIVEN Level 1-1 in a level view, with expansions drawn on top, which was drawn once already
+    ref = LevelRef()
+    ref._internal_level = level
+
+    level_view = LevelView(None, ref, ContextMenu(ref))
+    level_view.draw_expansions = True
+    level_view.resize(level_view.sizeHint())
+
+    level_view.grab()
+
+    looked_at_objects = []
+    monkeypatch.setattr(LevelObject, "get_rect", lambda *args: looked_at_objects.append(args))
+    monkeypatch.setattr(LevelObject, "expands", lambda *args: looked_at_objects.append(args))
+
+    # WHEN the level is drawn again, without anything having changed
+    level_view.grab()
+
+    # THEN the layers knew they were up to date, without going through the level objects
+    assert not looked_at_objects
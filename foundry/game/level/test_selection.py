@@ -0,0 +1,68 @@
+from foundry.game.gfx.objects.LevelObjectFactory import LevelObjectFactory
+from foundry.game.level.Selection import Selection
+from smb3parse.objects.object_set import PLAINS_GRAPHICS_SET, PLAINS_OBJECT_SET
+
+WOODEN_BLOCK = 0, 0x13
+
+
+def test_selection_reports_changes():
+    # GIVEN a selection and three objects, of which two look the same
+    factory = LevelObjectFactory(PLAINS_OBJECT_SET, PLAINS_GRAPHICS_SET, 0, [], False)
+
+    first, second, third = [factory.from_properties(*WOODEN_BLOCK, 5, 5, None, index) for index in range(2)] + [
+        factory.from_properties(*WOODEN_BLOCK, 10, 5, None, 2)
+    ]
+
+    assert first == second
+
+    selection = Selection(lambda obj: obj.index_in_level)
+
+    changes = []
+    selection.changed.connect(lambda added, removed: changes.append((added, removed)))
+
+    # WHEN two objects are selected and then another one is added
+    selection.replace([second, first])
+    selection.add([third, first])
+
+    # THEN they are selected in that order, and only the objects, which changed, were reported
+    assert selection.objects == [second, first, third]
+    assert all(obj.selected for obj in [first, second, third])
+
+    assert len(changes) == 2
+    assert changes[1][0] == [third] and changes[1][1] == []
+
+    # WHEN the selection is replaced with one of the identical looking objects
+    selection.replace([first])
+
+    # THEN only the other objects are reported as deselected
+    added, removed = changes[-1]
+
+    assert added == []
+    assert [id(obj) for obj in removed] == [id(second), id(third)]
+
+    assert first in selection and second not in selection
+    assert first.selected and not second.selected and not third.selected
+
+    # WHEN nothing changes
+    assert not selection.replace([first])
+
+    # THEN nothing is reported
+    assert len(changes) == 3
+
+
+def test_selection_in_level_order():
+    # GIVEN a selection and three objects in a level
+    factory = LevelObjectFactory(PLAINS_OBJECT_SET, PLAINS_GRAPHICS_SET, 0, [], False)
+
+    level_objects = [factory.from_properties(*WOODEN_BLOCK, 5 * index, 5, None, index) for index in range(3)]
+    first, second, third = level_objects
+
+    selection = Selection(lambda obj: obj.index_in_level)
+
+    # WHEN they are selected back to front
+    selection.replace([third, first])
+    selection.add([second])
+
+    # THEN they stay in the order they were selected in, but can be had in the order they are in the level
+    assert [id(obj) for obj in selection.objects] == [id(third), id(first), id(second)]
+    assert [id(obj) for obj in selection.in_level_order()] == [id(first), id(second), id(third)]
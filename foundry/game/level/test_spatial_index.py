@@ -0,0 +1,52 @@
+from PySide2.QtCore import QRect
+
+from foundry.game.gfx.objects.EnemyItemFactory import EnemyItemFactory
+from foundry.game.gfx.objects.LevelObjectFactory import LevelObjectFactory
+from foundry.game.level.SpatialIndex import CELL_SIZE, SpatialIndex
+from smb3parse.objects.object_set import PLAINS_GRAPHICS_SET, PLAINS_OBJECT_SET
+
+WHITE_PLATFORM = 0, 0x10
+GOOMBA = 0x72
+
+
+def test_objects_found_where_they_are():
+    # GIVEN an index with a platform spanning two cells and an enemy
+    objects = []
+    spatial_index = SpatialIndex()
+
+    object_factory = LevelObjectFactory(
+        PLAINS_OBJECT_SET, PLAINS_GRAPHICS_SET, 0, objects, False, spatial_index=spatial_index
+    )
+    enemy_factory = EnemyItemFactory(PLAINS_OBJECT_SET, 0, spatial_index=spatial_index)
+
+    platform = object_factory.from_properties(*WHITE_PLATFORM, CELL_SIZE - 1, 5, None, 0)
+    goomba = enemy_factory.from_properties(GOOMBA, 40, 20)
+
+    spatial_index.add(platform)
+    spatial_index.add(goomba)
+
+    # WHEN the objects are looked for
+    # THEN they are found at every point they cover, in both cells, and nowhere else
+    assert spatial_index.objects_in(QRect(CELL_SIZE - 1, 5, 1, 1)) == [platform]
+    assert spatial_index.objects_in(QRect(CELL_SIZE, 5, 1, 1)) == [platform]
+    assert spatial_index.objects_in(QRect(0, 0, CELL_SIZE - 1, 5)) == []
+
+    assert spatial_index.objects_in(goomba.get_rect()) == [goomba]
+
+    # WHEN they are moved
+    platform.move_by(CELL_SIZE * 2, 0)
+    goomba.set_position(0, 0)
+
+    # THEN they are only found where they are now
+    assert spatial_index.objects_in(QRect(CELL_SIZE, 5, 1, 1)) == []
+    assert spatial_index.objects_in(platform.get_rect()) == [platform]
+
+    assert spatial_index.objects_in(goomba.get_rect()) == [goomba]
+    assert spatial_index.objects_in(QRect(40, 20, 1, 1)) == []
+
+    # WHEN the platform is removed
+    spatial_index.remove(platform)
+
+    # THEN it isn't found anymore
+    assert spatial_index.objects_in(platform.get_rect()) == []
+    assert len(spatial_index) == 1
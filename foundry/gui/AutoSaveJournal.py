@@ -0,0 +1,255 @@
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Tuple
+
+from foundry.game.level import LevelByteData
+from foundry.gui.UndoStack import BytePatch, UndoHistory
+
+FSYNC_INTERVAL = 1.0
+"""Seconds between making sure appended records are on disk. In between they are only handed to the OS."""
+
+COMPACTION_MIN_SIZE = 64 * 1024
+"""The journal is not compacted, before it is at least this big, in bytes."""
+
+_SNAPSHOT = 1
+_STATE = 2
+
+_RECORD_HEADER = struct.Struct("<BI")  # record type, size of the payload
+_CHECKSUM = struct.Struct("<I")  # crc32 over header and payload
+
+_OBJECT_SET = struct.Struct("<B")
+_HISTORY = struct.Struct("<III")  # dropped states, undo index, number of states
+_BUFFER = struct.Struct("<II")  # offset, size of the following data
+_PATCH = struct.Struct("<IIII")  # offset, start and end of the replaced range, size of the following data
+
+_Position = Tuple[int, int, int]
+
+
+class JournalContents(NamedTuple):
+    object_set_number: int
+    undo_index: int
+    states: List[LevelByteData]
+
+
+def _record(record_type: int, payload: bytes) -> bytes:
+    data = _RECORD_HEADER.pack(record_type, len(payload)) + payload
+
+    return data + _CHECKSUM.pack(zlib.crc32(data))
+
+
+def _read_records(data: bytes) -> List[Tuple[int, bytes]]:
+    """Returns the records in the data, up to the first one, that was not written completely."""
+    records = []
+    position = 0
+
+    while position + _RECORD_HEADER.size <= len(data):
+        record_type, size = _RECORD_HEADER.unpack_from(data, position)
+
+        end = position + _RECORD_HEADER.size + size
+
+        if end + _CHECKSUM.size > len(data):
+            break
+
+        (checksum,) = _CHECKSUM.unpack_from(data, end)
+
+        if checksum != zlib.crc32(data[position:end]):
+            break
+
+        records.append((record_type, data[position + _RECORD_HEADER.size : end]))
+
+        position = end + _CHECKSUM.size
+
+    return records
+
+
+class AutoSaveJournal:
+    """
+    Keeps the undo history of the edited level on disk, so it can be recovered, should the editor crash.
+
+    Instead of writing the whole history after every change, only the state the level is now in is appended, as the
+    bytes, that changed compared to the state written before it, together with where in the history it is. A snapshot of
+    the whole history starts the journal and replaces it, when the level or its history was replaced as a whole, when
+    more than one state was saved since the last record, or once the journal grew large enough compared to the last
+    snapshot.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+        self._file: Optional[BinaryIO] = None
+        self._last_sync = 0.0
+        self._size_after_compaction = 0
+
+        # what the journal knows of the history so far
+        self._object_set_number = -1
+        self._generation = -1
+        self._saved = 0
+        self._position: _Position = (0, 0, 0)
+        self._state: Optional[LevelByteData] = None
+
+    def record(self, object_set_number: int, history: UndoHistory):
+        """Appends the current state of the undo history, if it changed, since it was last recorded."""
+        state = history.current_state
+
+        if (
+            self._file is None
+            or self._state is None
+            or object_set_number != self._object_set_number
+            or history.generation != self._generation
+            # a state only builds on the states known before it, so saving more than one in between loses the others
+            or history.saved - self._saved > 1
+            or self._file.tell() > max(COMPACTION_MIN_SIZE, 2 * self._size_after_compaction)
+        ):
+            self.compact(object_set_number, history)
+            return
+
+        position = (history.dropped, history.undo_index, len(history))
+
+        if position == self._position and state == self._state:
+            return
+
+        payload = _HISTORY.pack(*position)
+
+        for (_, old_data), (offset, new_data) in zip(self._state, state):
+            patch = BytePatch.between(bytes(old_data), bytes(new_data))
+
+            payload += _PATCH.pack(offset, patch.start, patch.end, len(patch.data)) + patch.data
+
+        # should appending fail, the next record can't build on this one and starts over with a snapshot
+        self._state = None
+
+        self._append(_record(_STATE, payload))
+
+        self._saved = history.saved
+        self._position = position
+        self._state = state
+
+    def compact(self, object_set_number: int, history: UndoHistory):
+        """Replaces the journal with a snapshot of the whole history."""
+        undo_index, states = history.export_data()
+
+        payload = _OBJECT_SET.pack(object_set_number) + _HISTORY.pack(history.dropped, undo_index, len(states))
+
+        for state in states:
+            for offset, data in state:
+                payload += _BUFFER.pack(offset, len(data)) + data
+
+        self.close()
+
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+
+        with open(temp_path, "wb") as temp_file:
+            temp_file.write(_record(_SNAPSHOT, payload))
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+
+        os.replace(temp_path, self.path)
+
+        self._file = open(self.path, "ab")
+        self._last_sync = time.monotonic()
+        self._size_after_compaction = self._file.tell()
+
+        self._object_set_number = object_set_number
+        self._generation = history.generation
+        self._saved = history.saved
+        self._position = (history.dropped, undo_index, len(states))
+        self._state = states[undo_index] if states else None
+
+    def sync(self):
+        """Makes sure everything appended so far is on disk."""
+        if self._file is None:
+            return
+
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file is None:
+            return
+
+        self.sync()
+        self._file.close()
+
+        self._file = None
+
+    def _append(self, record: bytes):
+        assert self._file is not None
+
+        # handing it to the OS is enough to survive the editor crashing, only the OS crashing needs the fsync
+        self._file.write(record)
+        self._file.flush()
+
+        if time.monotonic() - self._last_sync >= FSYNC_INTERVAL:
+            self.sync()
+
+    @staticmethod
+    def replay(path: Path) -> Optional[JournalContents]:
+        """
+        Rebuilds the undo history from the journal at the given path.
+
+        :return: The history, or None, if there is no journal, or it does not start with a snapshot.
+        """
+        try:
+            with open(path, "rb") as journal_file:
+                records = _read_records(journal_file.read())
+        except FileNotFoundError:
+            return None
+
+        if not records or records[0][0] != _SNAPSHOT:
+            return None
+
+        history: Dict[int, LevelByteData] = {}
+
+        for record_type, payload in records:
+            if record_type == _SNAPSHOT:
+                (object_set_number,) = _OBJECT_SET.unpack_from(payload)
+                dropped, undo_index, length = _HISTORY.unpack_from(payload, _OBJECT_SET.size)
+
+                history.clear()
+                position = _OBJECT_SET.size + _HISTORY.size
+
+                for index in range(dropped, dropped + length):
+                    buffers = []
+
+                    for _ in range(2):
+                        offset, size = _BUFFER.unpack_from(payload, position)
+                        position += _BUFFER.size
+
+                        buffers.append((offset, bytearray(payload[position : position + size])))
+                        position += size
+
+                    history[index] = buffers[0], buffers[1]
+
+            elif record_type == _STATE:
+                current = history.get(dropped + undo_index)
+                dropped, undo_index, length = _HISTORY.unpack_from(payload)
+
+                if current is None:
+                    return None
+
+                position = _HISTORY.size
+                buffers = []
+
+                for _, old_data in current:
+                    offset, start, end, size = _PATCH.unpack_from(payload, position)
+                    position += _PATCH.size
+
+                    patch = BytePatch(start, end, payload[position : position + size])
+                    position += size
+
+                    buffers.append((offset, bytearray(patch.apply(bytes(old_data)))))
+
+                history[dropped + undo_index] = buffers[0], buffers[1]
+
+                for index in [index for index in history if not dropped <= index < dropped + length]:
+                    del history[index]
+
+        if any(index not in history for index in range(dropped, dropped + length)):
+            return None
+
+        return JournalContents(object_set_number, undo_index, [history[index] for index in sorted(history)])
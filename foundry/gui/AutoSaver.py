@@ -0,0 +1,170 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from PySide2.QtCore import QObject, Signal, SignalInstance
+
+from foundry.gui.AutoSaveJournal import AutoSaveJournal
+from foundry.gui.UndoStack import UndoHistory
+from foundry.gui.settings import SETTINGS
+
+MAX_DELAY_FACTOR = 5
+"""Changes are written at the latest this many delays after the first of them, even if more keep coming in."""
+
+
+def write_atomically(path: Path, data: bytes):
+    """Writes the data into a temporary file first, so the file at path is either the old or the new one, never half."""
+    temp_path = path.with_name(path.name + ".tmp")
+
+    with open(temp_path, "wb") as temp_file:
+        temp_file.write(data)
+        temp_file.flush()
+        os.fsync(temp_file.fileno())
+
+    os.replace(temp_path, path)
+
+
+class AutoSaver(QObject):
+    """
+    Writes the auto save in a thread of its own, so editing never waits on the disk.
+
+    Changes to the level and the ROM are handed over, as they happen, and are written together, once no new ones came in
+    for the configured delay. Every change of the level is still journaled, since the journal only stores what changed
+    between them, while the ROM is only written in the version it was last handed over in.
+    """
+
+    persisted: SignalInstance = Signal(float)
+    """Emitted with the time, as in time.time(), everything handed over up to then was written to disk at."""
+
+    def __init__(self, journal: AutoSaveJournal, rom_path: Path, delay: Optional[float] = None):
+        """
+        :param journal: The journal to record the changes to the level in.
+        :param rom_path: Where to write the ROM to.
+        :param delay: The seconds to wait for more changes, before writing them. Defaults to the "auto_save_delay"
+            setting.
+        """
+        super(AutoSaver, self).__init__()
+
+        self.journal = journal
+        self.rom_path = rom_path
+        self.delay = SETTINGS["auto_save_delay"] if delay is None else delay
+
+        self.last_persisted: Optional[float] = None
+
+        self._condition = threading.Condition()
+
+        # everything below is guarded by the condition
+        self._histories: List[Tuple[int, UndoHistory]] = []
+        self._rom_data: Optional[bytes] = None
+
+        self._first_change = 0.0
+        self._last_change = 0.0
+
+        self._writing = False
+        self._flushing = False
+        self._stopped = False
+
+        self._thread = threading.Thread(target=self._run, name="auto save", daemon=True)
+        self._thread.start()
+
+    def level_changed(self, object_set_number: int, history: Optional[UndoHistory]):
+        if history is None:
+            return
+
+        with self._condition:
+            self._histories.append((object_set_number, history))
+            self._changed()
+
+    def rom_changed(self, rom_data: bytes):
+        with self._condition:
+            self._rom_data = rom_data
+            self._changed()
+
+    def flush(self):
+        """Writes everything handed over so far right away and returns, once it is on disk."""
+        with self._condition:
+            self._flushing = True
+            self._condition.notify_all()
+
+            self._condition.wait_for(lambda: self._stopped or not (self._writing or self._has_changes()))
+
+            self._flushing = False
+
+    def stop(self):
+        """Drops the changes, that were not written yet, and ends the thread, after a running write is done."""
+        with self._condition:
+            self._histories.clear()
+            self._rom_data = None
+
+            self._stopped = True
+            self._condition.notify_all()
+
+        self._thread.join()
+
+        self.journal.close()
+
+    def _changed(self):
+        now = time.monotonic()
+
+        if not self._first_change:
+            self._first_change = now
+
+        self._last_change = now
+
+        self._condition.notify_all()
+
+    def _has_changes(self) -> bool:
+        return bool(self._histories) or self._rom_data is not None
+
+    def _write_at(self) -> float:
+        return min(self._last_change + self.delay, self._first_change + self.delay * MAX_DELAY_FACTOR)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if self._has_changes():
+                        if self._flushing:
+                            break
+
+                        time_left = self._write_at() - time.monotonic()
+
+                        if time_left <= 0:
+                            break
+
+                        self._condition.wait(time_left)
+                    else:
+                        self._condition.wait()
+
+                if self._stopped:
+                    return
+
+                histories, self._histories = self._histories, []
+                rom_data, self._rom_data = self._rom_data, None
+
+                self._first_change = 0.0
+                self._writing = True
+
+            try:
+                self._write(histories, rom_data)
+            except OSError:
+                logging.exception("Writing the auto save failed")
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def _write(self, histories: List[Tuple[int, UndoHistory]], rom_data: Optional[bytes]):
+        if rom_data is not None:
+            write_atomically(self.rom_path, rom_data)
+
+        for object_set_number, history in histories:
+            self.journal.record(object_set_number, history)
+
+        self.journal.sync()
+
+        self.last_persisted = time.time()
+        self.persisted.emit(self.last_persisted)
@@ -3,6 +3,7 @@ from typing import List, Optional
 from PySide2.QtWidgets import QCheckBox, QLabel, QVBoxLayout
 
 from foundry.game.gfx.objects.EnemyItem import EnemyObject
+from foundry.game.level.ChangeBus import ObjectsMoved
 from foundry.game.level.LevelRef import LevelRef
 from foundry.gui.CustomDialog import CustomDialog
 from foundry.gui.Spinner import Spinner
@@ -57,9 +58,9 @@ class AutoScrollEditor(CustomDialog):
     def _update_y_position(self, _):
         autoscroll_item = _get_autoscroll(self.level_ref.enemies)
 
-        autoscroll_item.y_position = self.y_position_spinner.value()
+        autoscroll_item.set_position(autoscroll_item.x_position, self.y_position_spinner.value())
 
-        self.level_ref.data_changed.emit()
+        self.level_ref.changes.post(ObjectsMoved([autoscroll_item]))
 
         self.update()
 
@@ -67,20 +68,14 @@ class AutoScrollEditor(CustomDialog):
         autoscroll_item = _get_autoscroll(self.level_ref.enemies)
 
         if autoscroll_item is not None:
-            self.level_ref.enemies.remove(autoscroll_item)
+            self.level_ref.level.remove_object(autoscroll_item)
 
         if should_insert:
-            self.level_ref.enemies.insert(0, self._create_autoscroll_object())
-
-        self.level_ref.data_changed.emit()
+            # the autoscroll item is always the first enemy of a level
+            self.level_ref.level.add_enemy(OBJ_AUTOSCROLL, 0, self.y_position_spinner.value(), index=0)
 
         self.update()
 
-    def _create_autoscroll_object(self):
-        return self.level_ref.level.enemy_item_factory.from_properties(
-            OBJ_AUTOSCROLL, 0, self.y_position_spinner.value()
-        )
-
     def closeEvent(self, event):
         current_autoscroll_item = _get_autoscroll(self.level_ref.enemies)
 
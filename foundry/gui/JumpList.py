@@ -2,6 +2,7 @@ from PySide2.QtCore import Signal, SignalInstance
 from PySide2.QtGui import QContextMenuEvent
 from PySide2.QtWidgets import QListWidget, QWidget, QMenu
 
+from foundry.game.level.ChangeBus import ChangeBatch, JumpsChanged
 from foundry.game.level.LevelRef import LevelRef
 
 ID_ADD_JUMP = 1
@@ -19,7 +20,7 @@ class JumpList(QListWidget):
 
         self._level_ref = level_ref
 
-        self._level_ref.data_changed.connect(self.update)
+        self._level_ref.changes.batch_ready.connect(self._on_level_changes)
         self.itemDoubleClicked.connect(lambda _: self.edit_jump.emit())
 
         self.setWhatsThis(
@@ -36,6 +37,10 @@ class JumpList(QListWidget):
             "level."
         )
 
+    def _on_level_changes(self, batch: ChangeBatch):
+        if batch.affects(JumpsChanged):
+            self.update()
+
     def update(self):
         self.clear()
 
@@ -1,22 +1,29 @@
-from itertools import product
-from typing import Tuple
+from typing import Dict, List, Optional, Sequence, Set, Tuple, TypeVar, Union
 
-from PySide2.QtCore import QPoint, QRect
-from PySide2.QtGui import QBrush, QColor, QImage, QPainter, QPen, Qt
+from PySide2.QtCore import QPoint, QRect, QSize
+from PySide2.QtGui import QBrush, QColor, QImage, QPainter, QPen, QPixmap, Qt
 
 from foundry import data_dir
 from foundry.game.File import ROM
-from foundry.game.gfx.GraphicsSet import GraphicsSet
+from foundry.game.gfx.GraphicsSet import load_graphics_set
 from foundry.game.gfx.Palette import NESPalette, bg_color_for_object_set, load_palette_group
 from foundry.game.gfx.drawable import apply_selection_overlay
 from foundry.game.gfx.drawable.Block import Block
+from foundry.game.gfx.drawable.BlockAtlas import BlockAtlas, get_block_atlas
 from foundry.game.gfx.objects.EnemyItem import EnemyObject, MASK_COLOR
-from foundry.game.gfx.objects.LevelObject import GROUND, SCREEN_HEIGHT, SCREEN_WIDTH
-from foundry.game.gfx.objects.ObjectLike import EXPANDS_BOTH, EXPANDS_HORIZ, EXPANDS_VERT
+from foundry.game.gfx.objects.LevelObject import (
+    GROUND,
+    LevelObject,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    SPECIAL_BACKGROUND_OBJECTS,
+)
+from foundry.game.gfx.objects.ObjectLike import EXPANDS_BOTH, EXPANDS_HORIZ, EXPANDS_VERT, ObjectLike
+from foundry.game.level.ChangeBus import ChangeBatch, HeaderChanged, JumpsChanged, OBJECT_CHANGES, PaletteChanged
 from foundry.game.level.Level import Level
 from foundry.gui.AutoScrollDrawer import AutoScrollDrawer
+from foundry.gui.LevelLayer import LevelLayer
 from smb3parse.constants import OBJ_AUTOSCROLL
-from smb3parse.levels import LEVEL_MAX_LENGTH
 from smb3parse.objects.object_set import CLOUDY_OBJECT_SET, DESERT_OBJECT_SET, DUNGEON_OBJECT_SET, ICE_OBJECT_SET
 
 png = QImage(str(data_dir / "gfx.png"))
@@ -65,29 +72,27 @@ ITEM_ARROW = _load_from_png(53, 53)
 
 EMPTY_IMAGE = _load_from_png(0, 53)
 
+SELECTION_FRAME_COLOR = QColor(0x00, 0x00, 0x00, 0x80)
 
-SPECIAL_BACKGROUND_OBJECTS = [
-    "blue background",
-    "starry background",
-    "underground background under this",
-    "sets background to actual background color",
-]
+_T = TypeVar("_T", bound=ObjectLike)
 
 
-def _block_from_index(block_index: int, level: Level) -> Block:
+def _block_atlas(level: Level, block_length: int, selected=False, transparent=False) -> BlockAtlas:
     """
-    Returns the block at the given index, from the TSA table for the given level.
+    Returns the atlas of all blocks of the given level, drawn with the given block length.
 
-    :param block_index:
     :param level:
+    :param block_length:
+    :param selected:
+    :param transparent:
     :return:
     """
 
     palette_group = load_palette_group(level.object_set_number, level.header.object_palette_index)
-    graphics_set = GraphicsSet(level.header.graphic_set_index)
+    graphics_set = load_graphics_set(level.header.graphic_set_index)
     tsa_data = ROM().get_tsa_data(level.object_set_number)
 
-    return Block(block_index, palette_group, graphics_set, tsa_data)
+    return get_block_atlas(palette_group, graphics_set, tsa_data, block_length, selected, transparent)
 
 
 class LevelDrawer:
@@ -107,7 +112,325 @@ class LevelDrawer:
         self.grid_pen = QPen(QColor(0x80, 0x80, 0x80, 0x80), width=1)
         self.screen_pen = QPen(QColor(0xFF, 0x00, 0x00, 0xFF), width=1)
 
-    def draw(self, painter: QPainter, level: Level):
+        # the part of the level, that is drawn, in pixels, extended to whole blocks
+        self.visible_rect = QRect()
+
+        self.changed_rect = QRect()
+        """The part of the level, in pixels, which looks different since the last time it was drawn."""
+
+        # the atlas to draw the blocks of every level object with, by the id of the object, made when it is first needed
+        self._atlases: Dict[int, BlockAtlas] = {}
+        self._atlas_settings: Tuple[int, bool] = (0, False)
+
+        # the level drawn last and its level objects, which changed since then, by their id, or None, if all might have
+        self._level: Optional[Level] = None
+        self._changed_objects: Optional[Dict[int, LevelObject]] = None
+
+        # the rects of the selected level objects in blocks, by their id, when they were drawn last, and the level
+        # objects, whose selection frame might have changed since then, or None, if all might have
+        self._selection_rects: Dict[int, QRect] = {}
+        self._objects_to_frame: Optional[Dict[int, LevelObject]] = None
+
+        # counted up, whenever the level objects, the enemies and items, or the jumps change, so the layers depending on
+        # them know they are outdated, without looking at all of them, every time the level is drawn
+        self._object_generation = 0
+        self._enemy_generation = 0
+        self._jump_generation = 0
+
+        self.lifted_objects: List[Union[LevelObject, EnemyObject]] = []
+        """Objects, which are left out of the level, because they are drawn on their own, while they are dragged."""
+
+        self._lifted_ids: Set[int] = set()
+
+        # the lifted objects, as they looked when they were lifted, and where that was, in pixels
+        self._lifted_pixmap = QPixmap()
+        self._lifted_rect = QRect()
+
+        self.lifted_offset = QPoint()
+        """How far the pixmap of the lifted objects was moved from where they were lifted, in blocks."""
+
+        # the background only depends on the look of the level, so levels looking the same can share it
+        self.background_layer = LevelLayer(self._draw_background_layer, shared=True)
+        self.object_layer = LevelLayer(self._draw_object_layer)
+        self.enemy_layer = LevelLayer(self._draw_enemy_layer)
+        self.overlay_layer = LevelLayer(self._draw_overlay_layer)
+        self.annotation_layer = LevelLayer(self._draw_annotation_layer)
+
+        self.layers = [
+            self.background_layer,
+            self.object_layer,
+            self.enemy_layer,
+            self.overlay_layer,
+            self.annotation_layer,
+        ]
+
+    def draw(self, painter: QPainter, level: Level, clip_rect: Optional[QRect] = None):
+        """
+        Draws the level and everything the drawer was set up to draw on top of it.
+
+        :param painter: The painter to draw with.
+        :param level: The level to draw.
+        :param clip_rect: The part of the level to draw, in pixels. Objects and blocks outside of it are skipped.
+        """
+        level_rect = level.get_rect(self.block_length)
+
+        if clip_rect is None:
+            clip_rect = level_rect
+
+        self._update_objects(level)
+        self._update_layers(level)
+
+        painter.save()
+        painter.setClipRect(clip_rect)
+
+        for layer in self.layers:
+            layer.draw(painter, clip_rect.intersected(level_rect), level)
+
+        painter.restore()
+
+    def lift(self, objects: Sequence[Union[LevelObject, EnemyObject]]):
+        """
+        Takes the objects out of the drawn level and draws them into a pixmap once, so moving them around only means
+        moving the pixmap, instead of drawing the level underneath them again, wherever they go.
+
+        Objects stay lifted, until they are dropped again. Their pixmap doesn't change in the meantime, but can be moved
+        by setting the lifted offset, without moving the objects themselves.
+        """
+        self._objects_changed(self.lifted_objects + list(objects))
+
+        self.lifted_objects = list(objects)
+        self._lifted_ids = {id(obj) for obj in objects}
+
+        if not objects:
+            self.drop()
+            return
+
+        rect = QRect()
+
+        for obj in objects:
+            rect = rect.united(self._with_margin(obj.get_rect(self.block_length)))
+
+        pixmap = QPixmap(rect.size())
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.translate(-rect.topLeft())
+
+        for obj in objects:
+            obj.draw(painter, self.block_length, self.transparency)
+
+            if obj.selected:
+                self._draw_selection_rect(painter, obj)
+
+        painter.end()
+
+        self._lifted_pixmap = pixmap
+        self._lifted_rect = rect
+        self.lifted_offset = QPoint()
+
+    def drop(self):
+        """
+        Puts the lifted objects back into the level, where they are now, to be drawn as part of it again. Since they
+        might have been moved in the meantime, they are brought up to date, when the level is drawn next.
+        """
+        self._mark_changed(self.lifted_objects)
+
+        self.lifted_objects = []
+        self._lifted_ids = set()
+
+        self._lifted_pixmap = QPixmap()
+        self._lifted_rect = QRect()
+        self.lifted_offset = QPoint()
+
+    def lifted_rect(self) -> QRect:
+        """Where the pixmap of the lifted objects is drawn, moved by the lifted offset. Empty if none are lifted."""
+        if not self.lifted_objects:
+            return QRect()
+
+        return self._lifted_rect.translated(self.lifted_offset * self.block_length)
+
+    def draw_lifted(self, painter: QPainter):
+        """Draws the lifted objects, where they were moved to, on top of everything else."""
+        if self.lifted_objects:
+            painter.drawPixmap(self.lifted_rect().topLeft(), self._lifted_pixmap)
+
+    def _lifted_level_objects(self) -> List[LevelObject]:
+        return [obj for obj in self.lifted_objects if isinstance(obj, LevelObject)]
+
+    def _drawn(self, objects: List[_T]) -> List[_T]:
+        """The given objects, without the lifted ones."""
+        if not self._lifted_ids:
+            return objects
+
+        return [obj for obj in objects if id(obj) not in self._lifted_ids]
+
+    def level_changed(self, batch: ChangeBatch):
+        """Notes what changed about the level, so only that is brought up to date, when the level is drawn next."""
+        if batch.affects(HeaderChanged, PaletteChanged):
+            self._changed_objects = None
+            return
+
+        if batch.affects(JumpsChanged):
+            self._jump_generation += 1
+
+        self._mark_changed(batch.objects(*OBJECT_CHANGES))
+
+    def selection_changed(self, objects: Sequence[Union[LevelObject, EnemyObject]]):
+        """Notes the objects, which were (de)selected, since they are drawn with another atlas and a frame now."""
+        self._objects_changed(objects)
+
+    def _mark_changed(self, objects: Sequence[Union[LevelObject, EnemyObject]]):
+        """Notes the objects as changed, so level objects among them are rendered and placed into the grid again."""
+        self._objects_changed(objects)
+
+        if self._changed_objects is not None:
+            self._changed_objects.update((id(obj), obj) for obj in objects if isinstance(obj, LevelObject))
+
+    def _objects_changed(self, objects: Sequence[Union[LevelObject, EnemyObject]]):
+        if not objects:
+            return
+
+        self._object_generation += 1
+
+        if any(isinstance(obj, EnemyObject) for obj in objects):
+            self._enemy_generation += 1
+
+        for obj in objects:
+            self._atlases.pop(id(obj), None)
+
+        if self._objects_to_frame is not None:
+            self._objects_to_frame.update((id(obj), obj) for obj in objects if isinstance(obj, LevelObject))
+
+    def _update_objects(self, level: Level):
+        if level is not self._level:
+            self._level = level
+            self._changed_objects = None
+
+        if self._atlas_settings != (self.block_length, self.transparency):
+            self._atlas_settings = self.block_length, self.transparency
+            self._atlases.clear()
+
+        if self._changed_objects is None:
+            self._atlases.clear()
+            self._objects_to_frame = None
+
+            self._object_generation += 1
+            self._enemy_generation += 1
+            self._jump_generation += 1
+
+            block_grid = level.update_block_grid(self._lifted_level_objects())
+        else:
+            block_grid = level.update_block_grid(self._lifted_level_objects(), list(self._changed_objects.values()))
+
+        self._changed_objects = {}
+
+        # selection frames and overlays of changed objects might reach a block further
+        if block_grid.changed_rect.isEmpty():
+            self.changed_rect = QRect()
+        else:
+            self.changed_rect = self._to_pixels(block_grid.changed_rect.adjusted(-1, -1, 1, 1))
+
+    def _atlas_of(self, level_object: LevelObject) -> BlockAtlas:
+        """The atlas matching the palette of the object and whether it is selected, to draw its blocks with."""
+        try:
+            return self._atlases[id(level_object)]
+        except KeyError:
+            pass
+
+        atlas = self._atlases[id(level_object)] = get_block_atlas(
+            level_object.palette_group,
+            level_object.graphics_set,
+            level_object.tsa_data,
+            self.block_length,
+            level_object.selected,
+            self.transparency and level_object.name.lower() not in SPECIAL_BACKGROUND_OBJECTS,
+        )
+
+        return atlas
+
+    def _update_layers(self, level: Level):
+        """Invalidates the parts of the layers, which look different, since the level was drawn last."""
+        palette_group = load_palette_group(level.object_set_number, level.header.object_palette_index)
+        colors = b"".join(bytes(palette) for palette in palette_group.palettes)
+
+        level_key = (
+            self.block_length,
+            level.size,
+            level.object_set_number,
+            bytes(level.header_bytes),
+            colors,
+            ROM.chr_generation,
+        )
+
+        self.background_layer.update_key(
+            (
+                "level background",
+                self.block_length,
+                level.size,
+                level.object_set_number,
+                level.header.graphic_set_index,
+                level.header.object_palette_index,
+                colors,
+                ROM.chr_generation,
+            )
+        )
+
+        # level objects only change in the cells the block grid filled again, or when they were (de)selected
+        self.object_layer.update_key((level_key, id(level), self.transparency))
+        self.object_layer.invalidate(self.changed_rect)
+
+        self._update_selection_rects(level)
+
+        self.enemy_layer.update_key((self.block_length, self._enemy_generation))
+
+        self.overlay_layer.update_key(
+            (
+                level_key,
+                self._object_generation,
+                self._jump_generation,
+                self.draw_jumps_on_objects,
+                self.draw_items_in_blocks,
+                self.draw_invisible_items,
+            )
+        )
+
+        self.annotation_layer.update_key(
+            (
+                level_key,
+                self.draw_expansions and self._object_generation,
+                self.draw_mario,
+                self.draw_jumps and self._jump_generation,
+                self.draw_grid,
+                self.draw_autoscroll and self._enemy_generation,
+            )
+        )
+
+    def _update_selection_rects(self, level: Level):
+        """Invalidates the object layer, where the selection frames of level objects appeared, moved or went away."""
+        if self._objects_to_frame is None:
+            # the whole layer is drawn anew anyway
+            self._selection_rects = {
+                id(level_object): level_object.get_rect()
+                for level_object in self._drawn(level.objects)
+                if level_object.selected
+            }
+        else:
+            for object_id, level_object in self._objects_to_frame.items():
+                old_rect = self._selection_rects.pop(object_id, QRect())
+
+                if level_object.selected and object_id not in self._lifted_ids:
+                    new_rect = self._selection_rects[object_id] = level_object.get_rect()
+                else:
+                    new_rect = QRect()
+
+                if old_rect != new_rect:
+                    self.object_layer.invalidate(self._with_margin(self._to_pixels(old_rect.united(new_rect))))
+
+        self._objects_to_frame = {}
+
+    def _draw_background_layer(self, painter: QPainter, rect: QRect, level: Level):
+        self._set_visible_rect(rect, level)
+
         self._draw_background(painter, level)
 
         if level.object_set_number == DESERT_OBJECT_SET:
@@ -117,13 +440,35 @@ class LevelDrawer:
         elif level.object_set_number == ICE_OBJECT_SET:
             self._draw_ice_default_graphics(painter, level)
 
-        # painter.setPen(QPen(QColor(0x00, 0x00, 0x00, 0x80), width=1))
-        # painter.setBrush(Qt.NoBrush)
+    def _draw_object_layer(self, painter: QPainter, rect: QRect, level: Level):
+        self._set_visible_rect(rect, level)
+
+        self._draw_block_grid(painter, level)
 
-        self._draw_objects(painter, level)
+        for level_object in self._drawn(level.objects):
+            if level_object.selected and self._is_visible(level_object):
+                self._draw_selection_rect(painter, level_object)
+
+    def _draw_enemy_layer(self, painter: QPainter, rect: QRect, level: Level):
+        self._set_visible_rect(rect, level)
+
+        for enemy in self._drawn(level.enemies):
+            if not self._is_visible(enemy):
+                continue
+
+            enemy.draw(painter, self.block_length, self.transparency)
+
+            if enemy.selected:
+                self._draw_selection_rect(painter, enemy)
+
+    def _draw_overlay_layer(self, painter: QPainter, rect: QRect, level: Level):
+        self._set_visible_rect(rect, level)
 
         self._draw_overlays(painter, level)
 
+    def _draw_annotation_layer(self, painter: QPainter, rect: QRect, level: Level):
+        self._set_visible_rect(rect, level)
+
         if self.draw_expansions:
             self._draw_expansions(painter, level)
 
@@ -139,6 +484,30 @@ class LevelDrawer:
         if self.draw_autoscroll:
             self._draw_auto_scroll(painter, level)
 
+    def _set_visible_rect(self, rect: QRect, level: Level):
+        self.visible_rect = self._to_pixels(self._to_blocks(rect.intersected(level.get_rect(self.block_length))))
+
+    def _with_margin(self, rect: QRect) -> QRect:
+        return rect.adjusted(-self.block_length, -self.block_length, self.block_length, self.block_length)
+
+    def _to_blocks(self, rect: QRect) -> QRect:
+        """Returns the rect of all blocks the given rect in pixels touches."""
+        if rect.isEmpty():
+            return QRect()
+
+        left, top = rect.left() // self.block_length, rect.top() // self.block_length
+        right, bottom = rect.right() // self.block_length, rect.bottom() // self.block_length
+
+        return QRect(left, top, right - left + 1, bottom - top + 1)
+
+    def _to_pixels(self, rect: QRect) -> QRect:
+        """Returns the given rect of blocks in pixels."""
+        return QRect(rect.topLeft() * self.block_length, rect.size() * self.block_length)
+
+    def _is_visible(self, level_object: Union[LevelObject, EnemyObject]) -> bool:
+        # overlays and enemy sprites can reach up to a block out of the object
+        return self._with_margin(level_object.get_rect(self.block_length)).intersects(self.visible_rect)
+
     def _draw_background(self, painter: QPainter, level: Level):
         painter.save()
 
@@ -147,81 +516,101 @@ class LevelDrawer:
         else:
             bg_color = bg_color_for_object_set(level.object_set_number, level.header.object_palette_index)
 
-        painter.fillRect(level.get_rect(self.block_length), bg_color)
+        painter.fillRect(self.visible_rect, bg_color)
 
         painter.restore()
 
     def _draw_dungeon_default_graphics(self, painter: QPainter, level: Level):
-        # draw_background
-        bg_block = _block_from_index(140, level)
+        atlas = _block_atlas(level, self.block_length)
 
-        for x, y in product(range(level.width), range(level.height)):
-            bg_block.draw(painter, x * self.block_length, y * self.block_length, self.block_length)
+        # draw_background
+        atlas.draw_tiled(painter, 140, self.visible_rect)
 
         # draw ceiling
-        ceiling_block = _block_from_index(139, level)
-
-        for x in range(level.width):
-            ceiling_block.draw(painter, x * self.block_length, 0, self.block_length)
+        atlas.draw_tiled(painter, 139, self._visible_row(0))
 
         # draw floor
-        upper_floor_blocks = [_block_from_index(20, level), _block_from_index(21, level)]
-        lower_floor_blocks = [_block_from_index(22, level), _block_from_index(23, level)]
+        upper_floor_blocks = [20, 21]
+        lower_floor_blocks = [22, 23]
 
         upper_y = (GROUND - 2) * self.block_length
         lower_y = (GROUND - 1) * self.block_length
 
-        for block_x in range(level.width):
+        first_x = self.visible_rect.left() // self.block_length
+        last_x = (self.visible_rect.left() + self.visible_rect.width()) // self.block_length
+
+        for block_x in range(first_x, last_x):
             pixel_x = block_x * self.block_length
 
-            upper_floor_blocks[block_x % 2].draw(painter, pixel_x, upper_y, self.block_length)
-            lower_floor_blocks[block_x % 2].draw(painter, pixel_x, lower_y, self.block_length)
+            atlas.draw(painter, upper_floor_blocks[block_x % 2], pixel_x, upper_y)
+            atlas.draw(painter, lower_floor_blocks[block_x % 2], pixel_x, lower_y)
 
     def _draw_desert_default_graphics(self, painter: QPainter, level: Level):
-        floor_level = (GROUND - 1) * self.block_length
         floor_block_index = 86
 
-        floor_block = _block_from_index(floor_block_index, level)
+        atlas = _block_atlas(level, self.block_length)
 
-        for x in range(level.width):
-            floor_block.draw(painter, x * self.block_length, floor_level, self.block_length)
+        atlas.draw_tiled(painter, floor_block_index, self._visible_row(GROUND - 1))
 
     def _draw_ice_default_graphics(self, painter: QPainter, level: Level):
-        bg_block = _block_from_index(0x80, level)
+        atlas = _block_atlas(level, self.block_length)
 
-        for x, y in product(range(level.width), range(level.height)):
-            bg_block.draw(painter, x * self.block_length, y * self.block_length, self.block_length)
+        atlas.draw_tiled(painter, 0x80, self.visible_rect)
 
-    def _draw_objects(self, painter: QPainter, level: Level):
-        for level_object in level.get_all_objects():
-            level_object.render()
+    def _visible_row(self, block_y: int) -> QRect:
+        """The visible part of the given row of blocks, in pixels."""
+        row = QRect(self.visible_rect.left(), block_y * self.block_length, self.visible_rect.width(), self.block_length)
 
-            if level_object.name.lower() in SPECIAL_BACKGROUND_OBJECTS:
-                width = LEVEL_MAX_LENGTH
-                height = GROUND - level_object.y_position
+        return row.intersected(self.visible_rect)
 
-                blocks_to_draw = [level_object.blocks[0]] * width * height
+    def _draw_block_grid(self, painter: QPainter, level: Level):
+        block_grid = level.block_grid
 
-                for index, block_index in enumerate(blocks_to_draw):
-                    x = level_object.x_position + index % width
-                    y = level_object.y_position + index // width
+        visible_blocks = self._to_blocks(self.visible_rect)
 
-                    level_object._draw_block(painter, block_index, x, y, self.block_length, False)
-            else:
-                level_object.draw(painter, self.block_length, self.transparency)
+        if self.transparency:
+            # covered blocks can still show through the transparent parts of the blocks placed over them
+            for cell, covered_blocks in block_grid.covered.items():
+                y, x = divmod(cell, block_grid.width)
 
-            if level_object.selected:
-                painter.save()
+                if not visible_blocks.contains(x, y):
+                    continue
 
-                painter.setPen(QPen(QColor(0x00, 0x00, 0x00, 0x80), width=1))
-                painter.drawRect(level_object.get_rect(self.block_length))
+                for block_index, owner in covered_blocks:
+                    self._atlas_of(owner).draw(painter, block_index, x * self.block_length, y * self.block_length)
 
-                painter.restore()
+        for x, y, length, block_index, owner in block_grid.runs(visible_blocks):
+            atlas = self._atlas_of(owner)
+
+            if length == 1:
+                atlas.draw(painter, block_index, x * self.block_length, y * self.block_length)
+            else:
+                atlas.draw_tiled(
+                    painter,
+                    block_index,
+                    QRect(x * self.block_length, y * self.block_length, length * self.block_length, self.block_length),
+                )
+
+    def _draw_selection_rect(self, painter: QPainter, level_object: Union[LevelObject, EnemyObject]):
+        x, y, width, height = level_object.get_rect(self.block_length).getRect()
+
+        # not using drawRect, since it blends the corners of the half transparent frame twice, when it is cut off at the
+        # edge of a layer tile
+        for line in [
+            QRect(x, y, width + 1, 1),
+            QRect(x, y + height, width + 1, 1),
+            QRect(x, y + 1, 1, height - 1),
+            QRect(x + width, y + 1, 1, height - 1),
+        ]:
+            painter.fillRect(line, SELECTION_FRAME_COLOR)
 
     def _draw_overlays(self, painter: QPainter, level: Level):
         painter.save()
 
-        for level_object in level.get_all_objects():
+        for level_object in self._drawn(level.get_all_objects()):
+            if not self._is_visible(level_object):
+                continue
+
             name = level_object.name.lower()
 
             # only handle this specific enemy item for now
@@ -378,7 +767,10 @@ class LevelDrawer:
             return False
 
     def _draw_expansions(self, painter: QPainter, level: Level):
-        for level_object in level.get_all_objects():
+        for level_object in self._drawn(level.get_all_objects()):
+            if not self._is_visible(level_object):
+                continue
+
             if level_object.selected:
                 painter.drawRect(level_object.get_rect(self.block_length))
 
@@ -399,12 +791,15 @@ class LevelDrawer:
                 painter.restore()
 
     def _draw_mario(self, painter: QPainter, level: Level):
+        mario_position = QPoint(*level.header.mario_position()) * self.block_length
+
+        if not QRect(mario_position, QSize(2, 2) * self.block_length).intersects(self.visible_rect):
+            return
+
         mario_actions = QImage(str(data_dir / "mario.png"))
 
         mario_actions.convertTo(QImage.Format_RGBA8888)
 
-        mario_position = QPoint(*level.header.mario_position()) * self.block_length
-
         x_offset = 32 * level.start_action
 
         mario_cutout = mario_actions.copy(QRect(x_offset, 0, 32, 32)).scaled(
@@ -415,6 +810,9 @@ class LevelDrawer:
 
     def _draw_jumps(self, painter: QPainter, level: Level):
         for jump in level.jumps:
+            if not jump.get_rect(self.block_length, level.is_vertical).intersects(self.visible_rect):
+                continue
+
             painter.setBrush(QBrush(QColor(0xFF, 0x00, 0x00), Qt.FDiagPattern))
 
             painter.drawRect(jump.get_rect(self.block_length, level.is_vertical))
@@ -424,9 +822,11 @@ class LevelDrawer:
 
         painter.setPen(self.grid_pen)
 
-        for x in range(0, panel_width, self.block_length):
+        left, top, width, height = self.visible_rect.getRect()
+
+        for x in range(left, left + width, self.block_length):
             painter.drawLine(x, 0, x, panel_height)
-        for y in range(0, panel_height, self.block_length):
+        for y in range(top, top + height, self.block_length):
             painter.drawLine(0, y, panel_width, y)
 
         painter.setPen(self.screen_pen)
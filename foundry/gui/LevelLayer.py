@@ -0,0 +1,109 @@
+from itertools import count
+from typing import Any, Callable, Hashable, Iterator, Optional, Tuple
+
+from PySide2.QtCore import QRect
+from PySide2.QtGui import QPainter, QPixmap, Qt
+
+from foundry.game.gfx.drawable.DrawableCache import drawable_cache
+
+TILE_SIZE = 256  # px; a multiple of every block length a level can be drawn with
+
+_layer_ids = count()
+
+
+def _tiles_in(rect: QRect) -> Iterator[Tuple[int, int]]:
+    if rect.isEmpty():
+        return
+
+    for tile_x in range(rect.left() // TILE_SIZE, rect.right() // TILE_SIZE + 1):
+        for tile_y in range(rect.top() // TILE_SIZE, rect.bottom() // TILE_SIZE + 1):
+            yield tile_x, tile_y
+
+
+def _pixmap_size(pixmap: QPixmap) -> int:
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+
+class LevelLayer:
+    """
+    One of the layers a level is drawn in, for example the level objects or the grid on top of them.
+
+    A layer is kept as pixmap tiles, which are only drawn again after the layer was invalidated where they are. So
+    painting an unchanged level only means putting the tiles of all layers on top of each other.
+    """
+
+    def __init__(self, draw: Callable[..., None], shared: bool = False):
+        """
+        :param draw: Draws the layer. Gets the painter, the part of the layer to draw, in pixels, and whatever else was
+            given to draw().
+        :param shared: If the layer only depends on its key. Its tiles are then cached by that key, instead of by the
+            layer, and are kept, when the key changes. Going back to a key, or another layer with the same key, doesn't
+            have to draw anything then.
+        """
+        self._draw = draw
+        self._shared = shared
+
+        # keys of the tiles, which can't be mistaken for the ones of another layer, even one that was garbage collected
+        self._id = next(_layer_ids)
+
+        self.key: Hashable = None
+        """Everything the layer depends on, that isn't tracked by invalidating parts of it."""
+
+    @property
+    def _tag(self) -> Hashable:
+        if self._shared:
+            return "level layer", self.key
+
+        return "level layer", self._id
+
+    def update_key(self, key: Hashable):
+        """
+        Invalidates the whole layer, if the given key is different from the one it was drawn with. Shared layers just
+        switch to the tiles of the new key.
+        """
+        if key == self.key:
+            return
+
+        self.key = key
+
+        if not self._shared:
+            self.invalidate()
+
+    def invalidate(self, rect: Optional[QRect] = None):
+        """
+        Marks the given part of the layer as outdated, so it is drawn anew the next time it is needed.
+
+        :param rect: The outdated part of the layer, in pixels. If None, the whole layer is outdated.
+        """
+        if rect is None:
+            drawable_cache.invalidate(self._tag)
+        else:
+            for tile_x, tile_y in _tiles_in(rect):
+                drawable_cache.discard(self._tile_key(tile_x, tile_y))
+
+    def draw(self, painter: QPainter, rect: QRect, *args: Any):
+        """Draws the part of the layer in the given rect, in pixels, drawing the tiles that are outdated first."""
+        for tile_x, tile_y in _tiles_in(rect):
+            tile_rect = QRect(tile_x * TILE_SIZE, tile_y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+
+            tile = drawable_cache.get(
+                self._tile_key(tile_x, tile_y), lambda: self._draw_tile(tile_rect, *args), _pixmap_size, tag=self._tag
+            )
+
+            painter.drawPixmap(tile_rect.topLeft(), tile)
+
+    def _tile_key(self, tile_x: int, tile_y: int) -> Hashable:
+        return self._tag + (tile_x, tile_y)
+
+    def _draw_tile(self, tile_rect: QRect, *args: Any) -> QPixmap:
+        tile = QPixmap(tile_rect.size())
+        tile.fill(Qt.transparent)
+
+        painter = QPainter(tile)
+        painter.translate(-tile_rect.topLeft())
+
+        self._draw(painter, tile_rect, *args)
+
+        painter.end()
+
+        return tile
@@ -2,6 +2,7 @@ from PySide2.QtCore import QRect, QSize, Qt
 from PySide2.QtGui import QColor, QPaintEvent, QPainter
 from PySide2.QtWidgets import QLabel, QSizePolicy, QVBoxLayout, QWidget
 
+from foundry.game.level.ChangeBus import ChangeBatch, JumpsChanged, ObjectsAdded, ObjectsRemoved, ObjectsRetyped
 from foundry.game.level.LevelRef import LevelRef
 
 
@@ -11,7 +12,7 @@ class LevelSizeBar(QWidget):
 
         self.level = level
 
-        self.level.data_changed.connect(self.update)
+        self.level.changes.batch_ready.connect(self._on_level_changes)
 
         self.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Fixed)
 
@@ -38,6 +39,11 @@ class LevelSizeBar(QWidget):
         layout.addWidget(self.size_bar)
         layout.addWidget(self.info_label)
 
+    def _on_level_changes(self, batch: ChangeBatch):
+        # only the number of objects and jumps, and how many bytes objects take up, decide the size
+        if batch.affects(ObjectsAdded, ObjectsRemoved, ObjectsRetyped, JumpsChanged):
+            self.update()
+
     def update(self):
         original_value_string = "∞" if self.original_value == float("INF") else str(self.original_value)
         self.info_label.setText(f"{self.value_description}: {self.current_value}/{original_value_string} Bytes")
@@ -2,7 +2,7 @@ from bisect import bisect_right
 from typing import List, Optional, Tuple, Union
 from warnings import warn
 
-from PySide2.QtCore import QMimeData, QPoint, QSize
+from PySide2.QtCore import QMimeData, QPoint, QRect, QSize, QTimer
 from PySide2.QtGui import QDragEnterEvent, QDragMoveEvent, QMouseEvent, QPaintEvent, QPainter, QWheelEvent, Qt
 from PySide2.QtWidgets import QApplication, QSizePolicy, QToolTip, QWidget
 
@@ -10,6 +10,7 @@ from foundry.game.gfx.drawable.Block import Block
 from foundry.game.gfx.objects.EnemyItem import EnemyObject
 from foundry.game.gfx.objects.LevelObject import LevelObject
 from foundry.game.gfx.objects.ObjectLike import EXPANDS_BOTH, EXPANDS_HORIZ, EXPANDS_VERT
+from foundry.game.level.ChangeBus import ChangeBatch, HistoryChanged, ObjectsMoved, ObjectsRetyped
 from foundry.game.level.Level import Level
 from foundry.game.level.LevelRef import LevelRef
 from foundry.game.level.WorldMap import WorldMap
@@ -17,6 +18,7 @@ from foundry.gui.ContextMenu import ContextMenu
 from foundry.gui.LevelDrawer import LevelDrawer
 from foundry.gui.SelectionSquare import SelectionSquare
 from foundry.gui.settings import RESIZE_LEFT_CLICK, RESIZE_RIGHT_CLICK, SETTINGS
+from smb3parse.constants import OBJ_AUTOSCROLL
 
 HIGHEST_ZOOM_LEVEL = 8  # on linux, at least
 LOWEST_ZOOM_LEVEL = 1 / 16  # on linux, but makes sense with 16x16 blocks
@@ -30,6 +32,8 @@ MODE_RESIZE_VERT = 4
 MODE_RESIZE_DIAG = MODE_RESIZE_HORIZ | MODE_RESIZE_VERT
 RESIZE_MODES = [MODE_RESIZE_HORIZ, MODE_RESIZE_VERT, MODE_RESIZE_DIAG]
 
+FRAME_INTERVAL = 1000 // 60  # ms; selected objects are moved or resized at most once in this time
+
 
 def undoable(func):
     def wrapped(self, *args):
@@ -52,7 +56,8 @@ class LevelView(QWidget):
         self.setAcceptDrops(True)
 
         self.level_ref: LevelRef = level
-        self.level_ref.data_changed.connect(self.update)
+        self.level_ref.changes.batch_ready.connect(self._on_level_changes)
+        self.level_ref.selection_changed.connect(self._on_selection_changed)
 
         self.context_menu = context_menu
 
@@ -88,6 +93,16 @@ class LevelView(QWidget):
 
         self.resizing_happened = False
 
+        # mouse moves only note, how the selected objects are to be moved or resized, which is done once per frame
+        self._pending_move = 0, 0
+        self._pending_resize: Optional[Tuple[int, int]] = None
+        self._applied_resize: Optional[Tuple[int, int]] = None
+
+        self._gesture_timer = QTimer(self)
+        self._gesture_timer.setSingleShot(True)
+        self._gesture_timer.setInterval(FRAME_INTERVAL)
+        self._gesture_timer.timeout.connect(self._apply_pending_gesture)
+
         self.currently_dragged_object: Optional[Union[LevelObject, EnemyObject]] = None
         """dragged in from the object toolbar, if any"""
 
@@ -289,7 +304,7 @@ class LevelView(QWidget):
 
             # scrolling through the level could unintentionally change objects, if the cursor would wander onto them.
             # this is annoying (to me) so only change already selected objects
-            if obj_under_cursor not in self.level_ref.selected_objects:
+            if obj_under_cursor not in self.level_ref.selection:
                 return False
 
             self._change_object_on_mouse_wheel(event.pos(), event.angleDelta().y())
@@ -312,6 +327,8 @@ class LevelView(QWidget):
 
         obj_under_cursor.selected = True
 
+        self.level_ref.changes.post(ObjectsRetyped([obj_under_cursor]))
+
     def sizeHint(self) -> QSize:
         if not self.level_ref:
             return super(LevelView, self).sizeHint()
@@ -320,10 +337,31 @@ class LevelView(QWidget):
 
             return QSize(width * self.block_length, height * self.block_length)
 
-    def update(self):
+    def update(self, rect: Optional[QRect] = None):
+        """
+        Schedules a repaint of the given part of the view, or of all of it, if no rect is given.
+
+        :param rect: The part of the view, that needs to be repainted, in pixels.
+        """
         self.resize(self.sizeHint())
 
-        super(LevelView, self).update()
+        if rect is None:
+            super(LevelView, self).update()
+        else:
+            super(LevelView, self).update(rect)
+
+    def _drawn_rect(self, objects: List[Union[LevelObject, EnemyObject]]) -> QRect:
+        """The part of the view, the given objects are drawn in, including their selection frames and overlays."""
+        if any(isinstance(obj, EnemyObject) and obj.obj_index == OBJ_AUTOSCROLL for obj in objects):
+            # the auto scroll path goes through the whole level
+            return self.rect()
+
+        rect = QRect()
+
+        for obj in objects:
+            rect = rect.united(obj.get_rect(self.block_length))
+
+        return rect.adjusted(-self.block_length, -self.block_length, self.block_length, self.block_length)
 
     def _on_right_mouse_button_down(self, event: QMouseEvent):
         if self.mouse_mode == MODE_DRAG:
@@ -347,6 +385,7 @@ class LevelView(QWidget):
         self.mouse_mode = resize_mode
 
         self.resize_mouse_start_x = level_x
+        self._applied_resize = None
 
         obj = self.object_at(x, y)
 
@@ -373,16 +412,90 @@ class LevelView(QWidget):
 
         self.last_mouse_position = level_x, level_y
 
+        # the size is relative to where the resize started, so only the last one counts
+        self._pending_resize = dx, dy
+
+        self._schedule_gesture()
+
+    def _schedule_gesture(self):
+        if not self._gesture_timer.isActive():
+            self._gesture_timer.start()
+
+    def _apply_pending_gesture(self):
+        """Moves or resizes the selected objects by what the mouse did since the last frame."""
+        self._gesture_timer.stop()
+
         selected_objects = self.get_selected_objects()
 
-        for obj in selected_objects:
-            obj.resize_by(dx, dy)
+        if self._pending_move != (0, 0):
+            dx, dy = self._pending_move
+            self._pending_move = 0, 0
+
+            if self.level_drawer.lifted_objects:
+                old_rect = self.level_drawer.lifted_rect()
+            else:
+                # the level is drawn without them, until they are dropped again
+                old_rect = self._drawn_rect(selected_objects)
+                self._lift_objects(selected_objects)
+
+            # only their picture follows the mouse, the objects themselves are moved, once they are dropped
+            self.level_drawer.lifted_offset += QPoint(dx, dy)
+
+            self.update(old_rect.united(self.level_drawer.lifted_rect()))
+
+        if self._pending_resize is not None:
+            dx, dy = self._pending_resize
+            self._pending_resize = None
+
+            if (dx, dy) == self._applied_resize:
+                # the mouse moved, but not far enough to change the size
+                return
+
+            self._applied_resize = dx, dy
+
+            old_rect = self._drawn_rect(selected_objects)
+
+            for obj in selected_objects:
+                obj.resize_by(dx, dy)
+
+                self.level_ref.level.changed = True
+
+            self.level_ref.changes.post(ObjectsMoved(selected_objects))
+
+            self.update(old_rect.united(self._drawn_rect(selected_objects)))
+
+    def _lift_objects(self, objects: List[Union[LevelObject, EnemyObject]]):
+        """Draws the objects once, so they can be moved around as a picture, without drawing the level again."""
+        object_ids = {id(obj) for obj in objects}
+
+        self.level_drawer.block_length = self.block_length
+        self.level_drawer.lift([obj for obj in self.level_ref.level.get_all_objects() if id(obj) in object_ids])
+
+    def _drop_objects(self):
+        """Moves lifted objects to where their picture was moved to and puts them back into the level there."""
+        if not self.level_drawer.lifted_objects:
+            return
+
+        lifted_objects = self.level_drawer.lifted_objects
+        dx, dy = self.level_drawer.lifted_offset.toTuple()
+
+        update_rect = self.level_drawer.lifted_rect().united(self._drawn_rect(lifted_objects))
+
+        if (dx, dy) != (0, 0):
+            for obj in lifted_objects:
+                obj.move_by(dx, dy)
 
             self.level_ref.level.changed = True
 
-        self.update()
+            self.level_ref.changes.post(ObjectsMoved(lifted_objects))
+
+        self.level_drawer.drop()
+
+        self.update(update_rect.united(self._drawn_rect(lifted_objects)))
 
     def _on_right_mouse_button_up(self, event):
+        self._apply_pending_gesture()
+
         if self.resizing_happened:
             x, y = event.pos().toTuple()
 
@@ -463,16 +576,15 @@ class LevelView(QWidget):
 
         self.last_mouse_position = level_x, level_y
 
-        selected_objects = self.get_selected_objects()
+        pending_dx, pending_dy = self._pending_move
+        self._pending_move = pending_dx + dx, pending_dy + dy
 
-        for obj in selected_objects:
-            obj.move_by(dx, dy)
-
-            self.level_ref.level.changed = True
-
-        self.update()
+        self._schedule_gesture()
 
     def _on_left_mouse_button_up(self, event: QMouseEvent):
+        self._apply_pending_gesture()
+        self._drop_objects()
+
         x, y = event.pos().toTuple()
 
         obj = self.object_at(x, y)
@@ -525,12 +637,8 @@ class LevelView(QWidget):
         else:
             self.mouse_mode = MODE_DRAG
 
-            selected_objects = self.get_selected_objects()
-
-            nothing_selected = not selected_objects
-
             # selected objects are handled on click release
-            if nothing_selected or clicked_object not in selected_objects:
+            if clicked_object not in self.level_ref.selection:
                 self._select_object(clicked_object)
                 self._object_was_selected_on_last_click = True
 
@@ -543,6 +651,10 @@ class LevelView(QWidget):
         self.zoom = zoom
         self.block_length = int(Block.SIDE_LENGTH * self.zoom)
 
+        if self.level_drawer.lifted_objects:
+            # they are lifted again, drawn with the new block length, when they are moved next
+            self._drop_objects()
+
         self.update()
 
     def zoom_out(self):
@@ -562,10 +674,9 @@ class LevelView(QWidget):
 
         sel_rect = self.selection_square.get_adjusted_rect(self.block_length, self.block_length)
 
-        touched_objects = [obj for obj in self.level_ref.get_all_objects() if sel_rect.intersects(obj.get_rect())]
+        touched_objects = self.level_ref.level.objects_in(sel_rect)
 
-        if touched_objects != self.level_ref.selected_objects:
-            self._set_selected_objects(touched_objects)
+        self._set_selected_objects(touched_objects)
 
         self.update()
 
@@ -595,19 +706,28 @@ class LevelView(QWidget):
         self.update()
 
     def _set_selected_objects(self, objects, replace_selection=False):
-        if self.level_ref.selected_objects == objects:
+        if ctrl_is_pressed() and not replace_selection:
+            self.level_ref.selection.add(objects)
+        else:
+            self.level_ref.selection.replace(objects)
+
+    def _on_level_changes(self, batch: ChangeBatch):
+        self.level_drawer.level_changed(batch)
+
+        if any(not isinstance(change, (ObjectsMoved, HistoryChanged)) for change in batch):
+            self.update()
             return
 
-        if ctrl_is_pressed() and not replace_selection:
-            selected_items = self.level_ref.selected_objects.copy()
+        # objects, that are moved or resized with the mouse, repaint where they were already, while it happens
+        moved_objects = batch.objects(ObjectsMoved)
 
-            for level_object in objects:
-                if level_object not in selected_items:
-                    selected_items.append(level_object)
-        else:
-            selected_items = objects
+        if moved_objects:
+            self.update(self._drawn_rect(moved_objects))
 
-        self.level_ref.selected_objects = selected_items
+    def _on_selection_changed(self, added_objects, removed_objects):
+        self.level_drawer.selection_changed(added_objects + removed_objects)
+
+        self.update(self._drawn_rect(added_objects + removed_objects))
 
     def get_selected_objects(self) -> List[Union[LevelObject, EnemyObject]]:
         return self.level_ref.selected_objects
@@ -742,23 +862,29 @@ class LevelView(QWidget):
         self.level_ref.add_enemy(enemy_index, level_x, level_y, index)
 
     def replace_object(self, obj: LevelObject, domain: int, obj_index: int, length: int):
+        was_selected = obj in self.level_ref.selection
+
         self.remove_object(obj)
 
         x, y = obj.get_position()
 
         new_obj = self.level_ref.add_object(domain, obj_index, x, y, length, obj.index_in_level)
-        new_obj.selected = obj.selected
+
+        if was_selected:
+            self.level_ref.selection.add([new_obj])
 
     def replace_enemy(self, old_enemy: EnemyObject, enemy_index: int):
-        index_in_level = self.level_ref.index_of(old_enemy)
+        index_in_enemies = self.level_ref.index_of(old_enemy) - len(self.level_ref.objects)
+        was_selected = old_enemy in self.level_ref.selection
 
         self.remove_object(old_enemy)
 
         x, y = old_enemy.get_position()
 
-        new_enemy = self.level_ref.add_enemy(enemy_index, x, y, index_in_level)
+        new_enemy = self.level_ref.add_enemy(enemy_index, x, y, index_in_enemies)
 
-        new_enemy.selected = old_enemy.selected
+        if was_selected:
+            self.level_ref.selection.add([new_enemy])
 
     def remove_object(self, obj):
         self.level_ref.remove_object(obj)
@@ -779,6 +905,7 @@ class LevelView(QWidget):
         else:
             level_x, level_y = self._to_level_point(x, y)
 
+        # the objects were copied in the order they were in the level, so they are drawn the same way after pasting
         objects, origin = paste_data
 
         ori_x, ori_y = origin
@@ -817,14 +944,24 @@ class LevelView(QWidget):
 
         level_object.set_position(x, y)
 
+        if self.currently_dragged_object is None:
+            old_rect = QRect()
+        else:
+            old_rect = self._drawn_rect([self.currently_dragged_object])
+
         self.currently_dragged_object = level_object
 
-        self.repaint()
+        self.repaint(old_rect.united(self._drawn_rect([level_object])))
 
     def dragLeaveEvent(self, event):
+        if self.currently_dragged_object is None:
+            return
+
+        old_rect = self._drawn_rect([self.currently_dragged_object])
+
         self.currently_dragged_object = None
 
-        self.repaint()
+        self.repaint(old_rect)
 
     @undoable
     def dropEvent(self, event):
@@ -841,8 +978,6 @@ class LevelView(QWidget):
 
         self.currently_dragged_object = None
 
-        self.level_ref.data_changed.emit()
-
     def _object_from_mime_data(self, mime_data: QMimeData) -> Union[LevelObject, EnemyObject]:
         object_type, *object_bytes = mime_data.data("application/level-object")
 
@@ -864,9 +999,17 @@ class LevelView(QWidget):
 
         self.level_drawer.block_length = self.block_length
 
-        self.level_drawer.draw(painter, self.level_ref.level)
+        self.level_drawer.draw(painter, self.level_ref.level, event.rect())
+
+        self.level_drawer.draw_lifted(painter)
 
         self.selection_square.draw(painter)
 
         if self.currently_dragged_object is not None:
             self.currently_dragged_object.draw(painter, self.block_length, self.transparency)
+
+        # objects can change, because another one changed, for example when they extend down to the ground
+        changed_rect = self.level_drawer.changed_rect.intersected(self.visibleRegion().boundingRect())
+
+        if not changed_rect.isEmpty() and not event.rect().contains(changed_rect):
+            self.update(changed_rect)
@@ -1,11 +1,10 @@
-import base64
-import json
 import logging
 import os
 import pathlib
 import shlex
 import subprocess
 import tempfile
+import time
 from typing import Tuple, Union
 
 from PySide2.QtCore import QSize
@@ -15,6 +14,7 @@ from PySide2.QtWidgets import (
     QDialog,
     QFileDialog,
     QHBoxLayout,
+    QLabel,
     QMainWindow,
     QMenu,
     QMessageBox,
@@ -30,7 +30,7 @@ from PySide2.QtWidgets import (
 )
 
 from foundry import (
-    auto_save_level_data_path,
+    auto_save_level_journal_path,
     auto_save_m3l_path,
     auto_save_rom_path,
     discord_link,
@@ -48,10 +48,13 @@ from foundry.game.ObjectSet import OBJECT_SET_NAMES
 from foundry.game.gfx.Palette import PaletteGroup, restore_all_palettes, save_all_palette_groups
 from foundry.game.gfx.objects.EnemyItem import EnemyObject
 from foundry.game.gfx.objects.LevelObject import LevelObject
+from foundry.game.level.ChangeBus import ChangeBatch, HistoryChanged
 from foundry.game.level.Level import Level, world_and_level_for_level_address
 from foundry.game.level.LevelRef import LevelRef
 from foundry.game.level.WorldMap import WorldMap
 from foundry.gui.AboutWindow import AboutDialog
+from foundry.gui.AutoSaveJournal import AutoSaveJournal
+from foundry.gui.AutoSaver import AutoSaver
 from foundry.gui.AutoScrollEditor import AutoScrollEditor
 from foundry.gui.BlockViewer import BlockViewer
 from foundry.gui.ContextMenu import CMAction, ContextMenu
@@ -302,8 +305,10 @@ class MainWindow(QMainWindow):
         self.block_viewer = None
         self.object_viewer = None
 
+        self._auto_saver = AutoSaver(AutoSaveJournal(auto_save_level_journal_path), auto_save_rom_path)
+
         self.level_ref = LevelRef()
-        self.level_ref.data_changed.connect(self._on_level_data_changed)
+        self.level_ref.changes.batch_ready.connect(self._on_level_changes)
 
         self.context_menu = ContextMenu(self.level_ref)
         self.context_menu.triggered.connect(self.on_menu)
@@ -461,6 +466,11 @@ class MainWindow(QMainWindow):
         self.status_bar = ObjectStatusBar(self, self.level_ref)
         self.setStatusBar(self.status_bar)
 
+        self.auto_save_label = QLabel()
+        self.status_bar.addPermanentWidget(self.auto_save_label)
+
+        self._auto_saver.persisted.connect(self._on_auto_saved)
+
         self.delete_shortcut = QShortcut(QKeySequence(Qt.Key_Delete), self, self.remove_selected_objects)
 
         QShortcut(QKeySequence(Qt.CTRL + Qt.Key_X), self, self._cut_objects)
@@ -498,7 +508,7 @@ class MainWindow(QMainWindow):
 
         self.update_gui_for_level()
 
-    def _on_level_data_changed(self):
+    def _on_level_changes(self, batch: ChangeBatch):
         self.undo_action.setEnabled(self.level_ref.undo_stack.undo_available)
         self.redo_action.setEnabled(self.level_ref.undo_stack.redo_available)
 
@@ -509,45 +519,40 @@ class MainWindow(QMainWindow):
 
         self.menu_toolbar_save_action.setEnabled(level_has_changed or level_is_m3l or PaletteGroup.changed)
 
-        self._save_auto_data()
+        # the auto save holds the undo history, which doesn't change, while objects are still being moved around
+        if batch.affects(HistoryChanged):
+            self._save_auto_data()
 
     def _on_show_settings(self):
         SettingsDialog(self).exec_()
 
-    @staticmethod
-    def _save_auto_rom():
-        ROM().save_to_file(auto_save_rom_path, set_new_path=False)
+    def _save_auto_rom(self):
+        self._auto_saver.rom_changed(ROM.to_bytes())
 
     def _save_auto_data(self):
-        undo_index, data = self.level_ref.level.undo_stack.export_data()
+        level = self.level_ref.level
 
-        (level_offset, _), (enemy_offset, _) = self.level_ref.level.to_bytes()
+        self._auto_saver.level_changed(level.object_set_number, level.undo_stack.history())
 
-        object_set_number = self.level_ref.level.object_set_number
+    def _on_auto_saved(self, persisted_at: float):
+        self.auto_save_label.setText(f"Auto saved at {time.strftime('%H:%M:%S', time.localtime(persisted_at))}")
 
-        base64_data = []
+    def _load_auto_save(self):
+        # rom already loaded
+        journal_contents = AutoSaveJournal.replay(auto_save_level_journal_path)
 
-        for (object_offset, object_data), (enemy_offset_, enemy_data) in data:
-            base64_data.append(
-                (
-                    object_offset,
-                    base64.b64encode(object_data).decode("ascii"),
-                    enemy_offset_,
-                    base64.b64encode(enemy_data).decode("ascii"),
-                )
+        if journal_contents is None:
+            QMessageBox.critical(
+                self,
+                "Failed loading auto save",
+                "Could not recover the changes to the level, that was edited, when the editor crashed.",
             )
 
-        with open(auto_save_level_data_path, "w") as level_data_file:
-            level_data_file.write(
-                json.dumps([object_set_number, level_offset, enemy_offset, (undo_index, base64_data)])
-            )
+            return
 
-    def _load_auto_save(self):
-        # rom already loaded
-        with open(auto_save_level_data_path, "r") as level_data_file:
-            json_data = level_data_file.read()
+        object_set_number, undo_index, byte_data = journal_contents
 
-            object_set_number, level_offset, enemy_offset, (undo_index, base64_data) = json.loads(json_data)
+        (level_offset, _), (enemy_offset, _) = byte_data[undo_index]
 
         # load level from ROM, or from m3l file
         if level_offset == enemy_offset == 0:
@@ -564,16 +569,7 @@ class MainWindow(QMainWindow):
             self.update_level("recovered level", level_offset, enemy_offset, object_set_number)
 
         # restore undo/redo stack
-        byte_data = []
-        for undo_data in base64_data:
-            level_offset, object_data, enemy_offset, enemy_data = undo_data
-
-            object_data = bytearray(base64.b64decode(object_data))
-            enemy_data = bytearray(base64.b64decode(enemy_data))
-
-            byte_data.append(((level_offset, object_data), (enemy_offset, enemy_data)))
-
-        self.level_ref.level.changed = bool(base64_data)
+        self.level_ref.level.changed = bool(byte_data)
         self.level_ref.import_undo_stack_data(undo_index, byte_data)
 
     def _go_to_jump_destination(self):
@@ -1096,11 +1092,11 @@ class MainWindow(QMainWindow):
 
     @undoable
     def bring_objects_to_foreground(self):
-        self.level_ref.level.bring_to_foreground(self.level_ref.selected_objects)
+        self.level_ref.level.bring_to_foreground(self.level_ref.selection.in_level_order())
 
     @undoable
     def bring_objects_to_background(self):
-        self.level_ref.level.bring_to_background(self.level_ref.selected_objects)
+        self.level_ref.level.bring_to_background(self.level_ref.selection.in_level_order())
 
     @undoable
     def create_object_at(self, x, y):
@@ -1115,7 +1111,7 @@ class MainWindow(QMainWindow):
         self.remove_selected_objects()
 
     def _copy_objects(self):
-        selected_objects = self.level_view.get_selected_objects().copy()
+        selected_objects = self.level_ref.selection.in_level_order()
 
         if selected_objects:
             self.context_menu.set_copied_objects(selected_objects)
@@ -1190,8 +1186,6 @@ class MainWindow(QMainWindow):
         else:
             self.level_view.replace_enemy(selected_object, obj_type)
 
-        self.level_ref.data_changed.emit()
-
     def fill_object_list(self):
         self.object_list.Clear()
 
@@ -1391,8 +1385,10 @@ class MainWindow(QMainWindow):
 
             return
 
+        self._auto_saver.stop()
+
         auto_save_rom_path.unlink(missing_ok=True)
         auto_save_m3l_path.unlink(missing_ok=True)
-        auto_save_level_data_path.unlink(missing_ok=True)
+        auto_save_level_journal_path.unlink(missing_ok=True)
 
         super(MainWindow, self).closeEvent(event)
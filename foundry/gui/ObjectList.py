@@ -1,6 +1,9 @@
+from typing import Dict
+
 from PySide2.QtGui import QMouseEvent, QWindow, Qt
 from PySide2.QtWidgets import QListWidget, QSizePolicy
 
+from foundry.game.level.ChangeBus import ChangeBatch, ObjectsAdded, ObjectsRemoved, ObjectsReordered, ObjectsRetyped
 from foundry.game.level.LevelRef import LevelRef
 from foundry.gui.ContextMenu import ContextMenu
 
@@ -14,10 +17,14 @@ class ObjectList(QListWidget):
         self.setSelectionMode(self.ExtendedSelection)
 
         self.level_ref: LevelRef = level_ref
-        self.level_ref.data_changed.connect(self.update_content)
+        self.level_ref.changes.batch_ready.connect(self._on_level_changes)
+        self.level_ref.selection_changed.connect(self._on_level_selection_changed)
 
         self.context_menu = context_menu
 
+        # the row of every listed object, by its id, so (de)selected objects are found without going through the list
+        self._rows: Dict[int, int] = {}
+
         self.itemSelectionChanged.connect(self.on_selection_changed)
 
         self.setWhatsThis(
@@ -68,6 +75,20 @@ class ObjectList(QListWidget):
 
         self.context_menu.as_list_menu().popup(event.globalPos())
 
+    def _on_level_changes(self, batch: ChangeBatch):
+        if batch.affects(ObjectsAdded, ObjectsRemoved, ObjectsReordered):
+            self.update_content()
+        else:
+            # the objects are still listed in the same rows, only their names might have changed
+            self._update_names(batch.objects(ObjectsRetyped))
+
+    def _update_names(self, level_objects):
+        for level_object in level_objects:
+            item = self.item(self._rows.get(id(level_object), -1))
+
+            if item is not None and item.data(Qt.UserRole) is level_object:
+                item.setText(level_object.name)
+
     def update_content(self):
         level_objects = self.level_ref.get_all_objects()
 
@@ -79,12 +100,16 @@ class ObjectList(QListWidget):
 
         self.addItems(labels)
 
+        self._rows = {}
+
         for index, level_object in enumerate(level_objects):
             item = self.item(index)
 
             item.setData(Qt.UserRole, level_object)
             item.setSelected(level_object.selected)
 
+            self._rows[id(level_object)] = index
+
         self.blockSignals(False)
 
         if self.selectedIndexes():
@@ -94,11 +119,17 @@ class ObjectList(QListWidget):
         return [self.item(index.row()).data(Qt.UserRole) for index in self.selectedIndexes()]
 
     def on_selection_changed(self):
-        selected_objects = self.selected_objects()
+        self.level_ref.selected_objects = self.selected_objects()
 
-        selection_not_changed = selected_objects == self.level_ref.selected_objects
+    def _on_level_selection_changed(self, added_objects, removed_objects):
+        self.blockSignals(True)
 
-        if selection_not_changed:
-            return
-        else:
-            self.level_ref.selected_objects = selected_objects
+        for objects, selected in [(removed_objects, False), (added_objects, True)]:
+            for level_object in objects:
+                item = self.item(self._rows.get(id(level_object), -1))
+
+                # objects added since the list was filled last are selected, when it is filled again
+                if item is not None and item.data(Qt.UserRole) is level_object:
+                    item.setSelected(selected)
+
+        self.blockSignals(False)
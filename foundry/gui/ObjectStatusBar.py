@@ -4,6 +4,7 @@ from PySide2.QtWidgets import QStatusBar, QMainWindow
 
 from foundry.game.gfx.objects.EnemyItem import EnemyObject
 from foundry.game.gfx.objects.LevelObject import LevelObject
+from foundry.game.level.ChangeBus import ChangeBatch, OBJECT_CHANGES
 from foundry.game.level.LevelRef import LevelRef
 
 
@@ -12,11 +13,16 @@ class ObjectStatusBar(QStatusBar):
         super(ObjectStatusBar, self).__init__(parent=parent)
 
         self.level_ref = level_ref
-        self.level_ref.data_changed.connect(self.update)
+        self.level_ref.changes.batch_ready.connect(self._on_level_changes)
+        self.level_ref.selection_changed.connect(self.update)
 
     def clear(self):
         self.clearMessage()
 
+    def _on_level_changes(self, batch: ChangeBatch):
+        if batch.affects(*OBJECT_CHANGES):
+            self.update()
+
     def update(self):
         selected_objects = self.level_ref.selected_objects
 
@@ -24,6 +24,7 @@ from foundry.game.gfx.Palette import (
     PaletteGroup,
     load_palette_group,
 )
+from foundry.game.level.ChangeBus import ChangeBatch, HeaderChanged, PaletteChanged
 from foundry.game.level.LevelRef import LevelRef
 from foundry.gui.CustomDialog import CustomDialog
 from foundry.gui.util import clear_layout
@@ -215,7 +216,7 @@ class SidePalette(QWidget):
 
         self.level_ref = level_ref
 
-        self.level_ref.data_changed.connect(self.update)
+        self.level_ref.changes.batch_ready.connect(self._on_level_changes)
 
         self.setLayout(QVBoxLayout(self))
         self.layout().setSpacing(0)
@@ -229,6 +230,10 @@ class SidePalette(QWidget):
             "Note: The first color (the left most one) is always the same among all 4 palettes."
         )
 
+    def _on_level_changes(self, batch: ChangeBatch):
+        if batch.affects(HeaderChanged, PaletteChanged):
+            self.update()
+
     def update(self):
         clear_layout(self.layout())
 
@@ -256,6 +261,7 @@ class SidePalette(QWidget):
 
             PaletteGroup.changed = True
 
-            self.level_ref.reload()
+            # blocks apply their palette when drawn, so the level only needs to be redrawn
+            self.level_ref.changes.post(PaletteChanged())
 
         return actual_changer
@@ -5,6 +5,7 @@ from PySide2.QtWidgets import QFormLayout, QSizePolicy, QWidget
 
 from foundry.game.gfx.objects.LevelObject import LevelObject
 from foundry.game.gfx.objects.ObjectLike import ObjectLike
+from foundry.game.level.ChangeBus import ChangeBatch, OBJECT_CHANGES
 from foundry.game.level.LevelRef import LevelRef
 from foundry.gui.Spinner import Spinner
 
@@ -25,7 +26,8 @@ class SpinnerPanel(QWidget):
         self.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Minimum)
 
         self.level_ref = level_ref
-        self.level_ref.data_changed.connect(self.update)
+        self.level_ref.changes.batch_ready.connect(self._on_level_changes)
+        self.level_ref.selection_changed.connect(self.update)
 
         self.spin_domain = Spinner(self, maximum=MAX_DOMAIN)
         self.spin_domain.setEnabled(False)
@@ -63,6 +65,10 @@ class SpinnerPanel(QWidget):
             "index and horizontally using the 4th byte."
         )
 
+    def _on_level_changes(self, batch: ChangeBatch):
+        if batch.affects(*OBJECT_CHANGES):
+            self.update()
+
     def update(self):
         if len(self.level_ref.selected_objects) == 1:
             selected_object = self.level_ref.selected_objects[0]
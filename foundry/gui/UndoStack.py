@@ -1,47 +1,196 @@
-from typing import List, Optional, Tuple
+from itertools import count
+from typing import List, NamedTuple, Optional, Tuple, Union
 
 from PySide2.QtWidgets import QWidget
 
 from foundry.game.level import LevelByteData
+from foundry.gui.settings import SETTINGS
+
+KEYFRAME_INTERVAL = 16
+"""A full copy of the level is kept at least every this many states, so no state is more deltas away from one."""
+
+_generations = count()
+
+
+class BytePatch(NamedTuple):
+    """Turns one version of some bytes into another, by replacing everything between their common start and end."""
+
+    start: int
+    end: int
+    data: bytes
+
+    @staticmethod
+    def between(old: bytes, new: bytes) -> "BytePatch":
+        shorter = min(len(old), len(new))
+
+        start = 0
+        while start < shorter and old[start] == new[start]:
+            start += 1
+
+        common_end = 0
+        while common_end < shorter - start and old[-common_end - 1] == new[-common_end - 1]:
+            common_end += 1
+
+        return BytePatch(start, len(old) - common_end, new[start : len(new) - common_end])
+
+    def apply(self, old: bytes) -> bytes:
+        return old[: self.start] + self.data + old[self.end :]
+
+
+_State = Tuple[Tuple[int, bytes], Tuple[int, bytes]]
+"""The same as LevelByteData, but with bytes, that can be shared between entries, without being changed."""
+
+
+class _Delta(NamedTuple):
+    object_offset: int
+    object_patch: BytePatch
+    enemy_offset: int
+    enemy_patch: BytePatch
+
+
+_Entry = Union[_State, _Delta]
+
+
+def _size_of(entry: _Entry) -> int:
+    if isinstance(entry, _Delta):
+        return len(entry.object_patch.data) + len(entry.enemy_patch.data)
+    else:
+        (_, object_bytes), (_, enemy_bytes) = entry
+
+        return len(object_bytes) + len(enemy_bytes)
+
+
+def _frozen(data: LevelByteData) -> _State:
+    (object_offset, object_bytes), (enemy_offset, enemy_bytes) = data
+
+    return (object_offset, bytes(object_bytes)), (enemy_offset, bytes(enemy_bytes))
+
+
+def _thawed(state: _State) -> LevelByteData:
+    (object_offset, object_bytes), (enemy_offset, enemy_bytes) = state
+
+    return (object_offset, bytearray(object_bytes)), (enemy_offset, bytearray(enemy_bytes))
+
+
+def _resolve(previous: Optional[_State], entry: _Entry) -> _State:
+    if not isinstance(entry, _Delta):
+        return entry
+
+    assert previous is not None
+
+    (_, object_bytes), (_, enemy_bytes) = previous
+
+    return (
+        (entry.object_offset, entry.object_patch.apply(object_bytes)),
+        (entry.enemy_offset, entry.enemy_patch.apply(enemy_bytes)),
+    )
+
+
+class UndoHistory:
+    """
+    What an undo stack held at one point. It doesn't change along with the stack, so it can be read outside of the GUI
+    thread, while the level is edited further.
+    """
+
+    def __init__(
+        self, entries: Tuple[_Entry, ...], undo_index: int, generation: int, dropped: int, saved: int, current: _State
+    ):
+        self._entries = entries
+        self._current = current
+
+        self.undo_index = undo_index
+        self.generation = generation
+        self.dropped = dropped
+        self.saved = saved
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def current_state(self) -> LevelByteData:
+        return _thawed(self._current)
+
+    def export_data(self) -> Tuple[int, List[LevelByteData]]:
+        """Returns the current index and every state in full, with the oldest first."""
+        states = []
+        state: Optional[_State] = None
+
+        for entry in self._entries:
+            state = _resolve(state, entry)
+            states.append(_thawed(state))
+
+        return self.undo_index, states
 
 
 class UndoStack(QWidget):
-    def __init__(self):
+    """
+    The states a level was in, after every change made to it.
+
+    Only every KEYFRAME_INTERVAL-th state is kept in full. The ones in between are kept as the bytes, that changed
+    compared to the state before them, so restoring a state means applying a bounded number of those to the closest full
+    state in front of it. When the history takes up more than the configured amount of memory, the oldest states are
+    dropped.
+    """
+
+    def __init__(self, memory_limit: Optional[int] = None):
+        """
+        :param memory_limit: The number of bytes the history may take up, before the oldest states are dropped. The
+            current state is always kept. Defaults to the "undo_memory_limit" setting.
+        """
         super(UndoStack, self).__init__()
 
-        self.undo_stack: List[LevelByteData] = []
+        self.memory_limit = SETTINGS["undo_memory_limit"] if memory_limit is None else memory_limit
+
+        self._entries: List[_Entry] = []
+        self._memory_used = 0
+
         self.undo_index = -1
 
+        self.generation = next(_generations)
+        """Changes, whenever the history is replaced as a whole, so others know, that what they knew of it is gone."""
+
+        self.dropped = 0
+        """The number of states dropped from the front of the history, since it was last replaced."""
+
+        self.saved = 0
+        """The number of states saved, since the history was last replaced."""
+
+        # the state at undo_index, so saving a new state only needs to compare against it
+        self._current: Optional[_State] = None
+
     def clear(self, new_initial_state: LevelByteData):
-        self.undo_stack = [new_initial_state]
+        self._replace()
+
+        self._current = _frozen(new_initial_state)
+        self._append(self._current)
+
         self.undo_index = 0
 
     def save_level_state(self, data: LevelByteData):
         self.undo_index += 1
 
-        self.undo_stack = self.undo_stack[: self.undo_index]
+        self._drop_from(self.undo_index)
+        self._push(_frozen(data))
+
+        self.saved += 1
 
-        self.undo_stack.append(data)
+        self._enforce_memory_limit()
 
     def undo(self) -> Optional[LevelByteData]:
-        if not self.undo_stack:
+        if not self._entries:
             return None
 
         self.undo_index -= 1
 
-        data = self.undo_stack[self.undo_index]
-
-        return data
+        return self._go_to(self.undo_index)
 
     def redo(self) -> Optional[LevelByteData]:
-        if self.undo_index + 1 == len(self.undo_stack):
+        if self.undo_index + 1 == len(self._entries):
             return None
 
         self.undo_index += 1
 
-        data = self.undo_stack[self.undo_index]
-
-        return data
+        return self._go_to(self.undo_index)
 
     @property
     def is_empty(self):
@@ -53,14 +202,134 @@ class UndoStack(QWidget):
 
     @property
     def redo_available(self):
-        return self.undo_index < len(self.undo_stack) - 1
+        return self.undo_index < len(self._entries) - 1
+
+    @property
+    def memory_used(self) -> int:
+        """The number of level bytes kept for the history, full states and changed bytes alike."""
+        return self._memory_used
 
     def import_data(self, stack_index: int, stack_bytes: List[LevelByteData]) -> None:
+        self._replace()
+
+        for data in stack_bytes:
+            self._push(_frozen(data))
+
         self.undo_index = stack_index
-        self.undo_stack = stack_bytes
+
+        if self._entries:
+            self._current = self._state_at(stack_index)
+
+        self._enforce_memory_limit()
+
+    @property
+    def current_state(self) -> Optional[LevelByteData]:
+        """The state at the current index, if there is one."""
+        if self._current is None:
+            return None
+
+        return _thawed(self._current)
 
     def export_data(self) -> Tuple[int, List[LevelByteData]]:
-        return self.undo_index, self.undo_stack
+        """Returns the current index and every state in full, with the oldest first."""
+        history = self.history()
+
+        if history is None:
+            return self.undo_index, []
+
+        return history.export_data()
+
+    def history(self) -> Optional[UndoHistory]:
+        """Returns what the stack holds right now, if it holds anything."""
+        if self._current is None:
+            return None
+
+        return UndoHistory(
+            tuple(self._entries), self.undo_index, self.generation, self.dropped, self.saved, self._current
+        )
+
+    def _replace(self):
+        self._entries.clear()
+        self._memory_used = 0
+        self._current = None
+
+        self.generation = next(_generations)
+        self.dropped = 0
+        self.saved = 0
+
+    def _push(self, state: _State):
+        if self._current is None or len(self._entries) - self._last_keyframe_index() >= KEYFRAME_INTERVAL:
+            self._append(state)
+        else:
+            self._append(self._delta_between(self._current, state))
+
+        self._current = state
+
+    def _go_to(self, index: int) -> LevelByteData:
+        self._current = self._state_at(index)
+
+        return _thawed(self._current)
+
+    def _state_at(self, index: int) -> _State:
+        state: Optional[_State] = None
+
+        for entry in self._entries[self._keyframe_index_before(index) : index + 1]:
+            state = _resolve(state, entry)
+
+        assert state is not None
+
+        return state
+
+    @staticmethod
+    def _delta_between(old: _State, new: _State) -> _Delta:
+        (_, old_objects), (_, old_enemies) = old
+        (object_offset, new_objects), (enemy_offset, new_enemies) = new
+
+        return _Delta(
+            object_offset,
+            BytePatch.between(old_objects, new_objects),
+            enemy_offset,
+            BytePatch.between(old_enemies, new_enemies),
+        )
+
+    def _keyframe_index_before(self, index: int) -> int:
+        while isinstance(self._entries[index], _Delta):
+            index -= 1
+
+        return index
+
+    def _last_keyframe_index(self) -> int:
+        if not self._entries:
+            return -KEYFRAME_INTERVAL
+
+        return self._keyframe_index_before(len(self._entries) - 1)
+
+    def _append(self, entry: _Entry):
+        self._entries.append(entry)
+        self._memory_used += _size_of(entry)
+
+    def _drop_from(self, index: int):
+        for entry in self._entries[index:]:
+            self._memory_used -= _size_of(entry)
+
+        del self._entries[index:]
+
+    def _enforce_memory_limit(self):
+        while self._memory_used > self.memory_limit and self.undo_index > 0:
+            first, second = self._entries[:2]
+
+            if isinstance(second, _Delta):
+                # the new oldest state has nothing to be applied to anymore, so it has to be kept in full
+                second_state = _resolve(first, second)
+
+                self._memory_used += _size_of(second_state) - _size_of(second)
+                self._entries[1] = second_state
+
+            self._memory_used -= _size_of(first)
+            del self._entries[0]
+
+            self.undo_index -= 1
+            self.dropped += 1
 
     def __len__(self):
-        return len(self.undo_stack)
+        return len(self._entries)
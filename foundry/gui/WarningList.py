@@ -8,6 +8,7 @@ from PySide2.QtWidgets import QLabel, QVBoxLayout, QWidget
 from foundry.game.ObjectDefinitions import GeneratorType
 from foundry.game.gfx.objects.EnemyItem import EnemyObject
 from foundry.game.gfx.objects.LevelObject import GROUND, LevelObject
+from foundry.game.level.ChangeBus import ChangeBatch, HeaderChanged, JumpsChanged, OBJECT_CHANGES
 from foundry.game.level.LevelRef import LevelRef
 from foundry.gui.HeaderEditor import CAMERA_MOVEMENTS
 from foundry.gui.LevelView import LevelView
@@ -24,7 +25,7 @@ class WarningList(QWidget):
         super(WarningList, self).__init__(parent)
 
         self.level_ref = level_ref
-        self.level_ref.data_changed.connect(self._update_warnings)
+        self.level_ref.changes.batch_ready.connect(self._on_level_changes)
 
         self.level_view_ref = level_view_ref
         self.object_list = object_list_ref
@@ -38,6 +39,10 @@ class WarningList(QWidget):
 
         self.warnings: List[Tuple[str, List[LevelObject]]] = []
 
+    def _on_level_changes(self, batch: ChangeBatch):
+        if batch.affects(HeaderChanged, JumpsChanged, *OBJECT_CHANGES):
+            self._update_warnings()
+
     def _update_warnings(self):
         self.warnings.clear()
 
@@ -33,6 +33,9 @@ SETTINGS["block_transparency"] = True
 SETTINGS["object_scroll_enabled"] = False
 SETTINGS["object_tooltip_enabled"] = True
 
+SETTINGS["undo_memory_limit"] = 16 * 1024 * 1024  # bytes
+SETTINGS["auto_save_delay"] = 2.0  # seconds
+
 
 def load_settings():
     if not default_settings_path.exists():
@@ -0,0 +1,117 @@
+from foundry.gui.AutoSaveJournal import AutoSaveJournal
+from foundry.gui.UndoStack import UndoStack
+
+OBJECT_SET_NUMBER = 1
+
+
+def _level_state(version: int):
+    object_data = bytearray(range(100))
+    object_data[version % 100] = 0xFF
+
+    return (0x1000, object_data), (0x2000, bytearray([version % 256, 0xFF]))
+
+
+def test_journal_replays_history(qtbot, tmp_path):
+    # GIVEN a journal, which recorded changes to a level, including undoing some of them
+    journal_path = tmp_path / "level_data.journal"
+    journal = AutoSaveJournal(journal_path)
+
+    undo_stack = UndoStack()
+    undo_stack.clear(_level_state(0))
+
+    journal.record(OBJECT_SET_NUMBER, undo_stack.history())
+
+    for version in range(1, 10):
+        undo_stack.save_level_state(_level_state(version))
+        journal.record(OBJECT_SET_NUMBER, undo_stack.history())
+
+    undo_stack.undo()
+    journal.record(OBJECT_SET_NUMBER, undo_stack.history())
+
+    undo_stack.undo()
+    undo_stack.save_level_state(_level_state(20))
+    journal.record(OBJECT_SET_NUMBER, undo_stack.history())
+
+    journal_size = journal_path.stat().st_size
+
+    # WHEN it is replayed
+    contents = AutoSaveJournal.replay(journal_path)
+
+    # THEN the same history comes out
+    assert contents is not None
+    assert (contents.undo_index, contents.states) == undo_stack.export_data()
+    assert contents.object_set_number == OBJECT_SET_NUMBER
+
+    # WHEN another change is recorded, but only written partially
+    history_before = undo_stack.export_data()
+
+    undo_stack.save_level_state(_level_state(21))
+    journal.record(OBJECT_SET_NUMBER, undo_stack.history())
+    journal.close()
+
+    with open(journal_path, "r+b") as journal_file:
+        journal_file.truncate(journal_path.stat().st_size - 1)
+
+    # THEN the history up to the change before it is still recovered
+    contents = AutoSaveJournal.replay(journal_path)
+
+    assert (contents.undo_index, contents.states) == history_before
+    assert journal_size < len(contents.states) * sum(len(data) for _, data in _level_state(0))
+
+
+def test_journal_starts_over_for_new_history(qtbot, tmp_path):
+    # GIVEN a journal, which recorded changes to a level
+    journal_path = tmp_path / "level_data.journal"
+    journal = AutoSaveJournal(journal_path)
+
+    undo_stack = UndoStack()
+    undo_stack.clear(_level_state(0))
+    undo_stack.save_level_state(_level_state(1))
+
+    journal.record(OBJECT_SET_NUMBER, undo_stack.history())
+
+    # WHEN the history is replaced, like when a different level is loaded
+    undo_stack.clear(_level_state(5))
+    journal.record(OBJECT_SET_NUMBER, undo_stack.history())
+
+    # THEN only the new history is replayed
+    contents = AutoSaveJournal.replay(journal_path)
+
+    assert contents.undo_index == 0
+    assert contents.states == [_level_state(5)]
+
+    # WHEN there is no journal
+    # THEN nothing is replayed
+    assert AutoSaveJournal.replay(tmp_path / "missing.journal") is None
+
+
+def test_journal_keeps_states_saved_between_records(qtbot, tmp_path):
+    # GIVEN a journal, which recorded a level with one change
+    journal_path = tmp_path / "level_data.journal"
+    journal = AutoSaveJournal(journal_path)
+
+    undo_stack = UndoStack()
+    undo_stack.clear(_level_state(0))
+    journal.record(OBJECT_SET_NUMBER, undo_stack.history())
+
+    undo_stack.save_level_state(_level_state(1))
+    journal.record(OBJECT_SET_NUMBER, undo_stack.history())
+
+    # WHEN multiple states are saved, before the next record, also over states, which were undone
+    undo_stack.save_level_state(_level_state(2))
+    undo_stack.save_level_state(_level_state(3))
+    journal.record(OBJECT_SET_NUMBER, undo_stack.history())
+
+    undo_stack.undo()
+    undo_stack.undo()
+    journal.record(OBJECT_SET_NUMBER, undo_stack.history())
+
+    undo_stack.save_level_state(_level_state(10))
+    undo_stack.save_level_state(_level_state(11))
+    journal.record(OBJECT_SET_NUMBER, undo_stack.history())
+
+    # THEN every state is replayed
+    contents = AutoSaveJournal.replay(journal_path)
+
+    assert contents is not None
+    assert (contents.undo_index, contents.states) == undo_stack.export_data()
@@ -0,0 +1,72 @@
+from foundry.gui.AutoSaveJournal import AutoSaveJournal
+from foundry.gui.AutoSaver import AutoSaver
+from foundry.gui.UndoStack import UndoStack
+
+OBJECT_SET_NUMBER = 1
+
+
+def _level_state(version: int):
+    return (0x1000, bytearray([version, 1, 2, 3, 0xFF])), (0x2000, bytearray([version, 0xFF]))
+
+
+def test_changes_written_together(qtbot, tmp_path):
+    # GIVEN an auto saver, which waits a long time for more changes
+    journal_path = tmp_path / "level_data.journal"
+    rom_path = tmp_path / "auto_save.nes"
+
+    auto_saver = AutoSaver(AutoSaveJournal(journal_path), rom_path, delay=60)
+
+    undo_stack = UndoStack()
+    undo_stack.clear(_level_state(0))
+
+    # WHEN the level and the ROM are changed a couple of times
+    auto_saver.rom_changed(b"first rom")
+    auto_saver.level_changed(OBJECT_SET_NUMBER, undo_stack.history())
+
+    for version in range(1, 5):
+        undo_stack.save_level_state(_level_state(version))
+        auto_saver.level_changed(OBJECT_SET_NUMBER, undo_stack.history())
+
+    auto_saver.rom_changed(b"second rom")
+
+    # THEN nothing is written yet
+    assert not rom_path.exists()
+    assert not journal_path.exists()
+    assert auto_saver.last_persisted is None
+
+    # WHEN it is flushed
+    with qtbot.waitSignal(auto_saver.persisted):
+        auto_saver.flush()
+
+    # THEN only the last version of the ROM was written, but every change of the level
+    assert rom_path.read_bytes() == b"second rom"
+
+    contents = AutoSaveJournal.replay(journal_path)
+
+    assert (contents.undo_index, contents.states) == undo_stack.export_data()
+    assert auto_saver.last_persisted is not None
+
+    auto_saver.stop()
+
+
+def test_changes_written_after_delay(qtbot, tmp_path):
+    # GIVEN an auto saver, which waits only briefly for more changes
+    rom_path = tmp_path / "auto_save.nes"
+
+    auto_saver = AutoSaver(AutoSaveJournal(tmp_path / "level_data.journal"), rom_path, delay=0.05)
+
+    # WHEN the ROM changed
+    # THEN it is written on its own
+    with qtbot.waitSignal(auto_saver.persisted):
+        auto_saver.rom_changed(b"rom")
+
+    assert rom_path.read_bytes() == b"rom"
+
+    # WHEN it is stopped, with changes not written yet
+    auto_saver.delay = 60
+    auto_saver.rom_changed(b"dropped rom")
+
+    auto_saver.stop()
+
+    # THEN they are dropped
+    assert rom_path.read_bytes() == b"rom"
@@ -12,6 +12,8 @@ def test_add_jump(main_window):
     # WHEN a jump is added through the context menu
     jump_list.add_jump.emit()
 
+    main_window.level_ref.changes.flush()
+
     # THEN there is one more jump in the level and it is displayed in the jump list
     jumps_after = len(main_window.level_ref.jumps)
     assert jumps_after == jumps_before + 1
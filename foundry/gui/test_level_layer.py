@@ -0,0 +1,101 @@
+from PySide2.QtCore import QRect
+from PySide2.QtGui import QImage, QPainter
+
+from foundry.gui.LevelLayer import LevelLayer, TILE_SIZE
+
+
+class _CountingLayer(LevelLayer):
+    def __init__(self, shared: bool = False):
+        super(_CountingLayer, self).__init__(self._count, shared)
+
+        self.drawn_rects = []
+
+    def _count(self, _, rect: QRect):
+        self.drawn_rects.append(rect)
+
+    def draw_into_image(self, rect: QRect):
+        image = QImage(2 * TILE_SIZE, 2 * TILE_SIZE, QImage.Format_ARGB32_Premultiplied)
+
+        painter = QPainter(image)
+        self.draw(painter, rect)
+        painter.end()
+
+
+def test_tiles_are_drawn_once(qtbot):
+    # GIVEN a layer
+    layer = _CountingLayer()
+
+    # WHEN a part of it, spanning two tiles, is drawn twice
+    rect = QRect(0, 0, TILE_SIZE + 1, TILE_SIZE)
+
+    layer.draw_into_image(rect)
+    layer.draw_into_image(rect)
+
+    # THEN both tiles were only drawn once
+    assert layer.drawn_rects == [QRect(0, 0, TILE_SIZE, TILE_SIZE), QRect(TILE_SIZE, 0, TILE_SIZE, TILE_SIZE)]
+
+
+def test_invalidated_tiles_are_drawn_again(qtbot):
+    # GIVEN a layer, which was drawn already
+    layer = _CountingLayer()
+
+    rect = QRect(0, 0, 2 * TILE_SIZE, 2 * TILE_SIZE)
+
+    layer.draw_into_image(rect)
+    layer.drawn_rects.clear()
+
+    # WHEN a part of one tile is invalidated and the layer is drawn again
+    layer.invalidate(QRect(TILE_SIZE + 10, 10, 10, 10))
+
+    layer.draw_into_image(rect)
+
+    # THEN only that tile was drawn again
+    assert layer.drawn_rects == [QRect(TILE_SIZE, 0, TILE_SIZE, TILE_SIZE)]
+
+
+def test_layer_is_drawn_again_on_new_key(qtbot):
+    # GIVEN a layer, which was drawn with a key already
+    layer = _CountingLayer()
+    layer.update_key(1)
+
+    rect = QRect(0, 0, TILE_SIZE, TILE_SIZE)
+
+    layer.draw_into_image(rect)
+
+    # WHEN the same key is given and the layer is drawn, and a new key is given and the layer is drawn
+    layer.update_key(1)
+    layer.draw_into_image(rect)
+
+    drawn_with_same_key = len(layer.drawn_rects)
+
+    layer.update_key(2)
+    layer.draw_into_image(rect)
+
+    # THEN the layer was only drawn again with the new key
+    assert drawn_with_same_key == 1
+    assert len(layer.drawn_rects) == 2
+
+
+def test_shared_layers_keep_tiles_by_key(qtbot):
+    # GIVEN a shared layer, which was drawn with a key already
+    layer = _CountingLayer(shared=True)
+    layer.update_key(("shared test layer", 1))
+
+    rect = QRect(0, 0, TILE_SIZE, TILE_SIZE)
+
+    layer.draw_into_image(rect)
+
+    # WHEN it is drawn with another key, then with the first key again, and another layer is drawn with the first key
+    layer.update_key(("shared test layer", 2))
+    layer.draw_into_image(rect)
+
+    layer.update_key(("shared test layer", 1))
+    layer.draw_into_image(rect)
+
+    other_layer = _CountingLayer(shared=True)
+    other_layer.update_key(("shared test layer", 1))
+    other_layer.draw_into_image(rect)
+
+    # THEN the tile was only drawn once for every key
+    assert len(layer.drawn_rects) == 2
+    assert not other_layer.drawn_rects
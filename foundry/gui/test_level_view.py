@@ -1,7 +1,8 @@
 import pytest
-from PySide2.QtCore import QPoint
-from PySide2.QtGui import QWheelEvent, Qt
+from PySide2.QtCore import QEvent, QPoint
+from PySide2.QtGui import QMouseEvent, QWheelEvent, Qt
 
+from foundry.game.gfx.objects.LevelObject import LevelObject
 from foundry.gui.HeaderEditor import HeaderEditor
 from foundry.gui.LevelView import LevelView
 from foundry.gui.settings import SETTINGS
@@ -45,6 +46,8 @@ def test_level_larger(level_view):
     length_dropdown.setCurrentIndex(original_index + 1)
     length_dropdown.activated.emit(length_dropdown.currentIndex())
 
+    level_view.level_ref.changes.flush()
+
     # THEN the level_view should be larger as well
     assert level_view.size().width() > original_size.width()
     assert level_view.size().height() >= original_size.height()
@@ -62,6 +65,8 @@ def test_level_smaller(level_view):
     length_dropdown.setCurrentIndex(original_index - 1)
     length_dropdown.activated.emit(length_dropdown.currentIndex())
 
+    level_view.level_ref.changes.flush()
+
     # THEN the level_view should be larger as well
     assert level_view.size().width() < original_size.width()
     assert level_view.size().height() >= original_size.height()
@@ -111,3 +116,77 @@ def test_wheel_event(scroll_amount, coordinates, wheel_delta, type_change, main_
     new_type = level_view.object_at(*coordinates).type
 
     assert new_type == original_type + type_change, (original_type, new_type)
+
+
+def _mouse_move_event(level_view, x, y):
+    return QMouseEvent(
+        QEvent.MouseMove,
+        QPoint(x * level_view.block_length, y * level_view.block_length),
+        Qt.LeftButton,
+        Qt.LeftButton,
+        Qt.NoModifier,
+    )
+
+
+def test_drag_repaints_old_and_new_position(level_view, qtbot, monkeypatch):
+    # GIVEN a level view with a selected object
+    level_object = level_view.level_ref.level.objects[-1]
+    level_view.select_objects([level_object], replace_selection=True)
+
+    x, y = level_object.get_position()
+    level_view.last_mouse_position = x, y
+
+    old_rect = level_object.get_rect(level_view.block_length)
+
+    updated_rects = []
+    monkeypatch.setattr(level_view, "update", updated_rects.append)
+
+    # WHEN the object is dragged 2 blocks to the right, with multiple mouse moves in the same frame
+    level_view._dragging(_mouse_move_event(level_view, x + 1, y))
+    level_view._dragging(_mouse_move_event(level_view, x + 2, y))
+
+    # THEN nothing happens until the frame is over
+    assert not updated_rects
+
+    qtbot.waitUntil(lambda: bool(updated_rects))
+
+    # THEN only the picture of the object was moved, with only the part of the view of its old and new position
+    # repainted, while the object itself stays, where it was, until it is dropped
+    assert level_object.get_position() == (x, y)
+    assert level_view.level_drawer.lifted_objects == [level_object]
+
+    new_rect = old_rect.translated(2 * level_view.block_length, 0)
+
+    assert len(updated_rects) == 1
+    assert updated_rects[0].contains(old_rect)
+    assert updated_rects[0].contains(new_rect)
+    assert updated_rects[0].width() < level_view.width()
+
+    # WHEN the object is dropped
+    level_view._drop_objects()
+
+    # THEN it is moved by the whole distance at once and drawn as part of the level again
+    assert level_object.get_position() == (x + 2, y)
+    assert level_object.get_rect(level_view.block_length) == new_rect
+
+    assert not level_view.level_drawer.lifted_objects
+    assert updated_rects[-1].contains(new_rect)
+
+
+def test_resize_only_applied_when_size_changes(level_view, qtbot, monkeypatch):
+    # GIVEN a level view with a selected object, which is being resized
+    level_object = level_view.level_ref.level.objects[-1]
+    level_view.select_objects([level_object], replace_selection=True)
+
+    resizes = []
+    monkeypatch.setattr(LevelObject, "resize_by", lambda _, dx, dy: resizes.append((dx, dy)))
+
+    # WHEN the mouse moves to a new size, and then within the same block, over two frames
+    level_view._pending_resize = 3, 0
+    level_view._apply_pending_gesture()
+
+    level_view._pending_resize = 3, 0
+    level_view._apply_pending_gesture()
+
+    # THEN the object was only resized once
+    assert resizes == [(3, 0)]
@@ -6,7 +6,7 @@ def test_domain_spinner(main_window):
     level_ref = main_window.level_ref
 
     level_object = level_ref.level.objects[0]
-    level_object.selected = True
+    level_ref.selected_objects = [level_object]
 
     assert level_ref.selected_objects == [level_object]
 
@@ -34,7 +34,7 @@ def test_object_selected(main_window):
     enemy = level_ref.level.enemies[0]
 
     for obj in [level_obj, enemy]:
-        obj.selected = True
+        level_ref.selected_objects = [obj]
 
         assert level_ref.selected_objects == [obj]
 
@@ -49,4 +49,4 @@ def test_object_selected(main_window):
         assert domain_spinner.isEnabled() == isinstance(obj, LevelObject) and domain_spinner.value() == obj.domain
         assert length_spinner.isEnabled() == obj.is_4byte and length_spinner.value() == 0
 
-        obj.selected = False
+        level_ref.selected_objects = []
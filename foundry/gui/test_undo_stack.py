@@ -0,0 +1,86 @@
+from foundry.gui.UndoStack import KEYFRAME_INTERVAL, UndoStack
+
+
+def _level_state(version: int):
+    object_data = bytearray(range(100))
+    object_data[version % 100] = 0xFF
+
+    enemy_data = bytearray([version % 256] * (version % 5 + 1)) + bytearray([0xFF])
+
+    return (0x1000, object_data), (0x2000, enemy_data)
+
+
+def test_undo_redo_restores_every_state(qtbot):
+    # GIVEN an undo stack with more states saved, than fit between two full copies of the level
+    states = [_level_state(version) for version in range(KEYFRAME_INTERVAL * 3)]
+
+    undo_stack = UndoStack()
+    undo_stack.clear(states[0])
+
+    for state in states[1:]:
+        undo_stack.save_level_state(state)
+
+    # THEN the changes take up less memory, than the states would
+    assert undo_stack.memory_used < sum(len(objects) + len(enemies) for (_, objects), (_, enemies) in states) / 4
+
+    # WHEN undoing everything
+    # THEN every state comes back, in reverse
+    for state in reversed(states[:-1]):
+        assert undo_stack.undo() == state
+
+    assert not undo_stack.undo_available
+
+    # WHEN redoing everything
+    # THEN every state comes back, in order
+    for state in states[1:]:
+        assert undo_stack.redo() == state
+
+    assert not undo_stack.redo_available
+    assert undo_stack.export_data() == (len(states) - 1, states)
+
+
+def test_redo_history_replaced_by_new_state(qtbot):
+    # GIVEN an undo stack, in which the last two changes were undone
+    undo_stack = UndoStack()
+    undo_stack.clear(_level_state(0))
+
+    for version in range(1, 4):
+        undo_stack.save_level_state(_level_state(version))
+
+    undo_stack.undo()
+    undo_stack.undo()
+
+    # WHEN a new state is saved
+    undo_stack.save_level_state(_level_state(10))
+
+    # THEN it replaces the undone ones and follows the state it was saved in
+    assert len(undo_stack) == 3
+    assert not undo_stack.redo_available
+
+    assert undo_stack.undo() == _level_state(1)
+    assert undo_stack.redo() == _level_state(10)
+
+
+def test_oldest_states_dropped_over_memory_limit(qtbot):
+    # GIVEN an undo stack, that may only hold a few full copies of a level
+    level_size = sum(len(data) for _, data in _level_state(0))
+
+    undo_stack = UndoStack(memory_limit=level_size * 4)
+    undo_stack.clear(_level_state(0))
+
+    # WHEN more states are saved, than fit into it
+    last_version = KEYFRAME_INTERVAL * 4
+
+    for version in range(1, last_version + 1):
+        undo_stack.save_level_state(_level_state(version))
+
+    # THEN the oldest were dropped, while the newest can still be restored
+    assert undo_stack.memory_used <= undo_stack.memory_limit
+    assert len(undo_stack) < last_version + 1
+
+    index, states = undo_stack.export_data()
+
+    assert index == len(undo_stack) - 1
+    assert states == [_level_state(version) for version in range(last_version + 1 - len(states), last_version + 1)]
+
+    assert undo_stack.undo() == states[-2]
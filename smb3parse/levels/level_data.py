@@ -0,0 +1,63 @@
+"""
+Reads the object and enemy data of levels record by record, straight out of the buffer it is in, be it the whole ROM or
+an m3l file, without copying what comes after the record, that is being read.
+"""
+from typing import Iterator, Union
+
+from smb3parse.objects.object_set import ObjectSet
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+DATA_END = 0xFF
+"""Marks the end of the object data and the enemy data of a level."""
+
+ENEMY_SIZE = 3
+
+
+def object_records(data: Buffer, object_set_number: int, offset: int = 0) -> Iterator[bytearray]:
+    """
+    Yields the 3 or 4 bytes of every level object and jump in the data, until the data ends or the end marker is
+    reached.
+
+    :param data: The buffer the object data is in.
+    :param object_set_number: The object set of the level, which decides, which objects are 4 bytes long.
+    :param offset: Where in the buffer the object data starts.
+    """
+    object_length = ObjectSet(object_set_number).object_length
+
+    with memoryview(data) as view:
+        position = offset
+        data_length = len(view)
+
+        while position + 3 <= data_length and view[position] != DATA_END:
+            domain = (view[position] & 0b1110_0000) >> 5
+            object_id = view[position + 2]
+
+            record_length = object_length(domain, object_id)
+
+            yield bytearray(view[position : position + record_length])
+
+            position += record_length
+
+
+def enemy_records(data: Buffer, offset: int = 0) -> Iterator[bytearray]:
+    """
+    Yields the 3 bytes of every enemy and item in the data, until the data ends or the end marker is reached.
+
+    :param data: The buffer the enemy data is in.
+    :param offset: Where in the buffer the enemy data starts.
+    """
+    with memoryview(data) as view:
+        position = offset
+        data_length = len(view)
+
+        # only the 0xFF is reliable as the end of the enemy data, since other editors don't always write more than that
+        while position + ENEMY_SIZE <= data_length and view[position] != DATA_END:
+            yield bytearray(view[position : position + ENEMY_SIZE])
+
+            position += ENEMY_SIZE
+
+
+def object_data_length(data: Buffer, object_set_number: int, offset: int = 0) -> int:
+    """Returns the length of the object data, starting at offset, including the end marker."""
+    return sum(len(record) for record in object_records(data, object_set_number, offset)) + len(b"\xFF")
@@ -0,0 +1,108 @@
+"""
+Reads m3l files, which hold a single level: the world and level number, the object set, the level header, the object
+data and the enemy data, one after the other.
+"""
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Tuple, Union
+
+from smb3parse.levels import HEADER_LENGTH
+from smb3parse.levels.level_data import Buffer, ENEMY_SIZE, enemy_records, object_data_length
+from smb3parse.objects import MAX_ENEMY_ITEM_ID
+from smb3parse.objects.object_set import is_valid_object_set_number
+
+M3L_SUFFIX = ".m3l"
+
+PREFIX_LENGTH = 3  # world number, level number and object set number
+OBJECTS_START = PREFIX_LENGTH + HEADER_LENGTH
+
+
+class M3lData(NamedTuple):
+    """The sections of an m3l file, as views into its data, so nothing but the file itself is kept in memory."""
+
+    world_number: int
+    level_number: int
+    object_set_number: int
+    header: memoryview
+    object_data: memoryview
+    enemy_data: memoryview
+
+
+def parse_m3l(m3l_bytes: Buffer) -> M3lData:
+    """
+    Splits the m3l data into its sections, finding the end of the object data in one scan over its records.
+
+    :raises ValueError: If the data is too short to hold the level header.
+    """
+    if len(m3l_bytes) < OBJECTS_START:
+        raise ValueError(f"M3l data is {len(m3l_bytes)} bytes long, but needs to be at least {OBJECTS_START}.")
+
+    view = memoryview(m3l_bytes)
+
+    world_number, level_number, object_set_number = view[:PREFIX_LENGTH]
+
+    objects_end = _objects_end(view, object_set_number)
+
+    enemy_data = view[objects_end + len(b"\xFF") :]
+
+    if len(enemy_data) % ENEMY_SIZE == 2:
+        # compatibility with workshop, which writes an additional byte in front of the enemies
+        enemy_data = enemy_data[1:]
+
+    return M3lData(
+        world_number,
+        level_number,
+        object_set_number,
+        view[PREFIX_LENGTH:OBJECTS_START],
+        view[OBJECTS_START : objects_end + len(b"\xFF")],
+        enemy_data,
+    )
+
+
+def m3l_problems(m3l_bytes: Buffer) -> List[str]:
+    """
+    Checks, whether the m3l data can be loaded as a level, without building any of its objects.
+
+    :return: Descriptions of everything wrong with the data. Empty, if there is nothing.
+    """
+    try:
+        m3l = parse_m3l(m3l_bytes)
+    except ValueError as e:
+        return [str(e)]
+
+    problems = []
+
+    if not is_valid_object_set_number(m3l.object_set_number):
+        # without a valid object set, the length of the objects, and so everything after them, is unknown
+        return [f"Object set {m3l.object_set_number} is invalid."]
+
+    if m3l.object_data[-1:] != b"\xFF":
+        problems.append("Object data is not ended by 0xFF.")
+
+    enemy_ids = [record[0] for record in enemy_records(m3l.enemy_data)]
+
+    if len(m3l.enemy_data) != len(enemy_ids) * ENEMY_SIZE + len(b"\xFF") or m3l.enemy_data[-1:] != b"\xFF":
+        problems.append("Enemy data is not ended by 0xFF.")
+
+    problems.extend(
+        f"Enemy/item id {enemy_id:#x} is unknown." for enemy_id in enemy_ids if enemy_id > MAX_ENEMY_ITEM_ID
+    )
+
+    return problems
+
+
+def validate_m3l_files(directory: Union[str, Path]) -> Iterator[Tuple[Path, List[str]]]:
+    """
+    Yields every m3l file in the directory, one at a time, with the problems found in it.
+
+    Only one file is read at a time and no level is built, so whole directories can be checked, before importing them.
+    """
+    for path in sorted(Path(directory).glob(f"*{M3L_SUFFIX}")):
+        yield path, m3l_problems(path.read_bytes())
+
+
+def _objects_end(view: memoryview, object_set_number: int) -> int:
+    """Position of the 0xFF after the objects, or where it would have to be, if the data is cut short."""
+    if not is_valid_object_set_number(object_set_number):
+        return OBJECTS_START
+
+    return OBJECTS_START + object_data_length(view, object_set_number, OBJECTS_START) - len(b"\xFF")
@@ -0,0 +1,94 @@
+"""
+Times reading the object and enemy data of synthetic levels with 1000 to 10000 objects, once record by record out of the
+buffer, and once by slicing off every record, as levels used to be read.
+
+Run with: python -m smb3parse.tests.benchmark_level_data
+"""
+import random
+from timeit import timeit
+
+from smb3parse.levels.level_data import DATA_END, ENEMY_SIZE, enemy_records, object_records
+from smb3parse.objects.object_set import ObjectSet, PLAINS_OBJECT_SET
+
+OBJECT_COUNTS = [1000, 2000, 5000, 10000]
+REPEATS = 5
+ROM_SIZE = 0x60010
+
+
+def synthetic_level(object_count: int) -> bytearray:
+    """
+    Object data with the given amount of 3 and 4 byte objects, followed by as many enemies, at the start of a buffer
+    the size of the ROM, like a level, that is read right out of it.
+    """
+    rng = random.Random(object_count)
+    object_set = ObjectSet(PLAINS_OBJECT_SET)
+
+    data = bytearray()
+
+    for _ in range(object_count):
+        domain, object_id = rng.randrange(8), rng.randrange(0x100)
+
+        data.extend([domain << 5 | rng.randrange(27), rng.randrange(0x100), object_id])
+
+        if object_set.object_length(domain, object_id) == 4:
+            data.append(rng.randrange(0x100))
+
+    data.append(DATA_END)
+
+    for _ in range(object_count):
+        data.extend([rng.randrange(0xEC), rng.randrange(0x100), rng.randrange(27)])
+
+    data.append(DATA_END)
+
+    return data + bytearray(ROM_SIZE - len(data))
+
+
+def sliced_records(data: bytearray) -> int:
+    object_set = ObjectSet(PLAINS_OBJECT_SET)
+    count = 0
+
+    while data[0] != DATA_END:
+        obj_data, data = data[0:3], data[3:]
+
+        if object_set.object_length(obj_data[0] >> 5, obj_data[2]) == 4:
+            obj_data.append(data[0])
+            data = data[1:]
+
+        count += 1
+
+    data = data[1:]
+
+    while data and data[0] != DATA_END:
+        data = data[ENEMY_SIZE:]
+        count += 1
+
+    return count
+
+
+def streamed_records(data: bytearray) -> int:
+    object_count = 0
+    object_length = 0
+
+    for record in object_records(data, PLAINS_OBJECT_SET):
+        object_count += 1
+        object_length += len(record)
+
+    return object_count + sum(1 for _ in enemy_records(data, object_length + 1))
+
+
+def main():
+    print(f"{'objects':>8} {'sliced (ms)':>12} {'streamed (ms)':>14}")
+
+    for object_count in OBJECT_COUNTS:
+        data = synthetic_level(object_count)
+
+        assert sliced_records(data) == streamed_records(data) == 2 * object_count
+
+        sliced = timeit(lambda: sliced_records(data), number=REPEATS) / REPEATS * 1000
+        streamed = timeit(lambda: streamed_records(data), number=REPEATS) / REPEATS * 1000
+
+        print(f"{object_count:>8} {sliced:>12.1f} {streamed:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+from smb3parse.levels.level_data import enemy_records, object_data_length, object_records
+from smb3parse.objects.object_set import PLAINS_OBJECT_SET
+
+THREE_BYTE_OBJECT = b"\x1a\x05\x10"
+FOUR_BYTE_OBJECT = b"\x1a\x07\xc0\x03"  # id 0xC0 in domain 0 has a length byte in the plains object set
+
+
+def test_object_records():
+    # GIVEN object data, with something else before and after it
+    data = b"\x00\x00" + THREE_BYTE_OBJECT + FOUR_BYTE_OBJECT + THREE_BYTE_OBJECT + b"\xff" + b"\x01\x02\x03"
+
+    # WHEN its records are read
+    records = list(object_records(data, PLAINS_OBJECT_SET, offset=2))
+
+    # THEN every object has its own record, and nothing after the end marker was read
+    assert records == [THREE_BYTE_OBJECT, FOUR_BYTE_OBJECT, THREE_BYTE_OBJECT]
+    assert object_data_length(data, PLAINS_OBJECT_SET, offset=2) == 3 + 4 + 3 + 1
+
+
+def test_object_records_of_empty_level():
+    # GIVEN object data, which ends right away
+    data = bytearray(b"\xff")
+
+    # WHEN its records are read
+    records = list(object_records(data, PLAINS_OBJECT_SET))
+
+    # THEN there are none
+    assert not records
+
+
+def test_enemy_records():
+    # GIVEN enemy data of two enemies, which is cut off without an end marker
+    data = memoryview(b"\x72\x10\x15\x6c\x22\x10\x80")
+
+    # WHEN its records are read
+    records = list(enemy_records(data))
+
+    # THEN only the complete enemies are read
+    assert records == [b"\x72\x10\x15", b"\x6c\x22\x10"]
@@ -0,0 +1,55 @@
+from smb3parse.levels.m3l import m3l_problems, parse_m3l, validate_m3l_files
+from smb3parse.objects.object_set import PLAINS_OBJECT_SET
+
+HEADER = bytes(range(9))
+OBJECTS = b"\x1a\x05\x10" + b"\x1a\x07\xc0\x03" + b"\xff"
+ENEMIES = b"\x72\x10\x15" + b"\xff"
+
+M3L = bytes([1, 2, PLAINS_OBJECT_SET]) + HEADER + OBJECTS + b"\x01" + ENEMIES
+
+
+def test_parse_m3l():
+    # GIVEN the data of an m3l file, written by workshop, with an additional byte in front of the enemies
+    pass
+
+    # WHEN it is parsed
+    m3l = parse_m3l(M3L)
+
+    # THEN every section is found
+    assert (m3l.world_number, m3l.level_number, m3l.object_set_number) == (1, 2, PLAINS_OBJECT_SET)
+
+    assert m3l.header == HEADER
+    assert m3l.object_data == OBJECTS
+    assert m3l.enemy_data == ENEMIES
+
+    assert not m3l_problems(M3L)
+
+
+def test_m3l_problems():
+    # GIVEN the data of an m3l file, which was cut off in the middle of an enemy
+    data = M3L[:-2]
+
+    # WHEN it is checked
+    problems = m3l_problems(data)
+
+    # THEN the missing end of the enemies is found
+    assert problems == ["Enemy data is not ended by 0xFF."]
+
+    # and data, which is too short for a level header, is found as well
+    assert len(m3l_problems(M3L[:5])) == 1
+
+
+def test_validate_m3l_files(tmp_path):
+    # GIVEN a directory with a good and a broken m3l file, and another file
+    (tmp_path / "good.m3l").write_bytes(M3L)
+    (tmp_path / "broken.m3l").write_bytes(M3L[:10])
+    (tmp_path / "readme.txt").write_text("not a level")
+
+    # WHEN the directory is validated
+    results = dict(validate_m3l_files(tmp_path))
+
+    # THEN only the m3l files were checked, and only the broken one has problems
+    assert results.keys() == {tmp_path / "good.m3l", tmp_path / "broken.m3l"}
+
+    assert not results[tmp_path / "good.m3l"]
+    assert results[tmp_path / "broken.m3l"]